@@ -0,0 +1,259 @@
+#!/usr/bin/python3
+
+"""
+Module used to benchmark the pure-Python analysis hot paths on synthetic readelf/objdump output and version
+information, from 1k up to 500k symbols and 2 up to 32 versions. The comparison of sections is stubbed, so only
+the Python code is measured. The time (best of a number of repeats) and peak memory of every case are compared
+against a baseline file, relative to the time and memory of the case in the baseline.
+
+The baseline (baseline.json) is machine-specific, so it has to be regenerated on the machine the comparison is run on,
+from the code before the change under test:
+    git stash && python3 benchmarks/micro.py -s [-f] && git stash pop
+    python3 benchmarks/micro.py [-f]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.parser as parser
+import core.sections as sections
+import core.tools.arm_diablo_linux_objdump as arm_diablo_linux_objdump
+import executor.executor as executor
+
+# The default and full grids of the number of symbols and versions.
+SYMBOLS = [1000, 10000, 100000]
+VERSIONS = [2, 8]
+FULL_SYMBOLS = [1000, 10000, 100000, 500000]
+FULL_VERSIONS = [2, 8, 32]
+
+# The number of symbols per synthetic object file.
+SYMBOLS_PER_OBJECT = 1000
+# Every how manieth text section differs between versions.
+DIFFERENT_EVERY = 20
+# Cases that take less than this number of seconds are timed over as many calls as needed to take at least as long,
+# so that fast cases aren't dominated by timer resolution and noise.
+MINIMAL_SAMPLE = 0.2
+
+class StubComparator:
+    """
+    Class which stands in for the comparator (see core/comparator.py): object files never match, and a
+    fixed subset of the text sections differs between every two versions.
+    """
+
+    def __init__(self, different_sections):
+        self.different_sections = different_sections
+        self.counters = {'object': 0, 'section_digest': 0, 'byte_dump': 0}
+        self.differences = 0
+
+    def objects_equal(self, object_file_one, object_file_two):
+        return False
+
+    def sections_equal(self, section, object_file_one, object_file_two):
+        return section not in self.different_sections
+
+def symbol_name(idx):
+    return 'function_' + str(idx)
+
+def object_file_name(idx):
+    return os.path.join('dir_' + str(idx % 10), 'file_' + str(idx) + '.o')
+
+def write_readelf_output(directory, symbols):
+    """
+    Method used to write synthetic section headers, as dumped by the ELF reader, for every object file.
+    :param directory: the directory to write the files to.
+    :param symbols: the total number of symbols.
+    :return: the written files.
+    """
+    elf_files = []
+    for obj_idx in range(0, symbols, SYMBOLS_PER_OBJECT):
+        elf_file = os.path.join(directory, 'file_' + str(obj_idx // SYMBOLS_PER_OBJECT) + '.elf')
+        with open(elf_file, 'w') as f:
+            f.write('There are ' + str(4 * SYMBOLS_PER_OBJECT) + ' section headers, starting at offset 0x1234:\n\nSection Headers:\n')
+            f.write('  [Nr] Name              Type            Addr     Off    Size   ES Flg Lk Inf Al\n')
+            section_idx = 0
+            for idx in range(obj_idx, min(symbols, obj_idx + SYMBOLS_PER_OBJECT)):
+                for name, section_type, flags in [('.text.', 'PROGBITS', 'AX'), ('.rel.text.', 'REL', 'I'), ('.data.', 'PROGBITS', 'WA'), ('.rodata.', 'PROGBITS', 'A')]:
+                    section_idx += 1
+                    f.write('  [' + str(section_idx).rjust(4) + '] ' + (name + symbol_name(idx)).ljust(17) + ' ' + section_type.ljust(15) +
+                            ' 00000000 000034 000010 00 ' + flags.rjust(3) + '  0   0  4\n')
+            f.write('Key to Flags:\n  W (write), A (alloc), X (execute), M (merge), S (strings)\n')
+        elf_files.append(elf_file)
+    return elf_files
+
+def disassembly_lines(symbols):
+    # Four instructions per symbol, with the comments and symbolic operands that are cleaned.
+    lines = []
+    for idx in range(symbols):
+        address = idx * 16
+        lines.append(format(address, '8x') + ':\te92d4800 \tpush\t{fp, lr}')
+        lines.append(format(address + 4, '8x') + ':\te28db004 \tadd\tfp, sp, #4')
+        lines.append(format(address + 8, '8x') + ':\tebfffffe \tbl\t0 <' + symbol_name(idx + 1) + '>')
+        lines.append(format(address + 12, '8x') + ':\te59f0004 \tldr\tr0, [pc, #4]\t; 1c <' + symbol_name(idx) + '+0x1c>')
+    return lines
+
+def section_sets(symbols, prefixes):
+    # The sections of every object file, as parsed by the section extracters.
+    return [[prefix + symbol_name(idx) for idx in range(obj_idx, min(symbols, obj_idx + SYMBOLS_PER_OBJECT)) for prefix in prefixes]
+            for obj_idx in range(0, symbols, SYMBOLS_PER_OBJECT)]
+
+def version_information(symbols, versions):
+    """
+    Method used to create synthetic version information, as gathered by the executor.
+    :param symbols: the number of symbols.
+    :param versions: the number of versions.
+    :return: the generated versions and their version information.
+    """
+    text_sections = section_sets(symbols, ['.text.', '.rel.text.'])
+    data_sections = section_sets(symbols, ['.data.', '.rodata.'])
+    object_files = [object_file_name(idx) for idx in range(len(text_sections))]
+
+    generated_versions = ['version_' + str(idx) for idx in range(versions)]
+    information = dict()
+    for version in generated_versions:
+        version_object_files = [os.path.join('/synthetic', version, 'objfiles', object_file) for object_file in object_files]
+        objfiles_directory = os.path.join('/synthetic', version, 'objfiles')
+        information[version] = {'text_section_information': sections.create_section_dict(text_sections, version_object_files, objfiles_directory),
+                                'data_section_information': sections.create_section_dict(data_sections, version_object_files, objfiles_directory)}
+    return (generated_versions, information)
+
+def create_analyzer(symbols):
+    # An executor that only has what Executor.analyze needs.
+    analyzer = executor.Executor.__new__(executor.Executor)
+    analyzer.config = types.SimpleNamespace(default={'input_source_directory': '/synthetic'},
+                                            elf_reader={'section_comparison': 'raw', 'detailed_reasons': False}, scheduler={'analysis_jobs': 1})
+    analyzer.comparator = StubComparator(set('.text.' + symbol_name(idx) for idx in range(0, symbols, DIFFERENT_EVERY)))
+    analyzer.mobile_limit = None
+    return analyzer
+
+def measure(function, repeats):
+    """
+    Method used to measure a function.
+    :param function: the function (without arguments).
+    :param repeats: the number of times the function is timed.
+    :return: a dictionary containing the best time of a call in seconds, the number of calls per timing, and the peak
+    memory in bytes.
+    """
+    def sample(calls):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        return time.perf_counter() - start
+
+    # We determine the number of calls that take at least MINIMAL_SAMPLE seconds.
+    calls = 1
+    elapsed = sample(calls)
+    while elapsed < MINIMAL_SAMPLE:
+        calls = max(calls * 2, int(calls * MINIMAL_SAMPLE / max(elapsed, 1e-9) * 1.2))
+        elapsed = sample(calls)
+
+    seconds = elapsed / calls
+    for _ in range(repeats - 1):
+        seconds = min(seconds, sample(calls) / calls)
+
+    # The peak memory is measured separately, as tracing slows everything down.
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': seconds, 'calls': calls, 'peak_bytes': peak}
+
+def run(symbols_grid, versions_grid, repeats, only=None):
+    """
+    Method used to run all benchmarks.
+    :param symbols_grid: the numbers of symbols.
+    :param versions_grid: the numbers of versions (only for the analysis).
+    :param repeats: the number of times every case is timed.
+    :param only: if given, only the benchmarks of these functions are run.
+    :return: a dictionary {case: measurement}.
+    """
+    results = dict()
+
+    def case(function_name, symbols, function, versions=None):
+        if only and function_name not in only:
+            return
+        name = function_name + ':' + str(symbols) + (':' + str(versions) if versions is not None else '')
+        results[name] = measure(function, repeats)
+        print(name.ljust(40) + ' ' + ('%.4f' % results[name]['seconds']).rjust(10) + ' s ' + ('%.1f' % (results[name]['peak_bytes'] / 2 ** 20)).rjust(10) + ' MiB')
+
+    for symbols in symbols_grid:
+        with tempfile.TemporaryDirectory() as directory:
+            elf_files = write_readelf_output(directory, symbols)
+            case('parse_files', symbols, lambda: (parser.Parser.parse_files(elf_files, parser.data_section_extracter),
+                                                  parser.Parser.parse_files(elf_files, parser.text_section_extracter)))
+
+        section_names = [section for sect in section_sets(symbols, ['.text.', '.rel.text.', '.data.', '.rodata.']) for section in sect]
+        case('extract_symbol_name', symbols, lambda: [sections.extract_symbol_name(section) for section in section_names])
+
+        text_sections = section_sets(symbols, ['.text.', '.rel.text.'])
+        object_files = [os.path.join('/synthetic', 'objfiles', object_file_name(idx)) for idx in range(len(text_sections))]
+        case('create_section_dict', symbols, lambda: sections.create_section_dict(text_sections, object_files, '/synthetic/objfiles'))
+
+        lines = disassembly_lines(symbols)
+        case('clean_disassembly_line', symbols, lambda: [arm_diablo_linux_objdump.clean_disassembly_line(line) for line in lines])
+
+        for versions in versions_grid:
+            if only and 'analyze' not in only:
+                break
+            (generated_versions, information) = version_information(symbols, versions)
+            case('analyze', symbols, lambda: create_analyzer(symbols).analyze([], generated_versions, information), versions)
+
+    return results
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """
+    Method used to compare the results against the baseline.
+    :param results: the results of this run.
+    :param baseline: the results of the baseline.
+    :param time_tolerance: the factor by which a case may be slower than the baseline (see MINIMAL_SAMPLE).
+    :param memory_tolerance: the factor by which a case may use more memory than the baseline.
+    :return: the cases that regressed.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        time_ratio = result['seconds'] / baseline[name]['seconds'] if baseline[name]['seconds'] else 1.0
+        memory_ratio = result['peak_bytes'] / baseline[name]['peak_bytes'] if baseline[name]['peak_bytes'] else 1.0
+        regressed = time_ratio > time_tolerance or memory_ratio > memory_tolerance
+        print(name.ljust(40) + ' time x' + ('%.2f' % time_ratio).ljust(6) + ' memory x' + ('%.2f' % memory_ratio).ljust(6) + (' REGRESSION' if regressed else ''))
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+# Parse the arguments.
+if __name__ == '__main__':
+    parser_ = argparse.ArgumentParser()
+    parser_.add_argument('-b', '--baseline', type=str, default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json'), help='The baseline file.')
+    parser_.add_argument('-f', '--full', action='store_true', help='Run the full grid (up to 500k symbols and 32 versions).')
+    parser_.add_argument('-m', '--memory_tolerance', type=float, default=1.1, help='The factor by which a case may use more memory than the baseline.')
+    parser_.add_argument('-o', '--only', type=str, help='Only benchmark these functions (comma-separated).')
+    parser_.add_argument('-r', '--repeats', type=int, default=3, help='The number of times every case is timed.')
+    parser_.add_argument('-s', '--save', action='store_true', help='Save the results as the baseline (merged with the cases not run).')
+    parser_.add_argument('-t', '--time_tolerance', type=float, default=1.25, help='The factor by which a case may be slower than the baseline.')
+    args = parser_.parse_args()
+
+    results = run(FULL_SYMBOLS if args.full else SYMBOLS, FULL_VERSIONS if args.full else VERSIONS, args.repeats, args.only.split(',') if args.only else None)
+
+    baseline = dict()
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print('Saved ' + str(len(results)) + ' cases to ' + args.baseline + '.')
+    elif baseline:
+        print('************ Comparing against ' + args.baseline + ' **********')
+        if compare(results, baseline, args.time_tolerance, args.memory_tolerance):
+            sys.exit(1)
@@ -12,6 +12,17 @@ class Config:
         # We define the relevant instance attributes.
         self.default = dict()
         self.testing = dict()
+        self.benchmark = dict()
+        self.cost_model = dict()
+        self.daemon = dict()
+        self.queue = dict()
+        self.retention = dict()
+        self.store = dict()
+        self.selection = dict()
+        self.delta = dict()
+        self.progress = dict()
+        self.latency = dict()
+        self.scheduler = dict()
         self.semantic_mod = dict()
         self.arm_diablo_linux_gcc = dict()
         self.arm_diablo_linux_objdump = dict()
@@ -37,12 +48,87 @@ class Config:
         self.default['suffix_source'] = config_file.get("DEFAULT", "SuffixSource")
         self.default['suffix_header'] = config_file.get("DEFAULT", "SuffixHeader")
         self.default['nr_of_versions'] = config_file.get("DEFAULT", "NrOfVersions")
+        self.default['results_database'] = config_file.get("DEFAULT", "ResultsDatabase")
+        self.default['timings_history'] = config_file.get("DEFAULT", "TimingsHistory")
 
         # Parsing the TESTING section.
         logging.debug("Parsing the TESTING section...")
         self.testing['input_output'] = config_file.get("TESTING", "InputOutput")
         self.testing['host'] = config_file.get("TESTING", "Host")
         self.testing['regression_dir'] = config_file.get("TESTING", "RegressionDir")
+        self.testing['jobs'] = config_file.getint("TESTING", "Jobs")
+
+        # Parsing the BENCHMARK section.
+        logging.debug("Parsing the BENCHMARK section...")
+        self.benchmark['base_output_directory'] = config_file.get("BENCHMARK", "BaseOutputDirectory")
+        self.benchmark['warmups'] = config_file.getint("BENCHMARK", "Warmups")
+        self.benchmark['repetitions'] = config_file.getint("BENCHMARK", "Repetitions")
+        assert self.benchmark['repetitions'] >= 1, 'BENCHMARK.Repetitions has to be at least 1!'
+        self.benchmark['cpu'] = config_file.get("BENCHMARK", "Cpu")
+        self.benchmark['interleave'] = config_file.getboolean("BENCHMARK", "Interleave")
+        self.benchmark['confidence'] = config_file.getfloat("BENCHMARK", "Confidence")
+        self.benchmark['resamples'] = config_file.getint("BENCHMARK", "Resamples")
+
+        # Parsing the COST_MODEL section.
+        logging.debug("Parsing the COST_MODEL section...")
+        self.cost_model['profile'] = config_file.get("COST_MODEL", "Profile")
+        self.cost_model['profile_binary'] = config_file.get("COST_MODEL", "ProfileBinary")
+        self.cost_model['call_overhead'] = config_file.getfloat("COST_MODEL", "CallOverhead")
+        self.cost_model['byte_overhead'] = config_file.getfloat("COST_MODEL", "ByteOverhead")
+        self.cost_model['budget'] = config_file.getfloat("COST_MODEL", "Budget")
+        self.cost_model['hot_threshold'] = config_file.getint("COST_MODEL", "HotThreshold")
+
+        # Parsing the DAEMON section.
+        logging.debug("Parsing the DAEMON section...")
+        self.daemon['cache_directory'] = config_file.get("DAEMON", "CacheDirectory")
+        self.daemon['port'] = config_file.getint("DAEMON", "Port")
+        self.daemon['socket'] = config_file.get("DAEMON", "Socket")
+
+        # Parsing the QUEUE section.
+        logging.debug("Parsing the QUEUE section...")
+        self.queue['heartbeat'] = config_file.getint("QUEUE", "Heartbeat")
+        self.queue['timeout'] = config_file.getint("QUEUE", "Timeout")
+        self.queue['max_attempts'] = config_file.getint("QUEUE", "MaxAttempts")
+
+        # Parsing the RETENTION section.
+        logging.debug("Parsing the RETENTION section...")
+        self.retention['scratch_directory'] = config_file.get("RETENTION", "ScratchDirectory")
+        self.retention['policy'] = config_file.get("RETENTION", "Policy")
+        self.retention['archive_analysis'] = config_file.getboolean("RETENTION", "ArchiveAnalysis")
+
+        # Parsing the STORE section.
+        logging.debug("Parsing the STORE section...")
+        self.store['enabled'] = config_file.getboolean("STORE", "Enabled")
+
+        # Parsing the SELECTION section.
+        logging.debug("Parsing the SELECTION section...")
+        self.selection['versions'] = config_file.getint("SELECTION", "Versions")
+        mobile_budget = config_file.get("SELECTION", "MobileBudget")
+        self.selection['mobile_budget'] = int(mobile_budget) if mobile_budget else None
+
+        # Parsing the DELTA section.
+        logging.debug("Parsing the DELTA section...")
+        self.delta['enabled'] = config_file.getboolean("DELTA", "Enabled")
+        self.delta['baseline'] = config_file.get("DELTA", "Baseline")
+        self.delta['verify'] = config_file.getboolean("DELTA", "Verify")
+
+        # Parsing the PROGRESS section.
+        logging.debug("Parsing the PROGRESS section...")
+        self.progress['events'] = config_file.get("PROGRESS", "Events")
+
+        # Parsing the LATENCY section.
+        logging.debug("Parsing the LATENCY section...")
+        self.latency['latency'] = config_file.getfloat("LATENCY", "Latency")
+        self.latency['bandwidth'] = config_file.getint("LATENCY", "Bandwidth")
+        self.latency['concurrency'] = config_file.getint("LATENCY", "Concurrency")
+        self.latency['clients'] = config_file.getint("LATENCY", "Clients")
+        self.latency['repetitions'] = config_file.getint("LATENCY", "Repetitions")
+
+        # Parsing the SCHEDULER section.
+        logging.debug("Parsing the SCHEDULER section...")
+        self.scheduler['cpu'] = config_file.getint("SCHEDULER", "Cpu")
+        self.scheduler['board'] = config_file.getint("SCHEDULER", "Board")
+        self.scheduler['analysis_jobs'] = config_file.getint("SCHEDULER", "AnalysisJobs")
 
         # Parsing the SEMANTIC_MOD section.
         logging.debug("Parsing the SEMANTIC_MOD section...")
@@ -53,6 +139,7 @@ class Config:
         # Parsing the ARM_DIABLO_LINUX_GCC section.
         logging.debug("Parsing the ARM_DIABLO_LINUX_GCC section...")
         self.arm_diablo_linux_gcc["bin_location"] = config_file.get("ARM_DIABLO_LINUX_GCC", "BinLocation")
+        self.arm_diablo_linux_gcc["precompiled_headers"] = config_file.getboolean("ARM_DIABLO_LINUX_GCC", "PrecompiledHeaders")
 
         # Parsing the ARM_DIABLO_LINUX_OBJDUMP section.
         logging.debug("Parsing the ARM_DIABLO_LINUX_OBJDUMP section...")
@@ -63,6 +150,8 @@ class Config:
         logging.debug("Parsing the ELF_READER section...")
         self.elf_reader["bin_location"] = config_file.get("ELF_READER", "BinLocation")
         self.elf_reader["base_flags"] = json.loads(config_file.get("ELF_READER", "BaseFlags"))
+        self.elf_reader["section_comparison"] = config_file.get("ELF_READER", "SectionComparison")
+        self.elf_reader["detailed_reasons"] = config_file.getboolean("ELF_READER", "DetailedReasons")
 
         # Parsing the ACTC section.
         logging.debug("Parsing the ACTC section...")
@@ -0,0 +1,166 @@
+""" Module used for benchmarking the runtime overhead of versions against a base build. """
+import json
+import logging
+import math
+import os
+import random
+import statistics
+import subprocess
+
+# The script used to benchmark a single binary on the board.
+BENCHMARK_SCRIPT = os.path.join('testing', 'benchmark_version.sh')
+
+def percentile(values, fraction):
+    """
+    Method used to calculate a percentile of a list of values (using linear interpolation).
+    :param values: the values.
+    :param fraction: the requested percentile as a fraction between 0 and 1.
+    :return: the percentile.
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def describe(values):
+    """
+    Method used to describe the distribution of a list of timing samples.
+    :param values: the timing samples.
+    :return: a dictionary containing the median and the spread of the samples.
+    """
+    return {'samples': len(values),
+            'median': statistics.median(values),
+            'mean': statistics.mean(values),
+            'stdev': statistics.stdev(values) if len(values) > 1 else 0.0,
+            'iqr': percentile(values, 0.75) - percentile(values, 0.25),
+            'min': min(values),
+            'max': max(values)}
+
+def summarize(samples, base, confidence, resamples, failed=None):
+    """
+    Method used to summarize the timing samples of all binaries into overhead statistics.
+    The confidence intervals are obtained by bootstrapping the ratio of the medians.
+    :param samples: dictionary containing the timing samples {name: {input: [times]}}.
+    :param base: the name of the base binary, against which overhead is calculated.
+    :param confidence: the confidence level of the intervals (e.g. 0.95).
+    :param resamples: the number of bootstrap resamples.
+    :param failed: dictionary containing the inputs a binary failed on {name: [inputs]}. These are marked as failed,
+    and are left out of the overhead of the binary (or of all versions, if the base failed on them).
+    :return: a dictionary containing the statistics for the base and for every version.
+    """
+    # We use a fixed seed so the same samples always result in the same intervals.
+    rng = random.Random(0)
+    alpha = (1 - confidence) / 2
+    failed = failed if failed is not None else dict()
+
+    def describe_input(name, input_name, times):
+        input_summary = describe(times) if times else {'samples': 0}
+        input_summary['failed'] = input_name in failed.get(name, [])
+        return input_summary
+
+    summary = dict()
+    summary['base'] = {input_name: describe_input(base, input_name, times) for input_name, times in samples[base].items()}
+    summary['versions'] = dict()
+    for name, inputs in samples.items():
+        if name == base:
+            continue
+
+        # Only the inputs both the version and the base succeeded on are compared.
+        version_summary = summary['versions'][name] = {'inputs': dict(), 'failed': bool(failed.get(name))}
+        for input_name, times in inputs.items():
+            version_summary['inputs'][input_name] = describe_input(name, input_name, times)
+        compared = {input_name: times for input_name, times in inputs.items() if input_name not in failed.get(name, []) and input_name not in failed.get(base, [])}
+        if not compared:
+            version_summary['overhead'] = None
+            continue
+
+        # Bootstrap the overhead for every input, and the geometric mean over all inputs.
+        bootstrap_ratios = {input_name: [] for input_name in compared}
+        bootstrap_geomeans = []
+        for _ in range(resamples):
+            log_sum = 0.0
+            for input_name, times in compared.items():
+                base_times = samples[base][input_name]
+                ratio = statistics.median(rng.choices(times, k=len(times))) / statistics.median(rng.choices(base_times, k=len(base_times)))
+                bootstrap_ratios[input_name].append(ratio)
+                log_sum += math.log(ratio)
+            bootstrap_geomeans.append(math.exp(log_sum / len(compared)))
+
+        log_sum = 0.0
+        for input_name, times in compared.items():
+            ratio = statistics.median(times) / statistics.median(samples[base][input_name])
+            log_sum += math.log(ratio)
+
+            version_summary['inputs'][input_name]['overhead'] = {'median': ratio - 1,
+                                                                 'ci_low': percentile(bootstrap_ratios[input_name], alpha) - 1,
+                                                                 'ci_high': percentile(bootstrap_ratios[input_name], 1 - alpha) - 1}
+
+        version_summary['overhead'] = {'geometric_mean': math.exp(log_sum / len(compared)) - 1,
+                                       'ci_low': percentile(bootstrap_geomeans, alpha) - 1,
+                                       'ci_high': percentile(bootstrap_geomeans, 1 - alpha) - 1}
+
+    return summary
+
+def run(binaries, deploy, output_file, config):
+    """
+    Method used to benchmark a base binary and a number of versions on the testing board.
+    :param binaries: a list of (name, binary, mobile blocks directory) tuples, the first one being the base.
+    :param deploy: function used to deploy a mobile blocks directory.
+    :param output_file: the JSON file the benchmark results are written to.
+    :param config: the parsed configuration file (see config.py).
+    :return: the benchmark summary.
+    """
+    warmups = config.benchmark['warmups']
+    repetitions = config.benchmark['repetitions']
+    cpu = config.benchmark['cpu']
+    rounds = warmups + repetitions
+
+    # Determine the order in which the binaries are executed. When interleaving, every round executes
+    # each binary once (rotating the order every round), so drift on the board affects all binaries
+    # alike. Otherwise all rounds of a binary are executed back to back.
+    if config.benchmark['interleave']:
+        schedule = [binaries[idx % len(binaries):] + binaries[:idx % len(binaries)] for idx in range(rounds)]
+        runs = 1
+    else:
+        schedule = [binaries]
+        runs = rounds
+
+    # Execute the schedule, collecting the timing samples in chronological order.
+    samples = {name: dict() for name, _, _ in binaries}
+    failures = {name: 0 for name, _, _ in binaries}
+    deployed = None
+    for idx, order in enumerate(schedule):
+        logging.debug('Benchmark round ' + str(idx) + ': ' + str([name for name, _, _ in order]))
+        for name, binary, mobile_blocks_dir in order:
+            # Mobile blocks are deployed per AID, so we have to switch blocks whenever the binary changes.
+            if os.path.exists(mobile_blocks_dir) and deployed != mobile_blocks_dir:
+                deploy(mobile_blocks_dir)
+                deployed = mobile_blocks_dir
+
+            output = subprocess.check_output([BENCHMARK_SCRIPT, config.testing['host'], binary, name, str(runs), cpu], universal_newlines=True)
+            for result in json.loads(output):
+                samples[name].setdefault(result['input'], []).extend(result['samples'])
+
+    # Drop the warmup samples. The time of a failed sample doesn't measure the binary, so failed samples are
+    # left out, and the input is marked as failed for the binary.
+    failed = {name: [] for name, _, _ in binaries}
+    for name, inputs in samples.items():
+        for input_name, input_samples in inputs.items():
+            failures[name] += sum(sample['return_code'] != 0 for sample in input_samples)
+            if any(sample['return_code'] != 0 for sample in input_samples[warmups:]):
+                failed[name].append(input_name)
+            inputs[input_name] = [sample['real'] for sample in input_samples[warmups:] if sample['return_code'] == 0]
+        if failed[name]:
+            logging.warning('Benchmarking ' + name + ' failed on input(s): ' + ', '.join(failed[name]))
+
+    # Summarize and dump the results.
+    summary = summarize(samples, binaries[0][0], config.benchmark['confidence'], config.benchmark['resamples'], failed)
+    summary['configuration'] = {'warmups': warmups, 'repetitions': repetitions, 'cpu': cpu,
+                                'interleave': config.benchmark['interleave'], 'confidence': config.benchmark['confidence']}
+    summary['failures'] = failures
+    summary['samples'] = samples
+    with open(output_file, 'w') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    return summary
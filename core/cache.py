@@ -0,0 +1,146 @@
+""" Module used for caching artifacts that remain valid across executor runs. """
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+
+import core.file as file
+
+class Cache:
+    """
+    Class which keeps source manifests, compile results and section fingerprints warm, so that
+    consecutive executor runs only have to do the work for what actually changed.
+    """
+    def __init__(self, directory):
+        """
+        Initialization of the cache.
+        :param directory: the directory in which cached object files are stored.
+        :return: nothing.
+        """
+        self.directory = directory
+        self.objects_directory = os.path.join(directory, 'objects')
+        os.makedirs(self.objects_directory, exist_ok=True)
+
+        # The directory through which all cached compilations happen. Compiling through the same
+        # path for every run keeps the object files (e.g. __FILE__ and debug info) reusable.
+        self.compile_directory = os.path.join(directory, 'uniform_compilation')
+
+        # {(directory, suffixes): [files]}
+        self.manifests = dict()
+        # {compile key: cached object file}
+        self.objects = dict()
+        # {(path, size, mtime): digest}
+        self.digests = dict()
+        # {object file digest: {section name: section digest}}
+        self.fingerprints = dict()
+
+        # Statistics on the effectiveness of the cache.
+        self.statistics = {'manifest_hits': 0, 'manifest_misses': 0, 'object_hits': 0, 'object_misses': 0,
+                           'fingerprint_hits': 0, 'fingerprint_misses': 0}
+        self.lock = threading.Lock()
+
+    def get_files_with_suffix(self, directory, suffixes):
+        """
+        Method used to get the files with one of the given suffixes in a directory (see core/file.py).
+        The result is kept until the directory is invalidated.
+        :param directory: the directory to scan.
+        :param suffixes: the suffixes of the requested files.
+        :return: a list of files.
+        """
+        key = (os.path.abspath(directory), tuple(suffixes))
+        with self.lock:
+            if key in self.manifests:
+                self.statistics['manifest_hits'] += 1
+                return list(self.manifests[key])
+            self.statistics['manifest_misses'] += 1
+
+        files = file.get_files_with_suffix(directory, suffixes)
+        with self.lock:
+            self.manifests[key] = files
+        return list(files)
+
+    def invalidate(self, directory):
+        """
+        Method used to invalidate the manifests of a directory (e.g. when its contents changed).
+        :param directory: the directory.
+        :return: nothing.
+        """
+        directory = os.path.abspath(directory)
+        with self.lock:
+            for key in [key for key in self.manifests if key[0] == directory]:
+                del self.manifests[key]
+
+    def digest(self, path):
+        """
+        Method used to get the digest of a file, the digest is recalculated when the file changed.
+        :param path: the file.
+        :return: the digest of the file.
+        """
+        stat = os.stat(path)
+        key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            if key in self.digests:
+                return self.digests[key]
+
+        digest = file.digest_file(path)
+        with self.lock:
+            self.digests[key] = digest
+        return digest
+
+    def digest_files(self, paths):
+        """
+        Method used to calculate a single digest over a number of files (e.g. all headers of a version).
+        :param paths: the files.
+        :return: the combined digest.
+        """
+        digest = hashlib.sha256()
+        for path in sorted(paths):
+            digest.update(path.encode())
+            digest.update(self.digest(path).encode())
+        return digest.hexdigest()
+
+    def create_object_file(self, compiler, flags, source_file, output_file, context):
+        """
+        Method used to compile a source file, reusing the object file of an earlier identical compilation.
+        :param compiler: the compiler (see core/tools/arm_diablo_linux_gcc.py).
+        :param flags: the flags used for compilation.
+        :param source_file: the source file.
+        :param output_file: the object file to create.
+        :param context: a digest of everything else the compilation depends on (e.g. the headers).
+        :return: nothing.
+        """
+        key = hashlib.sha256(json.dumps([flags, source_file, self.digest(source_file), context]).encode()).hexdigest()
+        with self.lock:
+            cached = self.objects.get(key)
+            self.statistics['object_hits' if cached else 'object_misses'] += 1
+
+        # On a miss we compile and store the result, on a hit we copy the stored object file.
+        if cached is None:
+            compiler.create_object_file(flags, source_file, output_file)
+            cached = os.path.join(self.objects_directory, key + '.o')
+            shutil.copyfile(output_file, cached)
+            with self.lock:
+                self.objects[key] = cached
+        else:
+            logging.debug("Reusing cached object file for: " + source_file)
+            shutil.copyfile(cached, output_file)
+
+    def section_digests(self, objectfile, read):
+        """
+        Method used to get the digests of all sections of an object file, only reading object files not seen before.
+        :param objectfile: the object file.
+        :param read: the function used to digest the sections of an object file (see core/comparator.py).
+        :return: a dictionary {section: digest}.
+        """
+        key = self.digest(objectfile)
+        with self.lock:
+            digests = self.fingerprints.get(key)
+            self.statistics['fingerprint_hits' if digests is not None else 'fingerprint_misses'] += 1
+
+        if digests is None:
+            digests = read(objectfile)
+            with self.lock:
+                self.fingerprints[key] = digests
+        return digests
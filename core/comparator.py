@@ -0,0 +1,188 @@
+""" Module used for comparing the object files and sections of versions, as cheaply as possible. """
+import difflib
+import hashlib
+import threading
+
+import core.elf as elf
+import core.file as file
+import core.sections as sections
+
+# The digest of a section without contents.
+EMPTY_DIGEST = hashlib.sha256(b'').hexdigest()
+
+class Comparator:
+    """
+    Class which compares object files and their sections in tiers, every tier only handling what the
+    cheaper ones couldn't resolve:
+        1. object: the digests of two whole object files, all of their sections are equal when these match.
+        2. section_digest: the digests of the section contents, read in-process from the object files.
+        3. byte_dump: the dumps of the ELF reader, only used to explain (or classify) a difference in detail.
+    The number of comparisons every tier resolved is kept in the counters.
+    """
+
+    def __init__(self, elf_reader, cache=None):
+        """
+        Initialization of the comparator.
+        :param elf_reader: the ELF reader used for the detailed dumps.
+        :param cache: an optional cache that is kept warm across runs (see core/cache.py).
+        :return: nothing.
+        """
+        self.elf_reader = elf_reader
+        self.cache = cache
+
+        # The digests of all object files {object file: digest}.
+        self.digests = dict()
+        # The digests of the sections of all object files read {object file: {section: digest}}.
+        self.section_digests = dict()
+        # The relocations and mapping symbols of object files (see sections.read_object_information).
+        self.object_information = dict()
+        # The relocation aware digests of the sections of all object files read {object file: {section: digest}}.
+        self.relocation_aware_digests = dict()
+
+        self.counters = {'object': 0, 'section_digest': 0, 'byte_dump': 0}
+        # The number of section comparisons that found a difference.
+        self.differences = 0
+        self.lock = threading.Lock()
+
+    def count(self, tier):
+        with self.lock:
+            self.counters[tier] += 1
+
+    def export(self):
+        """
+        Method used to export the state of the comparator, e.g. to merge the work of another process into another comparator.
+        :return: a dictionary containing the digests and counters.
+        """
+        with self.lock:
+            return {'digests': dict(self.digests), 'section_digests': dict(self.section_digests), 'counters': dict(self.counters), 'differences': self.differences}
+
+    def merge(self, state):
+        """
+        Method used to merge the state of another comparator (see export) into this one, so the digests it
+        calculated are reused and its comparisons are counted.
+        :param state: the state of the other comparator.
+        :return: nothing.
+        """
+        with self.lock:
+            for tier, count in state['counters'].items():
+                self.counters[tier] += count
+            self.differences += state['differences']
+            self.digests.update(state['digests'])
+            self.section_digests.update(state['section_digests'])
+
+        if self.cache is not None:
+            for object_file, digests in state['section_digests'].items():
+                self.cache.section_digests(object_file, lambda object_file, digests=digests: digests)
+
+    def digest(self, object_file):
+        """
+        Method used to get the digest of an object file, every object file is hashed at most once.
+        :param object_file: the object file.
+        :return: the digest of the object file.
+        """
+        if self.cache is not None:
+            return self.cache.digest(object_file)
+
+        if object_file not in self.digests:
+            self.digests[object_file] = file.digest_file(object_file)
+        return self.digests[object_file]
+
+    def objects_equal(self, object_file_one, object_file_two):
+        """
+        Method used to compare two whole object files (tier 1).
+        :param object_file_one: the first object file.
+        :param object_file_two: the second object file.
+        :return: True if the object files are identical.
+        """
+        if self.digest(object_file_one) == self.digest(object_file_two):
+            self.count('object')
+            return True
+        return False
+
+    def read_section_digests(self, object_file):
+        """
+        Method used to digest all sections of an object file at once.
+        :param object_file: the object file.
+        :return: a dictionary {section: digest}.
+        """
+        return {section: hashlib.sha256(contents).hexdigest() for section, contents in elf.read_sections(object_file).items()}
+
+    def section_digest(self, section, object_file):
+        """
+        Method used to get the digest of the contents of a section. Two sections have the same
+        digest if and only if their contents (and so their dumps) are equal.
+        :param section: the name of the section.
+        :param object_file: the object file containing the section.
+        :return: the digest of the section.
+        """
+        if self.cache is not None:
+            digests = self.cache.section_digests(object_file, self.read_section_digests)
+        else:
+            if object_file not in self.section_digests:
+                self.section_digests[object_file] = self.read_section_digests(object_file)
+            digests = self.section_digests[object_file]
+
+        return digests.get(section, EMPTY_DIGEST)
+
+    def get_object_information(self, object_file):
+        if object_file not in self.object_information:
+            self.object_information[object_file] = sections.read_object_information(self.elf_reader, object_file)
+        return self.object_information[object_file]
+
+    def relocation_aware_digest(self, section, object_file):
+        """
+        Method used to get the digest of a section, in which relocated fields are replaced by their symbols and addends
+        (see sections.fingerprint_relocation_aware). Two sections have the same digest if and only if they are equal or
+        only differ in their relocations.
+        :param section: the name of the section.
+        :param object_file: the object file containing the section.
+        :return: the digest of the section.
+        """
+        if object_file not in self.relocation_aware_digests:
+            information = self.get_object_information(object_file)
+            self.relocation_aware_digests[object_file] = {name: sections.fingerprint_relocation_aware(name, contents, information)
+                                                          for name, contents in elf.read_sections(object_file).items()}
+        digests = self.relocation_aware_digests[object_file]
+        return digests[section] if section in digests else sections.fingerprint_relocation_aware(section, b'', self.get_object_information(object_file))
+
+    def sections_equal(self, section, object_file_one, object_file_two):
+        """
+        Method used to compare a section of two object files (tier 2).
+        :param section: the name of the section.
+        :param object_file_one: the first object file.
+        :param object_file_two: the second object file.
+        :return: True if the contents of the sections are equal.
+        """
+        self.count('section_digest')
+        if self.section_digest(section, object_file_one) == self.section_digest(section, object_file_two):
+            return True
+
+        with self.lock:
+            self.differences += 1
+        return False
+
+    def classify(self, section, object_file_one, object_file_two):
+        """
+        Method used to determine the kind of difference between two sections with different contents (tier 3).
+        :param section: the name of the section.
+        :param object_file_one: the first object file.
+        :param object_file_two: the second object file.
+        :return: the kind of difference (see sections.compare_relocation_aware).
+        """
+        self.count('byte_dump')
+        return sections.compare_relocation_aware(self.elf_reader, section, object_file_one, object_file_two,
+                                                 self.get_object_information(object_file_one), self.get_object_information(object_file_two))
+
+    def describe(self, section, object_file_one, object_file_two, context=2):
+        """
+        Method used to explain a difference between two sections in a human-readable way (tier 3).
+        :param section: the name of the section.
+        :param object_file_one: the first object file.
+        :param object_file_two: the second object file.
+        :param context: the number of unchanged lines shown around every difference.
+        :return: a unified diff of the dumps of both sections.
+        """
+        self.count('byte_dump')
+        dump_one = sections.dump(self.elf_reader, section, object_file_one).decode(errors='replace').splitlines()
+        dump_two = sections.dump(self.elf_reader, section, object_file_two).decode(errors='replace').splitlines()
+        return '\n'.join(difflib.unified_diff(dump_one, dump_two, object_file_one, object_file_two, n=context, lineterm=''))
@@ -0,0 +1,86 @@
+""" Module used for estimating the runtime cost of making functions mobile. """
+import logging
+import re
+
+def read_function_symbols(elf_reader, binary):
+    """
+    Method used to read the function symbols of a binary.
+    :param elf_reader: the ELF reader used to read the symbol table.
+    :param binary: the binary.
+    :return: a list of (start address, size, function name) tuples.
+    """
+    functions = []
+    for line in elf_reader.read_file(['-s', '-W'], binary).decode(errors='replace').splitlines():
+        # Num: Value Size Type Bind Vis Ndx Name
+        tokens = line.split()
+        if len(tokens) == 8 and tokens[3] == 'FUNC' and tokens[6].isdigit():
+            # The lowest bit of the address of a Thumb function is set.
+            functions.append((int(tokens[1], 16) & ~1, int(tokens[2], 0), tokens[7]))
+    return functions
+
+def read_profile(profile, functions=None):
+    """
+    Method used to read an execution profile into a number of calls per function. Two formats are supported:
+        - a function profile, one 'function count' pair per line (separated by whitespace or a comma).
+        - an address profile, one 'address count' pair per line (e.g. the plaintext profiles produced by the
+          self-profiling BLP00 step). The count of the block at the start of a function is its number of calls.
+    :param profile: the profile file.
+    :param functions: the function symbols of the profiled binary (see read_function_symbols), for address profiles.
+    :return: a dictionary {function name: number of calls}.
+    """
+    starts = {start: name for start, _, name in functions} if functions else dict()
+
+    counts = dict()
+    with open(profile, 'r') as fp:
+        for line in fp:
+            tokens = re.split(r'[\s,]+', line.strip())
+            if len(tokens) < 2 or not tokens[1].isdigit():
+                continue
+
+            # Address profiles only contribute the counts of blocks that start a function.
+            if tokens[0].startswith('0x'):
+                name = starts.get(int(tokens[0], 16))
+                if name is None:
+                    continue
+            else:
+                name = tokens[0]
+
+            counts[name] = counts.get(name, 0) + int(tokens[1])
+
+    logging.debug('Read profile ' + profile + ' containing ' + str(len(counts)) + ' functions.')
+    return counts
+
+def evaluate(candidates, counts, sizes, config):
+    """
+    Method used to evaluate the cost of making a number of functions mobile. Every call to a mobile
+    function goes through an indirection, and every byte of a mobile function has to be downloaded.
+    :param candidates: the (function, object file) tuples that are to be made mobile.
+    :param counts: the number of calls per function (see read_profile).
+    :param sizes: the size per (function, object file).
+    :param config: the COST_MODEL configuration dictionary.
+    :return: a report of the candidates, ranked from the most to the least expensive.
+    """
+    ranked = []
+    for function, object_file in candidates:
+        calls = counts.get(function, 0)
+        size = sizes.get((function, object_file), 0)
+        cost = calls * config['call_overhead'] + size * config['byte_overhead']
+        ranked.append({'name': function, 'object_file': object_file, 'calls': calls, 'size': size, 'cost': cost,
+                       'hot': calls >= config['hot_threshold']})
+    ranked.sort(key=lambda candidate: (-candidate['cost'], candidate['name'], candidate['object_file']))
+
+    # Determine which candidates fit within the budget, taking the cheapest ones first.
+    cumulative = 0.0
+    for candidate in reversed(ranked):
+        cumulative += candidate['cost']
+        candidate['cumulative_cost'] = cumulative
+        candidate['within_budget'] = not config['budget'] or cumulative <= config['budget']
+
+    report = dict()
+    report['budget'] = config['budget']
+    report['total_cost'] = cumulative
+    report['over_budget'] = bool(config['budget']) and cumulative > config['budget']
+    report['hot_functions'] = [candidate['name'] for candidate in ranked if candidate['hot']]
+    report['flagged'] = report['over_budget'] or bool(report['hot_functions'])
+    report['candidates'] = ranked
+    return report
@@ -0,0 +1,188 @@
+""" Module used for creating and verifying delta packages of the mobile blocks of versions. """
+import difflib
+import hashlib
+import io
+import json
+import os
+import struct
+import tarfile
+import zlib
+
+# The kinds of entries in a delta package.
+UNCHANGED = 'unchanged'
+DELTA = 'delta'
+FULL = 'full'
+REMOVED = 'removed'
+
+# The instructions of a delta: copy a range of the old block, or insert new bytes.
+COPY = b'C'
+INSERT = b'I'
+RANGE = struct.Struct('<II')
+LENGTH = struct.Struct('<I')
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+def diff(old, new):
+    """
+    Method used to compute the binary delta of two blocks.
+    :param old: the contents of the old block.
+    :param new: the contents of the new block.
+    :return: the (compressed) delta, which turns the old block into the new one (see patch).
+    """
+    delta = bytearray()
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == 'equal':
+            delta += COPY + RANGE.pack(old_start, old_end - old_start)
+        elif new_end > new_start:
+            delta += INSERT + LENGTH.pack(new_end - new_start) + new[new_start:new_end]
+    return zlib.compress(bytes(delta), 9)
+
+def patch(old, delta):
+    """
+    Method used to apply a binary delta to a block.
+    :param old: the contents of the old block.
+    :param delta: the delta (see diff).
+    :return: the contents of the new block.
+    """
+    delta = zlib.decompress(delta)
+    new = bytearray()
+    offset = 0
+    while offset < len(delta):
+        instruction = delta[offset:offset + 1]
+        offset += 1
+        if instruction == COPY:
+            start, length = RANGE.unpack_from(delta, offset)
+            offset += RANGE.size
+            new += old[start:start + length]
+        else:
+            assert instruction == INSERT, 'Invalid delta instruction!'
+            length, = LENGTH.unpack_from(delta, offset)
+            offset += LENGTH.size
+            new += delta[offset:offset + length]
+            offset += length
+    return bytes(new)
+
+def read_blocks(directory):
+    """
+    Method used to read all mobile blocks of a version.
+    :param directory: the mobile blocks directory of the version.
+    :return: a dictionary {block name (relative to the directory): contents}.
+    """
+    blocks = dict()
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                blocks[os.path.relpath(path, directory)] = f.read()
+    return blocks
+
+def create_package(old_directory, new_directory, package_path):
+    """
+    Method used to create the delta package that turns the mobile blocks of one version into those of another.
+    Every block is either unchanged, a delta against the block with the same name, or included in full when
+    it is new or its delta isn't smaller than the compressed block itself. The package is a tar archive of
+    an index and the data of all entries. Every entry records the size of the compressed block, which is what
+    a client without the old version has to transfer.
+    :param old_directory: the mobile blocks directory of the version the client has.
+    :param new_directory: the mobile blocks directory of the version the client moves to.
+    :param package_path: the path of the package to create.
+    :return: the index of the package.
+    """
+    old_blocks = read_blocks(old_directory)
+    new_blocks = read_blocks(new_directory)
+
+    entries = []
+    data = dict()
+    for name in sorted(new_blocks):
+        new = new_blocks[name]
+        full = zlib.compress(new, 9)
+        entry = {'name': name, 'size': len(new), 'compressed_size': len(full), 'digest': digest(new)}
+        old = old_blocks.get(name)
+        if old is not None and old == new:
+            entry['kind'] = UNCHANGED
+        else:
+            delta = diff(old, new) if old is not None else None
+            if delta is not None and len(delta) < len(full):
+                entry['kind'] = DELTA
+                entry['base_digest'] = digest(old)
+                data[name] = delta
+            else:
+                entry['kind'] = FULL
+                data[name] = full
+        entry['transfer_size'] = len(data.get(name, b''))
+        entries.append(entry)
+    for name in sorted(set(old_blocks) - set(new_blocks)):
+        entries.append({'name': name, 'kind': REMOVED, 'transfer_size': 0})
+
+    index = {'blocks': entries}
+    os.makedirs(os.path.dirname(package_path), exist_ok=True)
+    with tarfile.open(package_path, 'w') as tar:
+        def add(name, contents):
+            info = tarfile.TarInfo(name)
+            info.size = len(contents)
+            tar.addfile(info, io.BytesIO(contents))
+
+        add('index.json', json.dumps(index, indent=2).encode())
+        for name in sorted(data):
+            add(os.path.join('blocks', name), data[name])
+
+    return index
+
+def read_package(package_path):
+    """
+    Method used to read a delta package.
+    :param package_path: the package.
+    :return: the index of the package, and a dictionary {block name: data}.
+    """
+    with tarfile.open(package_path, 'r') as tar:
+        index = json.load(tar.extractfile('index.json'))
+        data = {entry['name']: tar.extractfile(os.path.join('blocks', entry['name'])).read()
+                for entry in index['blocks'] if entry['kind'] in [DELTA, FULL]}
+    return (index, data)
+
+def apply_package(old_blocks, package_path):
+    """
+    Method used to apply a delta package to the mobile blocks of a version.
+    :param old_blocks: the mobile blocks of the version the package was created against (see read_blocks).
+    :param package_path: the package.
+    :return: the mobile blocks of the version the package moves to.
+    """
+    index, data = read_package(package_path)
+    new_blocks = dict()
+    for entry in index['blocks']:
+        if entry['kind'] == UNCHANGED:
+            new_blocks[entry['name']] = old_blocks[entry['name']]
+        elif entry['kind'] == DELTA:
+            assert digest(old_blocks[entry['name']]) == entry['base_digest'], 'Block ' + entry['name'] + ' differs from the base of its delta!'
+            new_blocks[entry['name']] = patch(old_blocks[entry['name']], data[entry['name']])
+        elif entry['kind'] == FULL:
+            new_blocks[entry['name']] = zlib.decompress(data[entry['name']])
+    return new_blocks
+
+def verify_package(old_directory, new_directory, package_path):
+    """
+    Method used to verify a delta package: applied to the old mobile blocks, it has to result in exactly the new ones.
+    :param old_directory: the mobile blocks directory of the version the package was created against.
+    :param new_directory: the mobile blocks directory of the version the package moves to.
+    :param package_path: the package.
+    :return: a list of the blocks that are wrong, missing or superfluous (empty if the package is correct).
+    """
+    new_blocks = read_blocks(new_directory)
+    patched_blocks = apply_package(read_blocks(old_directory), package_path)
+    return sorted(name for name in set(new_blocks) | set(patched_blocks) if new_blocks.get(name) != patched_blocks.get(name))
+
+def summarize(index):
+    """
+    Method used to summarize the savings of a delta package.
+    :param index: the index of the package (see create_package).
+    :return: a dictionary containing the number of blocks of every kind, the (compressed) size of the full mobile
+    block set, the size to transfer, and the fraction saved. The transferred data is compressed, so the savings are
+    relative to transferring all blocks compressed.
+    """
+    summary = {kind: len([entry for entry in index['blocks'] if entry['kind'] == kind]) for kind in [UNCHANGED, DELTA, FULL, REMOVED]}
+    summary['full_size'] = sum(entry['compressed_size'] for entry in index['blocks'] if entry['kind'] != REMOVED)
+    summary['transfer_size'] = sum(entry['transfer_size'] for entry in index['blocks'])
+    summary['savings'] = 1.0 - summary['transfer_size'] / summary['full_size'] if summary['full_size'] else 0.0
+    return summary
@@ -0,0 +1,48 @@
+""" Module used for reading the sections of ELF files in-process, without invoking an ELF reader. """
+import struct
+
+# Section type of sections that occupy no space in the file (e.g. .bss).
+SHT_NOBITS = 8
+
+def read_sections(path):
+    """
+    Method used to read the contents of all sections of an ELF file. Sections that occupy no space in the
+    file have empty contents, like in the dumps of the ELF reader. The contents of multiple sections with
+    the same name are concatenated.
+    :param path: the ELF file.
+    :return: a dictionary {section name: contents}.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    assert data[:4] == b'\x7fELF', path + ' is not an ELF file!'
+    is_64 = data[4] == 2
+    endian = '<' if data[5] == 1 else '>'
+
+    # The location of the section header table, and the index of the section containing the section names.
+    if is_64:
+        shoff, = struct.unpack_from(endian + 'Q', data, 0x28)
+        shentsize, shnum, shstrndx = struct.unpack_from(endian + 'HHH', data, 0x3A)
+        header_format = endian + 'IIQQQQIIQQ'
+    else:
+        shoff, = struct.unpack_from(endian + 'I', data, 0x20)
+        shentsize, shnum, shstrndx = struct.unpack_from(endian + 'HHH', data, 0x2E)
+        header_format = endian + 'IIIIIIIIII'
+
+    # With many sections, their number and the index of the section names are stored in the first section header.
+    if shoff and (shnum == 0 or shstrndx == 0xFFFF):
+        first = struct.unpack_from(header_format, data, shoff)
+        shnum = shnum if shnum else first[5]
+        shstrndx = shstrndx if shstrndx != 0xFFFF else first[6]
+
+    # name, type, flags, address, offset, size, link, info, alignment, entry size
+    headers = [struct.unpack_from(header_format, data, shoff + idx * shentsize) for idx in range(shnum)] if shoff else []
+    names_offset = headers[shstrndx][4] if headers else 0
+
+    sections = dict()
+    for name, section_type, _, _, offset, size, _, _, _, _ in headers[1:]:
+        name = data[names_offset + name:data.index(b'\x00', names_offset + name)].decode(errors='replace')
+        contents = b'' if section_type == SHT_NOBITS else data[offset:offset + size]
+        sections[name] = sections.get(name, b'') + contents
+
+    return sections
@@ -1,6 +1,7 @@
 """
 Module used for file related functionality.
 """
+import hashlib
 import json
 import os
 import shutil
@@ -111,6 +112,18 @@ def change_suffix_file(file_name, new_suffix):
     """
     return file_name.rsplit(sep='.', maxsplit=1)[0] + new_suffix
 
+def digest_file(path):
+    """
+    Method used to calculate the digest of the contents of a file.
+    :param path: the file.
+    :return: the hexadecimal SHA-256 digest of the file.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for block in iter(lambda: fp.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
 def read_json(full_path):
     """
     Method used to read a JSON file.
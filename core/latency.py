@@ -0,0 +1,189 @@
+""" Module used for measuring the latency of downloading mobile blocks, from a local stand-in for the code mobility server. """
+import concurrent.futures
+import http.server
+import os
+import socketserver
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import core.benchmark as benchmark
+
+# The size of the chunks in which a block is sent.
+CHUNK_SIZE = 4096
+
+class BlockServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """
+    Class which serves the mobile blocks of a version over HTTP, like the code mobility server (see COMPILE_ACCL in
+    templates/actc_config.template). Every block is sent after a fixed latency and at a limited bandwidth, and only
+    a limited number of blocks is sent at the same time, the other requests have to wait.
+    """
+    daemon_threads = True
+
+    def __init__(self, directory, latency, bandwidth, concurrency):
+        """
+        Initialization of the server, which listens on a free local port.
+        :param directory: the mobile blocks directory.
+        :param latency: the time in seconds before a block is sent.
+        :param bandwidth: the bandwidth in bytes per second of every block that is sent (unlimited if 0).
+        :param concurrency: the maximal number of blocks sent at the same time (unlimited if 0).
+        :return: nothing.
+        """
+        super().__init__(('localhost', 0), BlockRequestHandler)
+        self.directory = os.path.abspath(directory)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.slots = threading.BoundedSemaphore(concurrency) if concurrency else None
+
+    def get_url(self):
+        return 'http://localhost:' + str(self.server_address[1])
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+class BlockRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Class handling the requests to the server:
+        GET /<block>    the contents of a block (its path relative to the mobile blocks directory)
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        path = os.path.abspath(os.path.join(server.directory, urllib.parse.unquote(self.path.lstrip('/'))))
+        if not path.startswith(server.directory + os.sep) or not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        if server.slots is not None:
+            server.slots.acquire()
+        try:
+            with open(path, 'rb') as f:
+                contents = f.read()
+            time.sleep(server.latency)
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(contents)))
+            self.end_headers()
+
+            # Every chunk is only sent once the previous ones would have arrived at the given bandwidth.
+            start = time.time()
+            for offset in range(0, len(contents), CHUNK_SIZE):
+                if server.bandwidth:
+                    time.sleep(max(0.0, start + offset / server.bandwidth - time.time()))
+                self.wfile.write(contents[offset:offset + CHUNK_SIZE])
+            if server.bandwidth:
+                time.sleep(max(0.0, start + len(contents) / server.bandwidth - time.time()))
+            self.wfile.flush()
+        finally:
+            if server.slots is not None:
+                server.slots.release()
+
+def get_blocks(directory):
+    # The names of all mobile blocks in a mobile blocks directory, relative to it.
+    return sorted(os.path.relpath(os.path.join(root, name), directory) for root, _, names in os.walk(directory) for name in names)
+
+def read_sequence(sequence_file):
+    """
+    Method used to read a sequence of block requests, e.g. recorded during a test run. Every line contains the name
+    of a requested block, empty lines and lines starting with # are ignored.
+    :param sequence_file: the file.
+    :return: a list of block names.
+    """
+    with open(sequence_file, 'r') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+def synthesize_sequence(blocks, mobile_functions):
+    """
+    Method used to synthesize a sequence of block requests from the mobile functions: the blocks of every mobile
+    function (those whose name contains the name of the function) are requested in the order of the functions,
+    followed by the blocks that can't be attributed to a function. Every block is requested once.
+    :param blocks: the names of the mobile blocks (see get_blocks).
+    :param mobile_functions: the names of the mobile functions (e.g. from analytics.json).
+    :return: a list of block names.
+    """
+    sequence = []
+    for function in mobile_functions:
+        sequence += [block for block in blocks if function in os.path.basename(block) and block not in sequence]
+    return sequence + [block for block in blocks if block not in sequence]
+
+def replay(url, sequence):
+    """
+    Method used to replay a sequence of block requests as a single client. Like the code mobility runtime, the client
+    keeps the blocks it downloaded, so only the first request for every block is sent to the server.
+    :param url: the URL of the server.
+    :param sequence: the names of the requested blocks, in order.
+    :return: a list of (block, latency) tuples for the downloaded blocks, and the time needed to download all of them.
+    """
+    downloaded = set()
+    latencies = []
+    start = time.time()
+    for block in sequence:
+        if block in downloaded:
+            continue
+        block_start = time.time()
+        with urllib.request.urlopen(url + '/' + urllib.parse.quote(block)) as response:
+            response.read()
+        latencies.append((block, time.time() - block_start))
+        downloaded.add(block)
+    return (latencies, time.time() - start)
+
+def measure(directory, sequence, latency, bandwidth, concurrency, clients, repetitions):
+    """
+    Method used to measure the download latency of the mobile blocks of a version. A stand-in server serves the blocks,
+    and a number of clients replay the sequence of block requests at the same time, starting without any block.
+    :param directory: the mobile blocks directory of the version.
+    :param sequence: the names of the requested blocks, in order.
+    :param latency: the time in seconds before the server sends a block.
+    :param bandwidth: the bandwidth in bytes per second of every block the server sends (unlimited if 0).
+    :param concurrency: the maximal number of blocks the server sends at the same time (unlimited if 0).
+    :param clients: the number of clients.
+    :param repetitions: the number of times the clients replay the sequence.
+    :return: a dictionary containing the distribution of the latency per block (and of every block), and of the cold
+    start latency: the time a client needs to download all blocks of the sequence.
+    """
+    missing = sorted(block for block in set(sequence) if not os.path.isfile(os.path.join(directory, block)))
+    assert not missing, 'Blocks requested that are not in ' + directory + ': ' + ', '.join(missing)
+    sizes = {block: os.path.getsize(os.path.join(directory, block)) for block in set(sequence)}
+    block_latencies = dict()
+    cold_starts = []
+
+    server = BlockServer(directory, latency, bandwidth, concurrency)
+    server.start()
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=clients) as pool:
+            for _ in range(repetitions):
+                for (latencies, cold_start) in pool.map(lambda _: replay(server.get_url(), sequence), range(clients)):
+                    for block, block_latency in latencies:
+                        block_latencies.setdefault(block, []).append(block_latency)
+                    cold_starts.append(cold_start)
+    finally:
+        server.stop()
+
+    all_latencies = [block_latency for latencies in block_latencies.values() for block_latency in latencies]
+    result = dict()
+    result['blocks'] = len(sizes)
+    result['requests'] = len(sequence)
+    result['bytes'] = sum(sizes.values())
+    result['block_latency'] = describe(all_latencies)
+    result['cold_start'] = describe(cold_starts)
+    result['per_block'] = {block: dict(describe(latencies), size=sizes[block]) for block, latencies in sorted(block_latencies.items())}
+    return result
+
+def describe(values):
+    # The distribution of latencies, including the tail.
+    if not values:
+        return {'samples': 0}
+    description = benchmark.describe(values)
+    description['p90'] = benchmark.percentile(values, 0.9)
+    description['p99'] = benchmark.percentile(values, 0.99)
+    return description
@@ -0,0 +1,177 @@
+""" Module used for precompiling the system headers that all translation units of a version include first. """
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import threading
+
+import core.elf as elf
+import core.file as file
+
+# A line including a system header.
+SYSTEM_INCLUDE = re.compile(r'\s*#\s*include\s*<[^>]+>\s*$')
+
+def get_leading_includes(source_file):
+    """
+    Method used to get the system headers a source file includes before anything else.
+    :param source_file: the source file.
+    :return: a list of the include lines (normalized), in order.
+    """
+    includes = []
+    in_comment = False
+    with open(source_file, 'r', errors='replace') as f:
+        for line in f:
+            stripped = line.strip()
+
+            # Comments and empty lines don't end the leading includes.
+            if in_comment:
+                in_comment = '*/' not in stripped
+                continue
+            if not stripped or stripped.startswith('//'):
+                continue
+            if stripped.startswith('/*'):
+                in_comment = '*/' not in stripped
+                continue
+
+            if not SYSTEM_INCLUDE.match(stripped):
+                break
+            includes.append(re.sub(r'\s+', '', stripped).replace('#include', '#include '))
+    return includes
+
+def get_common_includes(source_files):
+    """
+    Method used to get the system headers all source files include first, in the same order. Including these
+    through a precompiled header before the source file doesn't change the source file, as system headers are
+    guarded against being included again.
+    :param source_files: the source files.
+    :return: a list of include lines.
+    """
+    common = None
+    for source_file in source_files:
+        includes = get_leading_includes(source_file)
+        if common is None:
+            common = includes
+        else:
+            length = 0
+            while length < min(len(common), len(includes)) and common[length] == includes[length]:
+                length += 1
+            common = common[:length]
+        if not common:
+            return []
+    return common if common else []
+
+def get_relevant_sections(object_file):
+    # The contents of all sections, except for the debug information (which refers to the precompiled header).
+    return {name: contents for name, contents in elf.read_sections(object_file).items() if '.debug' not in name}
+
+class PrecompiledHeaders:
+    """
+    Class which builds a precompiled header for every distinct set of common system headers (and compilation
+    flags), and uses it for compiling the translation units. Every translation unit is verified the first time
+    it is compiled with a precompiled header: compiled with and without it, it has to result in identical
+    sections. Otherwise precompiled headers are disabled for the rest of the run.
+    """
+
+    def __init__(self, compiler, directory):
+        """
+        Initialization of the precompiled headers.
+        :param compiler: the compiler (see core/tools/arm_diablo_linux_gcc.py).
+        :param directory: the directory in which the precompiled headers are built.
+        :return: nothing.
+        """
+        self.compiler = compiler
+        self.directory = directory
+        self.enabled = True
+
+        # {key: precompiled header, or None if it can't be used}
+        self.headers = dict()
+        # The (precompiled header, source file digest, context) tuples that were verified. The source files of all
+        # versions are compiled through the same path, so they are told apart by their contents.
+        self.verified = set()
+        self.statistics = {'built': 0, 'reused': 0, 'failed': 0, 'verified': 0, 'mismatches': 0}
+        self.lock = threading.Lock()
+
+    def get_flags(self, flags, source_files):
+        """
+        Method used to get the flags to compile source files with their precompiled header. The object files
+        compiled with these flags have to be verified afterwards (see verify).
+        :param flags: the flags used for compilation.
+        :param source_files: the source files (e.g. all source files of a version).
+        :return: the additional flags, which are empty when no precompiled header can be used.
+        """
+        if not self.enabled or not source_files:
+            return []
+        includes = get_common_includes(source_files)
+        if not includes:
+            return []
+
+        key = hashlib.sha256(json.dumps([flags, includes]).encode()).hexdigest()
+        with self.lock:
+            if key in self.headers:
+                self.statistics['reused'] += 1
+            else:
+                self.headers[key] = self.build(key, flags, includes)
+            header = self.headers[key]
+            return ['-include-pch', header] if header is not None and self.enabled else []
+
+    def build(self, key, flags, includes):
+        """
+        Method used to build a precompiled header.
+        :param key: the key of the precompiled header.
+        :param flags: the flags used for compilation.
+        :param includes: the include lines of the header.
+        :return: the precompiled header, or None if it can't be built.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        header_file = os.path.join(self.directory, key + '.h')
+        with open(header_file, 'w') as f:
+            f.write('\n'.join(includes) + '\n')
+        precompiled_header = header_file + '.pch'
+
+        try:
+            self.compiler.create_precompiled_header(flags, header_file, precompiled_header)
+        except subprocess.CalledProcessError:
+            logging.debug('Could not build precompiled header ' + precompiled_header + '.')
+            self.statistics['failed'] += 1
+            return None
+        self.statistics['built'] += 1
+        return precompiled_header
+
+    def verify(self, pch_flags, source_files, object_files, context, compile):
+        """
+        Method used to verify the object files of translation units compiled with a precompiled header. The translation
+        units that weren't verified yet are compiled without it as well, and their sections have to be identical.
+        :param pch_flags: the flags of the precompiled header (see get_flags).
+        :param source_files: the source files.
+        :param object_files: the object files they were compiled into with the precompiled header.
+        :param context: a digest of everything else the compilation depends on (e.g. the headers).
+        :param compile: the function used to compile source files into object files without precompiled header, like
+        the version itself is compiled (e.g. through the cache).
+        :return: whether the object files are identical, if not precompiled headers are disabled and the source
+        files have to be compiled again without precompiled header.
+        """
+        header = pch_flags[-1]
+        keys = [(header, file.digest_file(source_file), context) for source_file in source_files]
+        with self.lock:
+            unverified = [idx for idx, key in enumerate(keys) if key not in self.verified]
+        if not unverified:
+            return True
+
+        with tempfile.TemporaryDirectory(dir=self.directory) as directory:
+            without_pch = [os.path.join(directory, str(idx) + '.o') for idx in unverified]
+            compile([source_files[idx] for idx in unverified], without_pch)
+            for idx, object_file in zip(unverified, without_pch):
+                if get_relevant_sections(object_files[idx]) != get_relevant_sections(object_file):
+                    logging.warning('Compiling ' + source_files[idx] + ' with precompiled header ' + header + ' changes its sections, disabling precompiled headers.')
+                    with self.lock:
+                        self.statistics['mismatches'] += 1
+                        self.enabled = False
+                    return False
+
+        with self.lock:
+            self.verified.update(keys[idx] for idx in unverified)
+            self.statistics['verified'] += len(unverified)
+        return True
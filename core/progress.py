@@ -0,0 +1,94 @@
+""" Module used for emitting structured progress events of long runs, to follow them live (see dashboard.py). """
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+# The stream the events are written to (None if no events are requested).
+stream = None
+lock = threading.Lock()
+# The job the events of the current thread belong to.
+current = threading.local()
+
+def open_stream(destination):
+    """
+    Method used to open the stream the events are written to. The destination is either a JSON Lines file which
+    the events are appended to, or a socket a dashboard is listening on (unix:<path> or tcp:<host>:<port>).
+    :param destination: the destination (no events are emitted if empty).
+    :return: nothing.
+    """
+    global stream
+    close()
+    if not destination:
+        return
+
+    try:
+        if destination.startswith('unix:'):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(destination[len('unix:'):])
+            new_stream = connection.makefile('w')
+        elif destination.startswith('tcp:'):
+            (host, port) = destination[len('tcp:'):].rsplit(':', 1)
+            new_stream = socket.create_connection((host, int(port))).makefile('w')
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+            new_stream = open(destination, 'a')
+    except OSError as e:
+        logging.warning('Could not open the progress events stream ' + destination + ': ' + str(e))
+        return
+
+    with lock:
+        stream = new_stream
+
+def close():
+    global stream
+    with lock:
+        if stream is not None:
+            try:
+                stream.close()
+            except OSError:
+                pass
+        stream = None
+
+def set_job(job):
+    """
+    Method used to set the job the events of the current thread belong to.
+    :param job: the name of the job (see get_job_name), or None.
+    :return: nothing.
+    """
+    current.job = job
+
+def get_job():
+    return getattr(current, 'job', None)
+
+def get_job_name(job):
+    # The name identifying a job of a sweep in the events (see main.get_jobs), benchmarks of a batch are identified by their name.
+    return job.get('name', job['benchmark']) + '/' + job['transformation_type'] + '/' + str(job['seed']) + '/' + str(job['nr_of_versions'])
+
+def emit(event, fields=None):
+    """
+    Method used to emit an event, as a single line of JSON. Every event contains its time, the process and the
+    job it belongs to. When the stream breaks (e.g. the dashboard was closed), no more events are emitted.
+    :param event: the kind of event.
+    :param fields: a dictionary of additional fields.
+    :return: nothing.
+    """
+    global stream
+    if stream is None:
+        return
+
+    data = {'event': event, 'time': time.time(), 'pid': os.getpid(), 'job': get_job()}
+    if fields:
+        data.update(fields)
+    line = json.dumps(data) + '\n'
+    with lock:
+        if stream is None:
+            return
+        try:
+            stream.write(line)
+            stream.flush()
+        except OSError as e:
+            logging.warning('Progress events stream broken, no longer emitting events: ' + str(e))
+            stream = None
@@ -0,0 +1,147 @@
+""" Module used for storing the results of runs in an SQLite database, so they can be queried across sweeps. """
+import contextlib
+import csv
+import logging
+import sqlite3
+import time
+
+# The columns of the runs table that can be used to filter runs.
+FILTERS = ['benchmark', 'seed', 'nr_of_versions', 'transformation_type']
+
+class ResultsDatabase:
+    """
+    Class representing the results database. Every run is stored with its summary, together with the
+    mobility of every function. Multiple runs can ingest their results concurrently: every run is ingested in a
+    single transaction, and the writers are serialized by SQLite's file locks. The database may be on shared
+    storage (e.g. next to a work queue), as long as its file system implements these locks.
+    """
+
+    def __init__(self, path):
+        """
+        Initialization of the results database.
+        :param path: the path of the database.
+        :return: nothing.
+        """
+        self.path = path
+
+        # We use the rollback journal (switching back databases that used write-ahead logging): write-ahead logging
+        # needs shared memory between all processes using the database, which doesn't work on network file systems.
+        with contextlib.closing(self.connect()) as connection:
+            connection.execute('PRAGMA journal_mode=DELETE')
+            connection.execute('''CREATE TABLE IF NOT EXISTS runs (
+                                      id INTEGER PRIMARY KEY,
+                                      benchmark TEXT NOT NULL,
+                                      seed INTEGER NOT NULL,
+                                      nr_of_versions INTEGER NOT NULL,
+                                      transformation_type TEXT NOT NULL,
+                                      mode INTEGER NOT NULL,
+                                      output_directory TEXT NOT NULL,
+                                      result INTEGER NOT NULL,
+                                      rejected TEXT,
+                                      amount_functions INTEGER,
+                                      amount_mobile INTEGER,
+                                      timestamp REAL NOT NULL)''')
+            connection.execute('''CREATE TABLE IF NOT EXISTS functions (
+                                      run INTEGER NOT NULL REFERENCES runs (id),
+                                      name TEXT NOT NULL,
+                                      object_file TEXT NOT NULL,
+                                      mobile INTEGER NOT NULL)''')
+            for column in FILTERS:
+                connection.execute('CREATE INDEX IF NOT EXISTS runs_' + column + ' ON runs (' + column + ')')
+            connection.execute('CREATE INDEX IF NOT EXISTS functions_run ON functions (run)')
+            connection.execute('CREATE INDEX IF NOT EXISTS functions_name ON functions (name, object_file)')
+
+    def connect(self):
+        """
+        Method used to open a connection to the database. Transactions are started explicitly.
+        :return: the connection.
+        """
+        connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def ingest(self, run, analytics=None):
+        """
+        Method used to store the results of a run, in a single transaction.
+        :param run: a dictionary describing the run (see the columns of the runs table).
+        :param analytics: the analytics of the run (see Executor.analyze), if it wasn't rejected.
+        :return: the id of the run.
+        """
+        run = dict(run)
+        run['timestamp'] = time.time()
+        run['amount_functions'] = analytics['general']['amount_functions'] if analytics else None
+        run['amount_mobile'] = analytics['general']['amount_mobile'] if analytics else None
+        functions = analytics['functions'] if analytics else []
+
+        with contextlib.closing(self.connect()) as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            run_id = connection.execute('''INSERT INTO runs (benchmark, seed, nr_of_versions, transformation_type, mode, output_directory, result, rejected, amount_functions, amount_mobile, timestamp)
+                                           VALUES (:benchmark, :seed, :nr_of_versions, :transformation_type, :mode, :output_directory, :result, :rejected, :amount_functions, :amount_mobile, :timestamp)''', run).lastrowid
+            connection.executemany('INSERT INTO functions (run, name, object_file, mobile) VALUES (?, ?, ?, ?)',
+                                   ((run_id, function['name'], function['obj_file'], function['mobile']) for function in functions))
+            connection.execute('COMMIT')
+
+        logging.debug('Ingested run ' + str(run_id) + ' with ' + str(len(functions)) + ' functions into ' + self.path + '.')
+        return run_id
+
+    def where(self, filters):
+        """
+        Method used to build the WHERE clause selecting runs.
+        :param filters: a dictionary {column: value} (see FILTERS), columns with a value of None are not filtered on.
+        :return: the clause and its parameters.
+        """
+        columns = [column for column in FILTERS if filters.get(column) is not None]
+        clause = ' AND '.join(['runs.' + column + ' = ?' for column in columns])
+        return (' WHERE ' + clause if clause else '', [filters[column] for column in columns])
+
+    def runs(self, filters):
+        """
+        Method used to query the stored runs.
+        :param filters: a dictionary {column: value} (see FILTERS).
+        :return: a cursor over the runs.
+        """
+        clause, parameters = self.where(filters)
+        return self.connect().execute('SELECT * FROM runs' + clause + ' ORDER BY id', parameters)
+
+    def functions(self, filters):
+        """
+        Method used to query the mobility of every function in every stored run.
+        :param filters: a dictionary {column: value} (see FILTERS).
+        :return: a cursor over the functions, together with the run they're from.
+        """
+        clause, parameters = self.where(filters)
+        return self.connect().execute('''SELECT runs.id AS run, runs.benchmark, runs.seed, runs.nr_of_versions, runs.transformation_type,
+                                                functions.name, functions.object_file, functions.mobile
+                                         FROM functions JOIN runs ON functions.run = runs.id''' + clause + '''
+                                         ORDER BY runs.id''', parameters)
+
+    def mobility(self, filters, threshold=0.0):
+        """
+        Method used to query how often every function is mobile, over the runs that weren't rejected.
+        :param filters: a dictionary {column: value} (see FILTERS).
+        :param threshold: the minimal fraction of runs in which a function must be mobile.
+        :return: a cursor over the functions, the most often mobile first.
+        """
+        clause, parameters = self.where(filters)
+        return self.connect().execute('''SELECT runs.benchmark, functions.name, functions.object_file, COUNT(*) AS runs,
+                                                SUM(functions.mobile) AS mobile, AVG(functions.mobile) AS fraction
+                                         FROM functions JOIN runs ON functions.run = runs.id''' + clause + '''
+                                         GROUP BY runs.benchmark, functions.name, functions.object_file
+                                         HAVING AVG(functions.mobile) >= ?
+                                         ORDER BY fraction DESC, runs.benchmark, functions.name, functions.object_file''', parameters + [threshold])
+
+    def export(self, cursor, output_file):
+        """
+        Method used to export the result of a query as a CSV file. Rows are streamed, not loaded into memory.
+        :param cursor: the cursor over the result of the query.
+        :param output_file: the CSV file.
+        :return: the number of rows exported.
+        """
+        with open(output_file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([column[0] for column in cursor.description])
+            rows = 0
+            for row in cursor:
+                writer.writerow(row)
+                rows += 1
+        return rows
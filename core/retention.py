@@ -0,0 +1,132 @@
+""" Module used for staging runs in a scratch directory, and retaining only part of their artifacts. """
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+
+import core.file as file
+import core.store as store
+import core.tools.actc as actc
+
+# The retention policies, from the least to the most artifacts retained.
+POLICIES = ['results', 'binaries', 'everything']
+
+def create_scratch_directory(scratch_directory):
+    """
+    Method used to create a fresh directory to stage a run in.
+    :param scratch_directory: the directory in which scratch directories are created (e.g. on a tmpfs).
+    :return: the path of the created directory.
+    """
+    os.makedirs(scratch_directory, exist_ok=True)
+    return tempfile.mkdtemp(prefix='sr_', dir=scratch_directory)
+
+def select(directory, policy, binary_name):
+    """
+    Method used to select the artifacts of a run that are retained by a policy:
+        - results: the files in the output directory (analytics, results, ...) and the ACTC directory (logs and
+          configurations), the test results, and the artifact store (see core/store.py).
+        - binaries: the results, and the protected binary and mobile blocks of every version.
+        - everything: all artifacts.
+    The source directories of the versions are always retained as long as their fingerprints are (fingerprints.json),
+    as appending versions to the set may have to rebuild them.
+    :param directory: the output directory of the run.
+    :param policy: the retention policy.
+    :param binary_name: the name of the protected binaries.
+    :return: a list of the paths (relative to the directory) that are retained.
+    """
+    assert policy in POLICIES, 'Unknown retention policy ' + policy + '!'
+    if policy == 'everything':
+        return os.listdir(directory)
+
+    retained = [entry for entry in os.listdir(directory) if os.path.isfile(os.path.join(directory, entry))]
+    if os.path.isdir(os.path.join(directory, 'testing')):
+        retained.append('testing')
+    if os.path.isdir(os.path.join(directory, store.DIRECTORY)):
+        retained.append(store.DIRECTORY)
+    if os.path.isfile(os.path.join(directory, 'fingerprints.json')):
+        retained += [version for version in file.read_json(os.path.join(directory, 'fingerprints.json'))['versions'] if os.path.isdir(os.path.join(directory, version))]
+
+    actc_ = actc.ACTC(None, None, os.path.join(directory, 'actc'))
+    if os.path.isdir(actc_.path):
+        retained += [os.path.join('actc', entry) for entry in os.listdir(actc_.path) if os.path.isfile(os.path.join(actc_.path, entry))]
+
+        build_directory = os.path.dirname(actc_.get_build_dir(''))
+        if policy == 'binaries' and os.path.isdir(build_directory):
+            for version in os.listdir(build_directory):
+                for path in [os.path.join(actc_.get_output_dir(version), binary_name), actc_.get_mobile_blocks_dir(version)]:
+                    if os.path.exists(path):
+                        retained.append(os.path.relpath(path, directory))
+
+    return retained
+
+def prune(directory, retained, relative=''):
+    """
+    Method used to remove all artifacts of a run that are not retained.
+    :param directory: the output directory of the run.
+    :param retained: the paths (relative to the directory) that are retained (see select).
+    :param relative: the subdirectory (relative to the directory) to prune.
+    :return: nothing.
+    """
+    for entry in os.listdir(os.path.join(directory, relative)):
+        path = os.path.join(relative, entry)
+        full_path = os.path.join(directory, path)
+        if path in retained:
+            continue
+
+        # Directories containing retained artifacts are pruned recursively, all other artifacts are removed.
+        if os.path.isdir(full_path) and not os.path.islink(full_path):
+            if any(retained_path.startswith(path + os.sep) for retained_path in retained):
+                prune(directory, retained, path)
+            else:
+                shutil.rmtree(full_path)
+        else:
+            os.remove(full_path)
+
+def archive_analysis_directories(directory):
+    """
+    Method used to replace the analysis directories of all versions of a run by compressed archives.
+    :param directory: the output directory of the run.
+    :return: nothing.
+    """
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if entry.endswith('_analysis') and os.path.isdir(path):
+            with tarfile.open(path + '.tar.gz', 'w:gz') as tar:
+                tar.add(path, arcname=entry)
+            shutil.rmtree(path)
+
+def apply(directory, config, binary_name):
+    """
+    Method used to apply the retention policy to the output directory of a run.
+    :param directory: the output directory of the run.
+    :param config: the RETENTION configuration dictionary.
+    :param binary_name: the name of the protected binaries.
+    :return: nothing.
+    """
+    prune(directory, select(directory, config['policy'], binary_name))
+    if config['archive_analysis']:
+        archive_analysis_directories(directory)
+
+def promote(scratch_directory, output_directory, config, binary_name):
+    """
+    Method used to move the retained artifacts of a run staged in a scratch directory to its output directory.
+    The scratch directory is removed afterwards.
+    :param scratch_directory: the scratch directory the run was staged in.
+    :param output_directory: the output directory of the run.
+    :param config: the RETENTION configuration dictionary.
+    :param binary_name: the name of the protected binaries.
+    :return: nothing.
+    """
+    apply(scratch_directory, config, binary_name)
+
+    logging.debug('Promoting ' + scratch_directory + ' to ' + output_directory + '.')
+    os.makedirs(output_directory, exist_ok=True)
+    for entry in os.listdir(scratch_directory):
+        destination = os.path.join(output_directory, entry)
+        if os.path.isdir(destination) and not os.path.islink(destination):
+            shutil.rmtree(destination)
+        elif os.path.lexists(destination):
+            os.remove(destination)
+        shutil.move(os.path.join(scratch_directory, entry), destination)
+    shutil.rmtree(scratch_directory)
@@ -1,5 +1,8 @@
 """ Module used for sections functionality. """
+import hashlib
+import json
 import logging
+import os
 import re
 
 def extract_symbol_name(section):
@@ -12,6 +15,40 @@ def extract_symbol_name(section):
     if result is not None:
         return result.group(1)
 
+def create_section_dict(section_set, object_files, object_files_directory):
+    """
+    Method used to group the sections of object files per symbol.
+    :param section_set: a list of sections for every object file (see parser.Parser.parse_files).
+    :param object_files: the object files.
+    :param object_files_directory: the directory containing the object files.
+    :return: a dictionary {obj_file_name: (obj_path, {func_name: [sections]})}.
+    """
+    # We iterate over sets of sections.
+    # We are going to store information regarding the different sections in a dictionary.
+    section_info = dict()
+    for idx, sect in enumerate(section_set):
+        # We obtain the relative path to the file of the corresponding object file.
+        obj_file_name = os.path.relpath(object_files[idx], object_files_directory)
+
+        # We create an entry base on the relative path and add a tuple of the full path
+        # and an empty dictionary.
+        section_info[obj_file_name] = (object_files[idx], dict())
+
+        # We iterate over all sections.
+        for section in sect:
+            # We determine the symbol to which it corresponds.
+            name = extract_symbol_name(section)
+
+            # We check if the symbol already exists in our dictionary.
+            if name not in section_info[obj_file_name][1]:
+                # We create a new entry containing a single list with the section.
+                section_info[obj_file_name][1][name] = [section]
+            else:
+                # We add the section to the existing list.
+                section_info[obj_file_name][1][name].append(section)
+
+    return section_info
+
 def dump(elf_reader, name_section, objectfile):
     """
     Method used to dump a specific section within an object file.
@@ -51,3 +88,255 @@ def compare(elf_reader, name_section_one, name_section_two, objfile_one, objfile
 
     # Return True if both sections are equal.
     return section_one == section_two
+
+def parse_hex_dump(output):
+    """
+    Method used to parse the contents of a section out of its dump.
+    :param output: the dump of the section (see dump).
+    :return: the contents of the section.
+    """
+    contents = bytearray()
+    for line in output.decode(errors='replace').splitlines():
+        # Every line consists of an address, (up to) 16 bytes in groups of 4 and their ASCII representation.
+        if line.startswith('  0x'):
+            contents += bytes.fromhex(line[13:49].replace(' ', ''))
+    return bytes(contents)
+
+def parse_section_headers(output):
+    """
+    Method used to parse the section headers of an object file.
+    :param output: the output of the ELF reader for the section headers (-S).
+    :return: a dictionary {section index: section name}.
+    """
+    headers = dict()
+    for line in output.decode(errors='replace').splitlines():
+        result = re.search(r'^\s*\[\s*(\d+)\]\s+(\S+)', line)
+        if result is not None:
+            headers[int(result.group(1))] = result.group(2)
+    return headers
+
+def parse_section_sizes(output):
+    """
+    Method used to parse the sizes of the sections of an object file.
+    :param output: the output of the ELF reader for the section headers (-S -W).
+    :return: a dictionary {section name: size}.
+    """
+    sizes = dict()
+    for line in output.decode(errors='replace').splitlines():
+        # [Nr] Name Type Address Off Size ...
+        result = re.search(r'^\s*\[\s*\d+\]\s+(\S+)\s+\S+\s+[0-9a-f]+\s+[0-9a-f]+\s+([0-9a-f]+)', line)
+        if result is not None:
+            sizes[result.group(1)] = int(result.group(2), 16)
+    return sizes
+
+def parse_relocations(output):
+    """
+    Method used to parse the relocations of an object file.
+    :param output: the output of the ELF reader for the relocations (-r).
+    :return: a dictionary {section name: [(offset, relocation type, symbol name, addend)]}. The addend is only known for
+    RELA relocations, for REL relocations (as used on ARM) it is None as it is stored in the field that is relocated.
+    """
+    relocations = dict()
+    entries = None
+    explicit_addends = False
+    for line in output.decode(errors='replace').splitlines():
+        # A new relocation section starts, we determine the section it applies to.
+        result = re.search(r"^Relocation section '\.rel(a?)(\.[^']*)'", line)
+        if result is not None:
+            entries = relocations.setdefault(result.group(2), [])
+            explicit_addends = result.group(1) == 'a'
+            continue
+
+        # Relocation entries start with their offset, RELA entries end with the (signed) addend.
+        tokens = line.split()
+        if entries is not None and len(tokens) >= 3 and re.match('^[0-9a-f]+$', tokens[0]):
+            addend = None
+            if explicit_addends:
+                addend = int(tokens[-1], 16) * (-1 if tokens[-2] == '-' else 1) if len(tokens) >= 5 and tokens[-2] in ['+', '-'] else 0
+            symbol = tokens[4] if len(tokens) > 4 and tokens[4] not in ['+', '-'] else ''
+            entries.append((int(tokens[0], 16), tokens[2], symbol, addend))
+    return relocations
+
+def parse_mapping_symbols(output, headers):
+    """
+    Method used to parse the mapping symbols of an object file. Mapping symbols mark the start of
+    code ($a, $t) and data ($d, e.g. literal pools) within a section.
+    :param output: the output of the ELF reader for the symbol table (-s).
+    :param headers: the section headers of the object file (see parse_section_headers).
+    :return: a dictionary {section name: [(offset, 'code' or 'data')]} sorted by offset.
+    """
+    mapping_symbols = dict()
+    for line in output.decode(errors='replace').splitlines():
+        tokens = line.split()
+        if len(tokens) == 8 and tokens[6].isdigit() and re.match(r'^\$[atd](\.|$)', tokens[7]):
+            section = headers.get(int(tokens[6]))
+            kind = 'data' if tokens[7].startswith('$d') else 'code'
+            mapping_symbols.setdefault(section, []).append((int(tokens[1], 16), kind))
+
+    for symbols in mapping_symbols.values():
+        symbols.sort()
+    return mapping_symbols
+
+def read_object_information(elf_reader, objectfile):
+    """
+    Method used to read the relocations and mapping symbols of an object file.
+    :param elf_reader: the ELF Reader that will be used to read the object file.
+    :param objectfile: the object file.
+    :return: a dictionary containing the relocations and the mapping symbols per section.
+    """
+    headers = parse_section_headers(elf_reader.read_file(['-S', '-W'], objectfile))
+    return {'relocations': parse_relocations(elf_reader.read_file(['-r', '-W'], objectfile)),
+            'mapping_symbols': parse_mapping_symbols(elf_reader.read_file(['-s', '-W'], objectfile), headers)}
+
+def sign_extend(value, bits):
+    return value - (1 << bits) if value & (1 << (bits - 1)) else value
+
+def decode_thumb_branch(value):
+    # The 25-bit offset S:I1:I2:imm10:imm11 of a Thumb-2 BL/B.W, with I1 = not(J1 xor S) and I2 = not(J2 xor S).
+    (first, second) = (value & 0xffff, value >> 16)
+    sign = (first >> 10) & 1
+    i1 = 1 - (((second >> 13) & 1) ^ sign)
+    i2 = 1 - (((second >> 11) & 1) ^ sign)
+    return sign_extend((sign << 24) | (i1 << 23) | (i2 << 22) | ((first & 0x3ff) << 12) | ((second & 0x7ff) << 1), 25)
+
+def decode_thumb_immediate16(value):
+    # The 16-bit immediate imm4:i:imm3:imm8 of a Thumb-2 MOVW/MOVT.
+    (first, second) = (value & 0xffff, value >> 16)
+    return ((first & 0xf) << 12) | (((first >> 10) & 1) << 11) | (((second >> 12) & 0x7) << 8) | (second & 0xff)
+
+# The fields of the (little-endian) ARM relocations: their size in bytes, the mask of the bits that are relocated
+# and how the addend is decoded from them. Relocations without a field (e.g. R_ARM_NONE, R_ARM_V4BX) have size 0.
+WORD = (4, 0xffffffff, lambda value: sign_extend(value, 32))
+RELOCATION_FIELDS = {
+    'R_ARM_NONE': (0, 0, None),
+    'R_ARM_V4BX': (0, 0, None),
+    'R_ARM_ABS32': WORD, 'R_ARM_REL32': WORD, 'R_ARM_ABS32_NOI': WORD, 'R_ARM_REL32_NOI': WORD, 'R_ARM_TARGET1': WORD,
+    'R_ARM_TARGET2': WORD, 'R_ARM_SBREL32': WORD, 'R_ARM_BASE_PREL': WORD, 'R_ARM_GOTOFF32': WORD, 'R_ARM_GOT_BREL': WORD,
+    'R_ARM_GOT_PREL': WORD, 'R_ARM_TLS_GD32': WORD, 'R_ARM_TLS_LDM32': WORD, 'R_ARM_TLS_LDO32': WORD, 'R_ARM_TLS_IE32': WORD,
+    'R_ARM_TLS_LE32': WORD,
+    'R_ARM_PREL31': (4, 0x7fffffff, lambda value: sign_extend(value & 0x7fffffff, 31)),
+    'R_ARM_ABS16': (2, 0xffff, lambda value: sign_extend(value, 16)),
+    'R_ARM_ABS8': (1, 0xff, lambda value: sign_extend(value, 8)),
+    'R_ARM_CALL': (4, 0x00ffffff, lambda value: sign_extend(value & 0xffffff, 24) << 2),
+    'R_ARM_JUMP24': (4, 0x00ffffff, lambda value: sign_extend(value & 0xffffff, 24) << 2),
+    'R_ARM_PC24': (4, 0x00ffffff, lambda value: sign_extend(value & 0xffffff, 24) << 2),
+    'R_ARM_PLT32': (4, 0x00ffffff, lambda value: sign_extend(value & 0xffffff, 24) << 2),
+    'R_ARM_MOVW_ABS_NC': (4, 0x000f0fff, lambda value: ((value >> 4) & 0xf000) | (value & 0xfff)),
+    'R_ARM_MOVT_ABS': (4, 0x000f0fff, lambda value: ((value >> 4) & 0xf000) | (value & 0xfff)),
+    'R_ARM_MOVW_PREL_NC': (4, 0x000f0fff, lambda value: ((value >> 4) & 0xf000) | (value & 0xfff)),
+    'R_ARM_MOVT_PREL': (4, 0x000f0fff, lambda value: ((value >> 4) & 0xf000) | (value & 0xfff)),
+    'R_ARM_THM_CALL': (4, 0x2fff07ff, decode_thumb_branch),
+    'R_ARM_THM_JUMP24': (4, 0x2fff07ff, decode_thumb_branch),
+    'R_ARM_THM_JUMP11': (2, 0x07ff, lambda value: sign_extend(value & 0x7ff, 11) << 1),
+    'R_ARM_THM_JUMP8': (2, 0x00ff, lambda value: sign_extend(value & 0xff, 8) << 1),
+    'R_ARM_THM_MOVW_ABS_NC': (4, 0x70ff040f, decode_thumb_immediate16),
+    'R_ARM_THM_MOVT_ABS': (4, 0x70ff040f, decode_thumb_immediate16),
+    'R_ARM_THM_MOVW_PREL_NC': (4, 0x70ff040f, decode_thumb_immediate16),
+    'R_ARM_THM_MOVT_PREL': (4, 0x70ff040f, decode_thumb_immediate16),
+}
+
+def resolve_relocations(contents, relocations):
+    """
+    Method used to determine the addend of every relocation of a section, and to clear the fields of the relocations
+    in its contents. A relocated field only contains the addend (REL) or nothing that is used (RELA), the value of the
+    rest of the field comes from resolving the symbol, so comparing the addends instead of the fields loses nothing.
+    Relocations of unknown types are kept in the contents, and have an unknown (None) addend.
+    :param contents: the contents of the section.
+    :param relocations: the relocations of the section (see parse_relocations).
+    :return: the contents without the relocated fields, and the relocations as (offset, type, symbol, addend) tuples.
+    """
+    normalized = bytearray(contents)
+    resolved = []
+    for offset, relocation_type, symbol, addend in relocations:
+        field = RELOCATION_FIELDS.get(relocation_type)
+        if field is None or offset + field[0] > len(contents):
+            resolved.append((offset, relocation_type, symbol, addend))
+            continue
+
+        (size, mask, decode) = field
+        value = int.from_bytes(contents[offset:offset + size], 'little')
+        if addend is None and size:
+            addend = decode(value & mask)
+        normalized[offset:offset + size] = (value & ~mask & ((1 << (8 * size)) - 1)).to_bytes(size, 'little')
+        resolved.append((offset, relocation_type, symbol, addend))
+    return (bytes(normalized), resolved)
+
+def get_relocated_section(name_section):
+    # The section a relocation section (.rel<section> or .rela<section>) applies to, or None for other sections.
+    result = re.match(r'^\.rela?(\..*)$', name_section)
+    return result.group(1) if result is not None else None
+
+def fingerprint_relocation_aware(name_section, contents, information):
+    """
+    Method used to fingerprint a section by what compare_relocation_aware compares: the contents without the relocated
+    fields and the relocations as symbols and addends, or the entries of a relocation section. Two sections have the
+    same fingerprint if and only if they are equal or only differ in their relocations.
+    :param name_section: the section.
+    :param contents: the contents of the section.
+    :param information: the object information of the object file (see read_object_information).
+    :return: the fingerprint of the section.
+    """
+    relocated_section = get_relocated_section(name_section)
+    if relocated_section is not None:
+        data = [[list(entry) for entry in sorted(information['relocations'].get(relocated_section, []), key=repr)]]
+    else:
+        (normalized, resolved) = resolve_relocations(contents, information['relocations'].get(name_section, []))
+        data = [normalized.hex(), [list(entry) for entry in sorted(set(resolved), key=repr)]]
+    return hashlib.sha256(json.dumps(data).encode()).hexdigest()
+
+def classify_offset(offset, mapping_symbols):
+    """
+    Method used to determine whether an offset in a section contains code or data.
+    :param offset: the offset.
+    :param mapping_symbols: the mapping symbols of the section (see parse_mapping_symbols).
+    :return: 'code' or 'data'. Without mapping symbols, everything is considered code.
+    """
+    kind = 'code'
+    for symbol_offset, symbol_kind in mapping_symbols:
+        if symbol_offset > offset:
+            break
+        kind = symbol_kind
+    return kind
+
+def compare_relocation_aware(elf_reader, name_section, objfile_one, objfile_two, information_one, information_two):
+    """
+    Method used to compare a section of two object files, comparing relocated fields by their symbol and addend.
+    :param elf_reader: the ELF reader that will be used to dump the sections.
+    :param name_section: the section.
+    :param objfile_one: the first object file.
+    :param objfile_two: the second object file.
+    :param information_one: the object information of the first object file (see read_object_information).
+    :param information_two: the object information of the second object file.
+    :return: None if both sections are equal, otherwise the kind of difference: 'instructions' or 'literal_pool'
+    when the code or data in the section differs (including the symbols and addends of relocations, and the size of
+    the section), or 'relocations' when only the bits of relocated fields that aren't part of the addend differ
+    (e.g. stale values in the fields of RELA relocations), which are overwritten by the linker. Relocation sections
+    are compared by their entries (offset, type, symbol and addend) instead of their contents, as these refer to
+    symbols by their index in the symbol table, which changes whenever other symbols are added or reordered.
+    """
+    relocated_section = get_relocated_section(name_section)
+    if relocated_section is not None:
+        entries_one = sorted(information_one['relocations'].get(relocated_section, []), key=repr)
+        entries_two = sorted(information_two['relocations'].get(relocated_section, []), key=repr)
+        return 'relocations' if entries_one == entries_two else 'instructions'
+
+    contents_one = parse_hex_dump(dump(elf_reader, name_section, objfile_one))
+    contents_two = parse_hex_dump(dump(elf_reader, name_section, objfile_two))
+    relocations_one = information_one['relocations'].get(name_section, [])
+    relocations_two = information_two['relocations'].get(name_section, [])
+    if contents_one == contents_two and relocations_one == relocations_two:
+        return None
+
+    # We collect the offsets of all bytes and relocations (symbols or addends) that differ.
+    (normalized_one, resolved_one) = resolve_relocations(contents_one, relocations_one)
+    (normalized_two, resolved_two) = resolve_relocations(contents_two, relocations_two)
+    offsets = [idx for idx in range(max(len(normalized_one), len(normalized_two)))
+               if normalized_one[idx:idx + 1] != normalized_two[idx:idx + 1]]
+    offsets += [relocation[0] for relocation in set(resolved_one) ^ set(resolved_two)]
+    if not offsets:
+        return 'relocations'
+
+    # The difference is in the instructions if any of the differing offsets contains code.
+    mapping_symbols = information_one['mapping_symbols'].get(name_section, [])
+    kinds = set(classify_offset(offset, mapping_symbols) for offset in offsets)
+    return 'instructions' if 'code' in kinds else 'literal_pool'
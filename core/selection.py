@@ -0,0 +1,79 @@
+""" Module used for selecting the subset of versions that has the fewest mobile functions. """
+import itertools
+import math
+
+# The maximal number of subsets that are evaluated exhaustively, larger searches are greedy.
+EXACT_LIMIT = 10000
+
+def get_patterns(fingerprints, generated_versions):
+    """
+    Method used to determine how every function is distributed over the versions. For every function, the
+    versions are divided into equivalence classes: versions in the same class have identical sections for it.
+    Functions that are identical in all versions are left out. The functions of all versions are considered, the
+    versions that don't have a function being in a class together.
+    :param fingerprints: the fingerprints of the versions (see Executor.fingerprint_versions).
+    :param generated_versions: the versions.
+    :return: a dictionary {pattern: number of functions}, a pattern being a tuple with the class of every version.
+    """
+    functions = set()
+    for version in generated_versions:
+        for object_file, symbols in fingerprints[version]["text_section_information"].items():
+            functions.update((object_file, symbol) for symbol in symbols)
+
+    patterns = dict()
+    for object_file, symbol in sorted(functions):
+        classes = dict()
+        pattern = []
+        for version in generated_versions:
+            symbol_fingerprints = fingerprints[version]["text_section_information"].get(object_file, dict()).get(symbol)
+            key = str(symbol_fingerprints)
+            pattern.append(classes.setdefault(key, len(classes)))
+        if len(classes) > 1:
+            patterns[tuple(pattern)] = patterns.get(tuple(pattern), 0) + 1
+    return patterns
+
+def cost(patterns, subset):
+    """
+    Method used to determine the number of mobile functions of a subset of the versions: the functions
+    that are not in the same class for all versions in the subset.
+    :param patterns: the patterns of the functions (see get_patterns).
+    :param subset: the indices of the versions in the subset.
+    :return: the number of mobile functions.
+    """
+    return sum(count for pattern, count in patterns.items() if len(set(pattern[idx] for idx in subset)) > 1)
+
+def best_subset(patterns, nr_of_versions, size):
+    """
+    Method used to find the subset of a given size with the fewest mobile functions. All subsets are evaluated
+    if there aren't too many of them, otherwise we start from the best pair and greedily add the version that
+    adds the fewest mobile functions.
+    :param patterns: the patterns of the functions (see get_patterns).
+    :param nr_of_versions: the number of versions.
+    :param size: the size of the subset.
+    :return: the indices of the versions in the subset (sorted), and its number of mobile functions.
+    """
+    size = min(size, nr_of_versions)
+    if math.comb(nr_of_versions, size) <= EXACT_LIMIT:
+        subset = min(itertools.combinations(range(nr_of_versions), size), key=lambda subset: cost(patterns, subset))
+        return (list(subset), cost(patterns, subset))
+
+    subset = list(min(itertools.combinations(range(nr_of_versions), 2), key=lambda subset: cost(patterns, subset)))
+    while len(subset) < size:
+        subset.append(min([idx for idx in range(nr_of_versions) if idx not in subset], key=lambda idx: cost(patterns, subset + [idx])))
+    return (sorted(subset), cost(patterns, subset))
+
+def largest_subset(patterns, nr_of_versions, budget, minimal_size=2):
+    """
+    Method used to find the largest subset of the versions with at most a given number of mobile functions.
+    :param patterns: the patterns of the functions (see get_patterns).
+    :param nr_of_versions: the number of versions.
+    :param budget: the maximal number of mobile functions.
+    :param minimal_size: the minimal size of the subset.
+    :return: the indices of the versions in the subset (sorted) and its number of mobile functions, or None if
+    no subset of the minimal size is within the budget.
+    """
+    for size in range(nr_of_versions, minimal_size - 1, -1):
+        (subset, mobile) = best_subset(patterns, nr_of_versions, size)
+        if mobile <= budget:
+            return (subset, mobile)
+    return None
@@ -3,16 +3,83 @@ import logging
 import os
 import shutil
 import subprocess
+import time
+
+# The name of the SPEC configuration file, located next to the benchmark directories.
+CONF_FILE = 'spec2006_test.conf'
+
+# The directories of a benchmark (e.g. data/test/input) that the SPEC scripts only read from.
+READ_ONLY_DIRECTORY = 'input'
+
+def link_or_copy(src, dst):
+    """
+    Method used to hardlink a file, falling back to a copy (e.g. when crossing file systems).
+    :param src: the file to link.
+    :param dst: the destination path.
+    :return: the destination path.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+def create_private_tree(test_dir, config):
+    """
+    Method used to create a private copy of the SPEC benchmark directory, so that a version can be tested
+    without touching the input source directory (and concurrently with other versions without mobile blocks).
+    The relative layout of the benchmark directory and the configuration file is kept. Only the files in the input
+    directories are hardlinked, all other files (e.g. in the run and output directories) are copied, as the SPEC
+    scripts rewrite some of them in place, which would write through a hardlink into the input source directory.
+    :param test_dir: the test directory of the version, in which the private tree is created.
+    :param config: the parsed configuration file (see config.py).
+    :return: the private benchmark directory.
+    """
+    benchmark_dir = config.default['input_source_directory']
+    private_spec_dir = os.path.join(test_dir, 'spec')
+    private_benchmark_dir = os.path.join(private_spec_dir, os.path.basename(benchmark_dir))
+
+    def copy_function(src, dst):
+        if READ_ONLY_DIRECTORY in os.path.relpath(src, benchmark_dir).split(os.sep)[:-1]:
+            return link_or_copy(src, dst)
+        return shutil.copy2(src, dst)
+    shutil.copytree(benchmark_dir, private_benchmark_dir, symlinks=True, copy_function=copy_function)
+    shutil.copy(os.path.join(os.path.dirname(benchmark_dir), CONF_FILE), private_spec_dir)
+
+    return private_benchmark_dir
 
 def test(binary, test_dir, config):
+    """
+    Method used to test a binary using the SPEC regression script, in a private benchmark directory.
+    :param binary: the binary to test.
+    :param test_dir: the test directory of the version.
+    :param config: the parsed configuration file (see config.py).
+    :return: a dictionary containing whether the test passed, the time it took and the output of the script.
+    """
     regression_script = os.path.join(config.testing['regression_dir'], 'common', 'regression-main', 'regression.py')
     fake_diablo_dir = os.path.join(config.testing['regression_dir'], 'common', 'fakediablo')
     fake_diablo_bin = 'fakediablo.sh'
 
-    # Create the test directory and copy over the binary
-    shutil.copy(binary, config.default['input_source_directory'])
+    # Create the private benchmark directory and copy over the binary. A symlink to the
+    # original binary has to be removed first, otherwise the copy would write through it.
+    private_benchmark_dir = create_private_tree(test_dir, config)
+    private_binary = os.path.join(private_benchmark_dir, config.default['binary_name'])
+    if os.path.lexists(private_binary):
+        os.remove(private_binary)
+    shutil.copy(binary, private_binary)
 
     # Execute the regression script
-    conf_file = os.path.join(os.path.dirname(config.default['input_source_directory']), 'spec2006_test.conf')
-    result = subprocess.check_output([regression_script, '-c', conf_file, '-T', test_dir, '-d', fake_diablo_dir, '-p', fake_diablo_bin, config.default['binary_name']], stderr=subprocess.DEVNULL, universal_newlines=True).splitlines()[-1]
-    assert result == 'OK', 'SPEC regression script failed!'
+    regression_dir = os.path.join(test_dir, 'regression')
+    os.makedirs(regression_dir)
+    conf_file = os.path.join(os.path.dirname(private_benchmark_dir), CONF_FILE)
+    start = time.perf_counter()
+    try:
+        output = subprocess.check_output([regression_script, '-c', conf_file, '-T', regression_dir, '-d', fake_diablo_dir, '-p', fake_diablo_bin, config.default['binary_name']],
+                                         stderr=subprocess.DEVNULL, universal_newlines=True).splitlines()
+        result = output[-1] if output else ''
+    except subprocess.CalledProcessError as e:
+        result = 'Exit status ' + str(e.returncode)
+    elapsed = time.perf_counter() - start
+
+    logging.debug('SPEC regression result for ' + binary + ': ' + result)
+    return {'passed': result == 'OK', 'time': elapsed, 'result': result}
@@ -0,0 +1,193 @@
+""" Module used for storing the artifacts of runs by their contents, so byte-identical artifacts are only stored once. """
+import errno
+import logging
+import os
+import stat
+import threading
+
+import core.file as file
+import core.tools.actc as actc
+
+# The directory of the store, relative to the output directory of a sweep.
+DIRECTORY = '.store'
+
+class Store:
+    """
+    Class which represents a content-addressed artifact store. Every artifact is stored once under its digest,
+    and the artifacts in the output directories of runs are hard links to it. The number of links to a stored
+    artifact is its reference count: an artifact is referenced as long as a run still contains it, so removing
+    (part of) a run needs no bookkeeping, and artifacts that are no longer referenced are garbage collected.
+    Stored artifacts are read-only, as all their references share their contents (executables stay executable).
+    """
+
+    def __init__(self, directory):
+        """
+        Initialization of the store.
+        :param directory: the directory of the store (created when the first artifact is stored), which is to be
+        on the same file system as the runs.
+        :return: nothing.
+        """
+        self.directory = directory
+        self.objects_directory = os.path.join(directory, 'objects')
+
+        # Statistics on the artifacts put in the store by this process.
+        self.statistics = {'stored': 0, 'deduplicated': 0, 'deduplicated_bytes': 0, 'not_linked': 0}
+        self.lock = threading.Lock()
+
+    def get_path(self, digest):
+        """
+        Method used to get the path of a stored artifact.
+        :param digest: the digest of the artifact.
+        :return: the path of the artifact in the store.
+        """
+        return os.path.join(self.objects_directory, digest[:2], digest)
+
+    def put(self, path):
+        """
+        Method used to put an artifact in the store. If an identical artifact is stored already, the artifact
+        is replaced by a link to it, otherwise the artifact itself is stored.
+        :param path: the artifact.
+        :return: the digest of the artifact, or None if it could not be linked (e.g. when on another file system).
+        """
+        # Executables are stored apart from identical files that aren't executable, as all links share their mode.
+        digest = file.digest_file(path) + ('.x' if os.stat(path).st_mode & 0o111 else '')
+        stored = self.get_path(digest)
+        os.makedirs(os.path.dirname(stored), exist_ok=True)
+        try:
+            while True:
+                # We store the artifact itself if no identical artifact is stored yet.
+                try:
+                    os.link(path, stored)
+                    # Only the write bits are dropped, protected binaries in the store still have to be executed when testing.
+                    os.chmod(stored, stat.S_IMODE(os.stat(stored).st_mode) & 0o555)
+                    with self.lock:
+                        self.statistics['stored'] += 1
+                    return digest
+                except FileExistsError:
+                    pass
+
+                if os.path.samefile(path, stored):
+                    return digest
+
+                # Otherwise the artifact is atomically replaced by a link to the stored one. When the stored
+                # artifact was garbage collected in between, we try again.
+                temporary_path = path + '.store'
+                try:
+                    os.link(stored, temporary_path)
+                except FileNotFoundError:
+                    continue
+                os.replace(temporary_path, path)
+                with self.lock:
+                    self.statistics['deduplicated'] += 1
+                    self.statistics['deduplicated_bytes'] += os.path.getsize(path)
+                return digest
+        except OSError as e:
+            if e.errno not in [errno.EXDEV, errno.EPERM, errno.EMLINK]:
+                raise
+            logging.debug('Could not link ' + path + ' into the store: ' + str(e))
+            with self.lock:
+                self.statistics['not_linked'] += 1
+            return None
+
+    def put_files(self, paths):
+        """
+        Method used to put a number of artifacts in the store.
+        :param paths: the artifacts, paths that are not (regular) files are skipped.
+        :return: nothing.
+        """
+        for path in paths:
+            if os.path.isfile(path) and not os.path.islink(path):
+                self.put(path)
+
+    def put_run(self, directory, binary_name):
+        """
+        Method used to put the artifacts of a run that are never modified afterwards in the store: the object files
+        of all versions, and their protected binaries and mobile blocks.
+        :param directory: the output directory of the run.
+        :param binary_name: the name of the protected binaries.
+        :return: nothing.
+        """
+        self.put_files(artifacts(directory, binary_name))
+
+    def references(self, digest):
+        """
+        Method used to get the reference count of a stored artifact.
+        :param digest: the digest of the artifact.
+        :return: the number of references to the artifact.
+        """
+        try:
+            return os.stat(self.get_path(digest)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def walk(self):
+        # All stored artifacts, with their status.
+        if not os.path.isdir(self.objects_directory):
+            return
+        for prefix in sorted(os.listdir(self.objects_directory)):
+            for digest in sorted(os.listdir(os.path.join(self.objects_directory, prefix))):
+                yield (digest, os.stat(self.get_path(digest)))
+
+    def collect(self):
+        """
+        Method used to garbage collect the stored artifacts that are no longer referenced by any run.
+        :return: the number of removed artifacts and their total size.
+        """
+        removed = 0
+        removed_bytes = 0
+        for digest, status in self.walk():
+            if status.st_nlink <= 1:
+                os.remove(self.get_path(digest))
+                removed += 1
+                removed_bytes += status.st_size
+
+        logging.debug('Garbage collected ' + str(removed) + ' artifact(s) (' + str(removed_bytes) + ' bytes) from ' + self.directory + '.')
+        return (removed, removed_bytes)
+
+    def report(self):
+        """
+        Method used to report on the deduplication achieved by the store.
+        :return: a dictionary containing the number and size of the stored artifacts, of their references,
+        and the dedup ratio (the size of all references over the size actually stored).
+        """
+        report = {'artifacts': 0, 'stored_bytes': 0, 'references': 0, 'referenced_bytes': 0}
+        for _, status in self.walk():
+            report['artifacts'] += 1
+            report['stored_bytes'] += status.st_size
+            report['references'] += status.st_nlink - 1
+            report['referenced_bytes'] += (status.st_nlink - 1) * status.st_size
+        report['saved_bytes'] = report['referenced_bytes'] - report['stored_bytes']
+        report['dedup_ratio'] = report['referenced_bytes'] / report['stored_bytes'] if report['stored_bytes'] else 1.0
+        report.update(self.statistics)
+        return report
+
+def artifacts(directory, binary_name):
+    """
+    Method used to get the artifacts of a run that are put in the store.
+    :param directory: the output directory of the run.
+    :param binary_name: the name of the protected binaries.
+    :return: a list of paths.
+    """
+    paths = []
+    for entry in sorted(os.listdir(directory)):
+        if entry.endswith('_analysis'):
+            paths += file.get_files_with_suffix(os.path.join(directory, entry, 'objfiles'), ['.o'])
+
+    actc_ = actc.ACTC(None, None, os.path.join(directory, 'actc'))
+    build_directory = os.path.join(actc_.path, 'build')
+    if os.path.isdir(build_directory):
+        for version in sorted(os.listdir(build_directory)):
+            paths += build_artifacts(actc_, version, binary_name)
+    return paths
+
+def build_artifacts(actc_, version, binary_name):
+    """
+    Method used to get the artifacts of an ACTC build of a version that are put in the store.
+    :param actc_: the ACTC (see core/tools/actc.py).
+    :param version: the version.
+    :param binary_name: the name of the protected binary.
+    :return: a list of paths: the protected binary and the mobile blocks.
+    """
+    paths = [os.path.join(actc_.get_output_dir(version), binary_name)]
+    paths += [os.path.join(root, name) for root, _, names in os.walk(actc_.get_mobile_blocks_dir(version)) for name in sorted(names)]
+    return paths
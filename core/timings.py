@@ -0,0 +1,134 @@
+""" Module used for recording how long the external tools take, so the duration of later runs can be predicted. """
+import contextlib
+import fcntl
+import json
+import os
+import threading
+import time
+
+import core.progress as progress
+
+# The timings recorded by this process since they were last stored {(benchmark, tool): [number of calls, total seconds]}.
+recorded = dict()
+# The statistics recorded by this process per benchmark {benchmark: {statistic: value}}.
+statistics = dict()
+lock = threading.Lock()
+# The benchmark the tool invocations of the current thread are recorded for.
+current = threading.local()
+
+def set_benchmark(benchmark):
+    """
+    Method used to set the benchmark the tool invocations of the current thread are recorded for.
+    :param benchmark: the name of the benchmark, or None.
+    :return: nothing.
+    """
+    current.benchmark = benchmark
+
+def get_benchmark():
+    return getattr(current, 'benchmark', None)
+
+@contextlib.contextmanager
+def timed(tool):
+    """
+    Context manager used to record the duration of a tool invocation, for the benchmark of the current thread.
+    :param tool: the name of the tool.
+    """
+    start = time.time()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        elapsed = time.time() - start
+        with lock:
+            key = (get_benchmark(), tool)
+            calls, seconds = recorded.get(key, (0, 0.0))
+            recorded[key] = (calls + 1, seconds + elapsed)
+        progress.emit('subprocess', {'tool': tool, 'duration': elapsed, 'failed': failed})
+
+def record_statistic(benchmark, statistic, value):
+    """
+    Method used to record a statistic of a benchmark that determines the amount of work for it (e.g. its number of sections).
+    :param benchmark: the name of the benchmark.
+    :param statistic: the name of the statistic.
+    :param value: the value of the statistic.
+    :return: nothing.
+    """
+    with lock:
+        statistics.setdefault(benchmark, dict())[statistic] = value
+
+def read_history(history_file):
+    """
+    Method used to read the timings history.
+    :param history_file: the history file.
+    :return: the history {'tools': {tool: {'calls': n, 'seconds': s}}, 'benchmarks': {benchmark: {statistic: value}},
+    'benchmark_tools': {benchmark: {tool: {'calls': n, 'seconds': s}}}}. The tools are recorded over all benchmarks,
+    and per benchmark.
+    """
+    if not os.path.exists(history_file):
+        return {'tools': dict(), 'benchmarks': dict(), 'benchmark_tools': dict()}
+
+    with open(history_file, 'r') as f:
+        history = json.load(f)
+    history.setdefault('benchmark_tools', dict())
+    return history
+
+def store(history_file):
+    """
+    Method used to merge the timings recorded by this process into the history. The history is locked
+    while it is updated, so concurrent runs can share it.
+    :param history_file: the history file.
+    :return: nothing.
+    """
+    with lock:
+        if not recorded and not statistics:
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(history_file)), exist_ok=True)
+        with open(history_file + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            history = read_history(history_file)
+            for (benchmark, tool), (calls, seconds) in recorded.items():
+                entries = [history['tools']]
+                if benchmark is not None:
+                    entries.append(history['benchmark_tools'].setdefault(benchmark, dict()))
+                for tools in entries:
+                    entry = tools.setdefault(tool, {'calls': 0, 'seconds': 0.0})
+                    entry['calls'] += calls
+                    entry['seconds'] += seconds
+            for benchmark, values in statistics.items():
+                history['benchmarks'].setdefault(benchmark, dict()).update(values)
+
+            with open(history_file + '.tmp', 'w') as f:
+                json.dump(history, f, indent=2)
+            os.replace(history_file + '.tmp', history_file)
+
+        recorded.clear()
+        statistics.clear()
+
+def mean(history, tool, benchmark=None):
+    """
+    Method used to get the mean duration of a tool invocation. Tools take longer on larger benchmarks, so the mean
+    over the invocations for the benchmark is used if there are any, and the mean over all benchmarks otherwise.
+    :param history: the timings history (see read_history).
+    :param tool: the name of the tool.
+    :param benchmark: the name of the benchmark, or None.
+    :return: the mean duration in seconds, or None if the tool was never recorded.
+    """
+    entry = history['benchmark_tools'].get(benchmark, dict()).get(tool) if benchmark is not None else None
+    if not entry or not entry['calls']:
+        entry = history['tools'].get(tool)
+    return entry['seconds'] / entry['calls'] if entry and entry['calls'] else None
+
+def makespan(durations, concurrency):
+    """
+    Method used to predict the wall time of executing jobs concurrently. Jobs are scheduled the longest first,
+    each on the worker that becomes available first.
+    :param durations: the durations of the jobs.
+    :param concurrency: the number of jobs executed at the same time.
+    :return: the predicted wall time.
+    """
+    workers = [0.0] * max(1, concurrency)
+    for duration in sorted(durations, reverse=True):
+        workers[workers.index(min(workers))] += duration
+    return max(workers)
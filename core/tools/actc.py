@@ -1,6 +1,8 @@
 import os
 import subprocess
 
+import core.timings as timings
+
 class ACTC:
     """
     Class which represents the ACTC toolchain.
@@ -24,7 +26,8 @@ class ACTC:
         :return: nothing.
         """
         # Execute the command.
-        subprocess.check_call([self.bin_location, '-f', config_file, 'clean'], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+        with timings.timed('actc_clean'):
+            subprocess.check_call([self.bin_location, '-f', config_file, 'clean'], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
 
     def execute(self, config_file, name):
         """
@@ -37,7 +40,7 @@ class ACTC:
         command_exec = [self.bin_location, '--aidfixed', self.config['aid'], '-f', config_file, '-d', 'build']
 
         # Execute the command.
-        with open(os.path.join(self.path, name + '.log'), 'w') as f_log:
+        with open(os.path.join(self.path, name + '.log'), 'w') as f_log, timings.timed('actc'):
             subprocess.check_call(command_exec, stdout=f_log, stderr=subprocess.STDOUT)
 
     def get_build_dir(self, name):
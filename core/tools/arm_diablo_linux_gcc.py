@@ -1,6 +1,8 @@
 import logging
 import subprocess
 
+import core.timings as timings
+
 class ARMDiabloLinuxGCC:
     """
     Class which represents the diablo modified linux gcc compiler.
@@ -28,7 +30,26 @@ class ARMDiabloLinuxGCC:
             flags + [source_file]
 
         # We execute the command.
-        subprocess.check_call(command_exec, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+        with timings.timed('compile'):
+            subprocess.check_call(command_exec, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+    def create_precompiled_header(self, flags, header_file, output_file):
+        """
+        Method used to precompile a header file.
+        :param flags: the flags which should be used (the same as for the source files it is used for).
+        :param header_file: path to the header file.
+        :param output_file: path to the precompiled header.
+        :return: nothing.
+        """
+        # Debug information.
+        logging.debug("Creating precompiled header for: " + str(header_file) + " with flags: " + str(flags))
+
+        # We build the command to be executed.
+        command_exec = [self.bin_location, '-x', 'c-header', '-o', output_file] + flags + [header_file]
+
+        # We execute the command.
+        with timings.timed('compile_pch'):
+            subprocess.check_call(command_exec, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
 
     def create_object_files(self, flags, source_files, output_files=None):
         """
@@ -1,6 +1,27 @@
 import logging
 import subprocess
 
+import core.timings as timings
+
+def clean_disassembly_line(line):
+    """
+    Method used to clean a disassembly line, so irrelevant information (that might differ between versions however) is filtered out.
+    :param line: the disassembly line.
+    :return: the cleaned line.
+    """
+    # Remove everything that comes after a semicolon
+    semicolon = line.find(';')
+    if semicolon != -1:
+        line = line[:semicolon]
+
+    # Remove everything between angular brackets
+    lb = line.find('<')
+    rb = line.find('>')
+    if lb != -1 and rb != -1:
+        line = line[:lb +1] + line[rb:]
+
+    return line
+
 class ARMDiabloLinuxObjdump:
     """
     Class which represents the diablo modified linux objdump tool.
@@ -20,43 +41,29 @@ class ARMDiabloLinuxObjdump:
         :return: True if the binaries are all the same, False if they are not.
         """
 
-        # A function to clean disassembly lines so irrelevant information (that might differ
-        # between versions however) is filtered out
-        def clean(line):
-            # Remove everything that comes after a semicolon
-            semicolon = line.find(';')
-            if semicolon != -1:
-                line = line[:semicolon]
-
-            # Remove everything between angular brackets
-            lb = line.find('<')
-            rb = line.find('>')
-            if lb != -1 and rb != -1:
-                line = line[:lb +1] + line[rb:]
-
-            return line
-
         # Get all the contents in binary
         dumps = []
         for binary in binaries:
-            output = subprocess.check_output([self.bin_location, '--full-contents', binary], universal_newlines=True)
-
-            # Split into sections and dump the first element (only contains file name, which differs)
-            sections = output.split('Contents of section ')[1:]
-            for idx, sec in enumerate(sections):
-                if sec.startswith('.text'):
-                    # Get the name of the section, and obtain its disassembly
-                    section_name = sec[:sec.find(':')]
-                    output = subprocess.check_output([self.bin_location, '--disassemble', '--section=' + section_name, binary], universal_newlines=True)
-
-                    # Filter the disassembly by removing the file name, the .word instructions,
-                    # and cleaning the line
-                    lines = output[output.find('Disassembly'):].splitlines()
-                    lines = [clean(line) for line in lines if '.word' not in line]
-                    sections[idx] = '\n'.join(lines)
-                if sec.startswith('.dynsym'):
-                    # The contents of this section can differ (function size). TODO: Actually interpret this data and simply compare the relevant parts.
-                    sections[idx] = ''
+            # Every binary is timed as a whole, as the number of objdump invocations depends on its number of text sections.
+            with timings.timed('compare_binary'):
+                output = subprocess.check_output([self.bin_location, '--full-contents', binary], universal_newlines=True)
+
+                # Split into sections and dump the first element (only contains file name, which differs)
+                sections = output.split('Contents of section ')[1:]
+                for idx, sec in enumerate(sections):
+                    if sec.startswith('.text'):
+                        # Get the name of the section, and obtain its disassembly
+                        section_name = sec[:sec.find(':')]
+                        output = subprocess.check_output([self.bin_location, '--disassemble', '--section=' + section_name, binary], universal_newlines=True)
+
+                        # Filter the disassembly by removing the file name, the .word instructions,
+                        # and cleaning the line
+                        lines = output[output.find('Disassembly'):].splitlines()
+                        lines = [clean_disassembly_line(line) for line in lines if '.word' not in line]
+                        sections[idx] = '\n'.join(lines)
+                    if sec.startswith('.dynsym'):
+                        # The contents of this section can differ (function size). TODO: Actually interpret this data and simply compare the relevant parts.
+                        sections[idx] = ''
 
             dumps.append(''.join(sections))
 
@@ -78,7 +85,7 @@ class ARMDiabloLinuxObjdump:
         command_exec = [self.bin_location] + flags + [object_file]
 
         # Execute the disassembler.
-        with open(output_file, 'w') as f_out:
+        with open(output_file, 'w') as f_out, timings.timed('objdump'):
             subprocess.check_call(command_exec, stdout=f_out)
 
     def disassemble_obj_files(self, flags, object_files, output_files):
@@ -1,6 +1,8 @@
 import logging
 import subprocess
 
+import core.timings as timings
+
 class ElfReader:
     """
     Class which represents an ELF file format reader.
@@ -28,11 +30,12 @@ class ElfReader:
         command_exec = [self.bin_location] + flags + [object_file]
 
         # Execute the disassembler.
-        if output_file:
-            with open(output_file, 'w') as f_out:
-                subprocess.check_call(command_exec, stdout=f_out)
-        else:
-            return subprocess.check_output(command_exec)
+        with timings.timed('readelf'):
+            if output_file:
+                with open(output_file, 'w') as f_out:
+                    subprocess.check_call(command_exec, stdout=f_out)
+            else:
+                return subprocess.check_output(command_exec)
 
     def read_files(self, flags, object_files, output_files):
         """
@@ -1,6 +1,8 @@
 import os
 import subprocess
 
+import core.timings as timings
+
 class SemanticMod:
     """
     Class which represents the Semantic Modification libtooling stand-alone tool.
@@ -31,5 +33,5 @@ class SemanticMod:
                        ['-od', output_directory] + extra_opts + ["--"] + self.compiler_flags
 
         # We execute the command.
-        with open(os.path.join(output_directory, 'semantic_mod.log'), 'w') as f_log:
+        with open(os.path.join(output_directory, 'semantic_mod.log'), 'w') as f_log, timings.timed('semantic_mod'):
             subprocess.check_call(command_exec, stdout=f_log, stderr=subprocess.STDOUT)
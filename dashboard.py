@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+
+"""
+Module used to follow the progress of runs live, from the events they emit (see core/progress.py).
+"""
+
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+
+# The period in seconds over which the throughput is measured.
+WINDOW = 30.0
+# The number of failures that is shown.
+FAILURES = 5
+
+def format_seconds(seconds):
+    if seconds is None:
+        return '?'
+    return time.strftime('%H:%M:%S', time.gmtime(seconds))
+
+class Dashboard:
+    """
+    Class which keeps the state of all jobs of a sweep up to date from their events, and measures their throughput.
+    """
+
+    def __init__(self):
+        self.jobs = dict()
+        self.sweep = {'jobs': None, 'start': None, 'end': None}
+        self.failures = []
+        self.subprocesses = 0
+        self.last = None
+        self.lock = threading.Lock()
+
+    def get_job(self, name, now):
+        # The state of a job, which is created on its first event.
+        if name not in self.jobs:
+            self.jobs[name] = {'state': 'running', 'start': now, 'end': None, 'stage': None, 'stages': dict(), 'versions': None,
+                               'objects': 0, 'comparisons': 0, 'samples': [], 'subprocesses': 0}
+        return self.jobs[name]
+
+    def update(self, event):
+        """
+        Method used to update the state with an event.
+        :param event: the event (see progress.emit).
+        :return: nothing.
+        """
+        with self.lock:
+            now = event['time']
+            self.last = now if self.last is None else max(self.last, now)
+            kind = event['event']
+
+            if kind == 'sweep_start':
+                self.sweep = {'jobs': event['jobs'], 'start': now, 'end': None}
+                return
+            if kind == 'sweep_finish':
+                self.sweep['end'] = now
+                return
+            if kind == 'subprocess':
+                self.subprocesses += 1
+                if event['failed']:
+                    self.failures.append((now, event['job'], 'tool ' + event['tool'] + ' failed'))
+            if event['job'] is None:
+                return
+
+            # A job that is executed again (e.g. the best seeds after a search) starts over.
+            if kind == 'job_start':
+                self.jobs.pop(event['job'], None)
+            job = self.get_job(event['job'], now)
+            if kind == 'job_finish':
+                job['end'] = now
+                job['state'] = 'failed' if event['failed'] else 'rejected' if event['rejected'] else 'finished'
+                if event['failed'] or event['rejected']:
+                    self.failures.append((now, event['job'], event['rejected'] if event['rejected'] else 'job failed'))
+            elif kind == 'versions':
+                job['versions'] = event['versions']
+            elif kind == 'subprocess':
+                job['subprocesses'] += 1
+            elif kind == 'analysis':
+                job['comparisons'] = event['comparisons']
+                self.set_stage(job, 'compare', event['objects'], event['total'], now)
+            elif kind in ['task_start', 'task_finish', 'stage']:
+                self.set_stage(job, event['stage'], event.get('finished'), event.get('total'), now)
+                if kind in ['task_finish', 'stage'] and event['stage'] == 'read':
+                    job['objects'] += 1
+                if kind == 'task_finish' and event['failed']:
+                    self.failures.append((now, event['job'], 'task ' + event['task'] + ' failed'))
+            job['samples'].append((now, job['objects'], job['comparisons']))
+
+    def set_stage(self, job, stage, finished, total, now):
+        job['stage'] = stage
+        if stage not in job['stages']:
+            job['stages'][stage] = {'start': now, 'finished': 0, 'total': None}
+        if total is not None:
+            job['stages'][stage]['finished'] = finished
+            job['stages'][stage]['total'] = total
+        job['stages'][stage]['last'] = now
+
+    def get_rates(self, job, now):
+        """
+        Method used to measure the throughput of a job over the last WINDOW seconds.
+        :param job: the job.
+        :param now: the current time.
+        :return: the objects read per second and the comparisons per second.
+        """
+        samples = [sample for sample in job['samples'] if sample[0] >= now - WINDOW]
+        if len(samples) < 2 or samples[-1][0] <= samples[0][0]:
+            return (0.0, 0.0)
+        elapsed = max(samples[-1][0], now if job['end'] is None else job['end']) - samples[0][0]
+        return ((samples[-1][1] - samples[0][1]) / elapsed, (samples[-1][2] - samples[0][2]) / elapsed)
+
+    def get_stage_eta(self, job, now):
+        # The remaining time of the current stage of a job, from the rate at which its tasks finished so far.
+        stage = job['stages'].get(job['stage'])
+        if stage is None or not stage['total'] or not stage['finished'] or job['end'] is not None:
+            return None
+        rate = stage['finished'] / max(now - stage['start'], 1e-3)
+        return (stage['total'] - stage['finished']) / rate
+
+    def get_sweep_eta(self, now):
+        # The remaining time of the sweep, from the rate at which its jobs finished so far.
+        finished = len([job for job in self.jobs.values() if job['end'] is not None])
+        if not self.sweep['jobs'] or self.sweep['start'] is None or not finished:
+            return None
+        if self.sweep['end'] is not None:
+            return 0.0
+        rate = finished / max(now - self.sweep['start'], 1e-3)
+        return max(self.sweep['jobs'] - finished, 0) / rate
+
+    def render(self, now):
+        """
+        Method used to render the state of the sweep and its jobs.
+        :param now: the current time.
+        :return: a list of lines.
+        """
+        with self.lock:
+            finished = [job for job in self.jobs.values() if job['end'] is not None]
+            start = self.sweep['start'] if self.sweep['start'] is not None else min([job['start'] for job in self.jobs.values()], default=now)
+            lines = ['Sweep: ' + str(len(finished)) + '/' + (str(self.sweep['jobs']) if self.sweep['jobs'] else '?') + ' job(s) finished (' +
+                     str(len([job for job in finished if job['state'] != 'finished'])) + ' failed or rejected), elapsed ' +
+                     format_seconds((self.sweep['end'] if self.sweep['end'] is not None else now) - start) + ', ETA ' + format_seconds(self.get_sweep_eta(now)),
+                     'Subprocesses: ' + str(self.subprocesses) + ' completed', '']
+
+            for name, job in sorted(self.jobs.items(), key=lambda item: item[1]['start']):
+                (objects_rate, comparisons_rate) = self.get_rates(job, now)
+                stage = job['stages'].get(job['stage'])
+                line = name + '  ' + job['state']
+                if job['end'] is None:
+                    line += '  ' + str(job['stage'])
+                    if stage is not None and stage['total']:
+                        line += ' ' + str(stage['finished']) + '/' + str(stage['total']) + ' (ETA ' + format_seconds(self.get_stage_eta(job, now)) + ')'
+                    line += '  ' + str(round(objects_rate, 1)) + ' objects/s  ' + str(round(comparisons_rate, 1)) + ' comparisons/s'
+                else:
+                    line += '  ' + format_seconds(job['end'] - job['start'])
+                line += '  ' + (str(job['versions']) if job['versions'] is not None else '?') + ' version(s), ' + str(job['objects']) + ' object(s) read, ' + \
+                        str(job['comparisons']) + ' comparison(s), ' + str(job['subprocesses']) + ' subprocess(es)'
+                lines.append(line)
+
+            if self.failures:
+                lines += ['', 'Failures:']
+                lines += [format_seconds(failure_time - start) + ' ' + str(job) + ': ' + message for failure_time, job, message in self.failures[-FAILURES:]]
+            return lines
+
+def read_events(stream, dashboard):
+    # Update the dashboard with every complete line of a stream.
+    for line in stream:
+        if line.endswith('\n'):
+            try:
+                dashboard.update(json.loads(line))
+            except (ValueError, KeyError):
+                pass
+
+def follow_file(path, dashboard, stop):
+    """
+    Method used to update a dashboard with the events appended to a JSON Lines file.
+    :param path: the file.
+    :param dashboard: the dashboard.
+    :param stop: an event which is set to stop following the file.
+    :return: nothing.
+    """
+    while not os.path.exists(path) and not stop.is_set():
+        stop.wait(0.5)
+    with open(path, 'r') as f:
+        partial = ''
+        while not stop.is_set():
+            line = f.readline()
+            if not line:
+                stop.wait(0.5)
+                continue
+            partial += line
+            if partial.endswith('\n'):
+                read_events([partial], dashboard)
+                partial = ''
+
+def listen(destination, dashboard):
+    """
+    Method used to update a dashboard with the events of all runs connecting to a socket.
+    :param destination: the socket (unix:<path> or tcp:<host>:<port>).
+    :param dashboard: the dashboard.
+    :return: nothing.
+    """
+    if destination.startswith('unix:'):
+        path = destination[len('unix:'):]
+        if os.path.exists(path):
+            os.remove(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+    else:
+        (host, port) = destination[len('tcp:'):].rsplit(':', 1)
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((host, int(port)))
+    server.listen()
+
+    def accept():
+        while True:
+            (connection, _) = server.accept()
+            threading.Thread(target=lambda connection=connection: read_events(connection.makefile('r'), dashboard), daemon=True).start()
+    threading.Thread(target=accept, daemon=True).start()
+
+# Parse the arguments.
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--interval', type=float, default=1.0, help='The interval in seconds between updates of the dashboard.')
+    parser.add_argument('--once', action='store_true', help='Show the state at the end of the events file once, instead of following it.')
+    parser.add_argument('events', help='The events (see PROGRESS.Events): a JSON Lines file, or a socket to listen on (unix:<path> or tcp:<host>:<port>).')
+    args = parser.parse_args()
+
+    dashboard = Dashboard()
+    if args.once:
+        with open(args.events, 'r') as f:
+            read_events(f, dashboard)
+        print('\n'.join(dashboard.render(dashboard.last if dashboard.last is not None else time.time())))
+    else:
+        stop = threading.Event()
+        if args.events.startswith('unix:') or args.events.startswith('tcp:'):
+            listen(args.events, dashboard)
+        else:
+            threading.Thread(target=follow_file, args=(args.events, dashboard, stop), daemon=True).start()
+
+        try:
+            while True:
+                # Clear the terminal and draw the dashboard again.
+                print('\033[H\033[J' + '\n'.join(dashboard.render(time.time())), flush=True)
+                time.sleep(args.interval)
+        except KeyboardInterrupt:
+            stop.set()
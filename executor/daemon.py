@@ -0,0 +1,243 @@
+import copy
+import http.server
+import json
+import logging
+import os
+import queue
+import shutil
+import socketserver
+import tarfile
+import threading
+import traceback
+
+import core.cache as cache
+import core.tools.actc as actc
+import executor.executor as executor
+
+class Daemon:
+    """
+    Class responsible for producing new versions on request. The configuration and the cache
+    (manifests, compile results and section fingerprints) are kept in memory across requests.
+    """
+
+    def __init__(self, config):
+        """
+        Initialization of the daemon.
+        :param config: the parsed configuration file (see config.py)
+        :return: nothing.
+        """
+        self.config = config
+        self.cache = cache.Cache(self.config.daemon['cache_directory'])
+
+        # All jobs ever submitted, and the jobs that are still waiting to be executed.
+        self.jobs = dict()
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+
+        # Warm up the cache by scanning the base project.
+        executor.Executor(self.config, self.cache).get_source_files()
+
+    def submit(self, nr_of_versions, seed, mode, transformation_type=None):
+        """
+        Method used to submit a job requesting new versions.
+        :param nr_of_versions: the number of versions to generate.
+        :param seed: the seed to generate the versions with.
+        :param mode: the mode in which the executor is to be executed.
+        :param transformation_type: the type of transformation (the configured type if not given).
+        :return: a copy of the job.
+        """
+        with self.lock:
+            job_id = str(len(self.jobs))
+            job = self.jobs[job_id] = {'id': job_id, 'state': 'queued', 'nr_of_versions': nr_of_versions, 'seed': seed, 'mode': mode,
+                                       'transformation_type': transformation_type if transformation_type else self.config.semantic_mod['type'],
+                                       'output_directory': os.path.join(self.config.default['output_directory'], 'jobs', job_id),
+                                       'versions': [], 'mobile_functions': [], 'error': None}
+            job = copy.deepcopy(job)
+        self.pending.put(job_id)
+        return job
+
+    def get_job(self, job_id):
+        """
+        Method used to get a snapshot of the status of a job.
+        :param job_id: the id of the job.
+        :return: a copy of the job, or None if the job does not exist.
+        """
+        with self.lock:
+            return copy.deepcopy(self.jobs.get(job_id))
+
+    def get_jobs(self):
+        """
+        Method used to get a snapshot of the status of all jobs.
+        :return: a list of copies of all jobs.
+        """
+        with self.lock:
+            return copy.deepcopy(list(self.jobs.values()))
+
+    def get_actc(self, job):
+        """
+        Method used to get the ACTC tool chain used by a job, to locate its binaries and mobile blocks.
+        :param job: the job.
+        :return: the ACTC tool chain.
+        """
+        return actc.ACTC(self.config.actc['bin_location'], self.config.actc, os.path.join(job['output_directory'], 'actc'))
+
+    def run_job(self, job_id):
+        """
+        Method used to execute a job. Jobs are executed one after the other, as they share the cache's compilation directory.
+        :param job_id: the id of the job.
+        :return: nothing.
+        """
+        with self.lock:
+            job = self.jobs[job_id]
+            job['state'] = 'running'
+
+        # Every job gets its own copy of the configuration.
+        config = copy.deepcopy(self.config)
+        config.semantic_mod['seed'] = str(job['seed'])
+        config.semantic_mod['type'] = job['transformation_type']
+        config.default['nr_of_versions'] = str(job['nr_of_versions'])
+        config.default['output_directory'] = job['output_directory']
+        shutil.rmtree(job['output_directory'], True)
+        os.makedirs(job['output_directory'])
+
+        try:
+            versions, functions_diff = executor.Executor(config, self.cache).execute(job['mode'], 0)
+            with self.lock:
+                job['versions'] = versions
+                job['mobile_functions'] = functions_diff
+                job['state'] = 'finished'
+        except Exception:
+            traceback.print_exc()
+            with self.lock:
+                job['error'] = traceback.format_exc()
+                job['state'] = 'failed'
+
+        logging.debug('Cache statistics: ' + str(self.cache.statistics))
+
+    def work(self):
+        """
+        Method used to execute the submitted jobs, forever.
+        :return: nothing.
+        """
+        while True:
+            self.run_job(self.pending.get())
+
+    def serve(self):
+        """
+        Method used to start the daemon. The API is served over a Unix socket, or over a local TCP port if one is configured.
+        :return: nothing.
+        """
+        threading.Thread(target=self.work, daemon=True).start()
+
+        if self.config.daemon['port']:
+            server = ThreadingHTTPServer(('localhost', self.config.daemon['port']), RequestHandler)
+            print('************ Daemon listening on port ' + str(self.config.daemon['port']) + ' **********')
+        else:
+            if os.path.exists(self.config.daemon['socket']):
+                os.remove(self.config.daemon['socket'])
+            server = ThreadingUnixHTTPServer(self.config.daemon['socket'], RequestHandler)
+            print('************ Daemon listening on ' + self.config.daemon['socket'] + ' **********')
+
+        server.daemon = self
+        server.serve_forever()
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class RequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Class handling the requests to the daemon:
+        POST /jobs                                          {"nr_of_versions": N, "seed": S, "mode": M, "transformation_type": T}
+        GET  /jobs                                          the status of all jobs
+        GET  /jobs/<id>                                     the status of a job
+        GET  /jobs/<id>/versions/<version>/binary           the protected binary of a version
+        GET  /jobs/<id>/versions/<version>/mobile_blocks    the mobile blocks of a version (as a tar archive)
+        GET  /cache                                         the cache statistics
+        POST /cache/invalidate                              rescan the base project on the next job
+    """
+
+    def address_string(self):
+        # Clients connecting over a Unix socket don't have an address.
+        return self.client_address[0] if self.client_address else 'local'
+
+    def send_json(self, data, status=200):
+        content = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self):
+        daemon = self.server.daemon
+        parts = self.path.strip('/').split('/')
+
+        if parts == ['jobs']:
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length).decode()) if length else dict()
+                job = daemon.submit(int(request['nr_of_versions']), int(request['seed']), int(request.get('mode', 2)), request.get('transformation_type'))
+            except (KeyError, ValueError) as e:
+                self.send_json({'error': 'Invalid request: ' + str(e)}, 400)
+                return
+            self.send_json(job, 202)
+        elif parts == ['cache', 'invalidate']:
+            daemon.cache.invalidate(daemon.config.default['input_source_directory'])
+            self.send_json(daemon.cache.statistics)
+        else:
+            self.send_json({'error': 'Not found'}, 404)
+
+    def do_GET(self):
+        daemon = self.server.daemon
+        parts = self.path.strip('/').split('/')
+
+        if parts == ['jobs']:
+            self.send_json(daemon.get_jobs())
+            return
+        if parts == ['cache']:
+            self.send_json(daemon.cache.statistics)
+            return
+
+        # All other requests concern a specific job.
+        job = daemon.get_job(parts[1]) if len(parts) > 1 and parts[0] == 'jobs' else None
+        if job is None:
+            self.send_json({'error': 'Not found'}, 404)
+        elif len(parts) == 2:
+            self.send_json(job)
+        elif len(parts) == 5 and parts[2] == 'versions' and parts[3] in job['versions'] and job['state'] == 'finished':
+            actc_ = daemon.get_actc(job)
+            if parts[4] == 'binary':
+                self.send_file(os.path.join(actc_.get_output_dir(parts[3]), daemon.config.default['binary_name']))
+            elif parts[4] == 'mobile_blocks':
+                self.send_tar(actc_.get_mobile_blocks_dir(parts[3]))
+            else:
+                self.send_json({'error': 'Not found'}, 404)
+        else:
+            self.send_json({'error': 'Not found'}, 404)
+
+    def send_file(self, path):
+        if not os.path.isfile(path):
+            self.send_json({'error': 'Not found'}, 404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(os.path.getsize(path)))
+        self.end_headers()
+        with open(path, 'rb') as f:
+            shutil.copyfileobj(f, self.wfile)
+
+    def send_tar(self, directory):
+        if not os.path.isdir(directory):
+            self.send_json({'error': 'Not found'}, 404)
+            return
+
+        # The archive is streamed, the end of the response is marked by closing the connection.
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-tar')
+        self.end_headers()
+        with tarfile.open(fileobj=self.wfile, mode='w|') as tar:
+            tar.add(directory, arcname=os.path.basename(directory))
@@ -1,13 +1,29 @@
+import concurrent.futures
+import contextlib
+import hashlib
 import json
 import logging
+import multiprocessing
 import os
+import shutil
 import subprocess
+import threading
+import time
 
+import core.benchmark as benchmark
+import core.comparator as comparator
+import core.cost_model as cost_model
+import core.delta as delta
 import core.file as file
 import core.parser as parser
+import core.pch as pch
+import core.progress as progress
 import core.sections as sections
+import core.selection as selection
 import core.spec as spec
+import core.store as store
 import core.templates as templates
+import core.timings as timings
 
 import core.tools.actc as actc
 import core.tools.arm_diablo_linux_gcc as arm_diablo_linux_gcc
@@ -15,103 +31,316 @@ import core.tools.arm_diablo_linux_objdump as arm_diablo_linux_objdump
 import core.tools.elf_reader as elf_reader
 import core.tools.semantic_mod as semantic_mod
 
+import executor.scheduler as scheduler
+
+# The way sections are fingerprinted per way of comparing them (see Executor.fingerprint), stored with the fingerprints of a version set.
+FINGERPRINT_FORMATS = {'raw': 'section_digest', 'relocation_aware': 'relocation_aware_digest'}
+
+class RejectedError(Exception):
+    """
+    Exception raised when a set of versions is rejected, e.g. because of differences in data sections.
+    """
+    pass
+
+class PrunedError(RejectedError):
+    """
+    Exception raised when a set of versions is rejected because it has more mobile functions than allowed.
+    """
+    pass
+
+def analyze_shard(config, generated_versions, version_information, section_info, mobile_limit):
+    """
+    Method used to compare the symbols of a shard of the object files in a worker process (see Executor.analyze_sharded).
+    :param config: the parsed configuration file.
+    :param generated_versions: the versions to compare.
+    :param version_information: the version information of these versions, only containing the object files of the shard.
+    :param section_info: the section information to compare.
+    :param mobile_limit: the maximal number of mobile functions, or None.
+    :return: the results of comparing every pair of consecutive versions (see Executor.analyze_symbols_in_section_info),
+    and the state of the comparator.
+    """
+    config.scheduler['analysis_jobs'] = 1
+    shard_executor = Executor(config, mobile_limit=(lambda: mobile_limit) if mobile_limit is not None else None)
+
+    results = []
+    for version_one, version_two in zip(generated_versions[:-1], generated_versions[1:]):
+        results.append(shard_executor.analyze_symbols_in_section_info([version_one, version_two], version_information, section_info,
+                                                                      limit_mobile=mobile_limit is not None))
+    return (results, shard_executor.comparator.export())
+
 class Executor:
     """
     Class responsible for execution the whole semantic renewability on
     a high level.
     """
 
-    def __init__(self, config):
+    def __init__(self, config, cache=None, store=None, mobile_limit=None, budget=None):
         """
         Initialization of the executor.
         :param config: the parsed configuration file (see config.py)
+        :param cache: an optional cache that is kept warm across executor runs (see core/cache.py).
+        :param store: an optional artifact store the artifacts are put in as they are produced (see core/store.py).
+        :param mobile_limit: an optional function returning the maximal number of mobile functions (or None if
+        there is no maximum), the versions are rejected as soon as they have more. It is called repeatedly
+        during the analysis, so the maximum can be lowered in the meantime.
+        :param budget: an optional budget of resources shared with the executors of other jobs (see executor/scheduler.py).
         :return: nothing.
         """
         self.config = config
+        self.cache = cache
+        self.store = store
+        self.mobile_limit = mobile_limit
+        self.budget = budget
 
         # We create an instantiation of the ARM diablo linux gcc.
         self.compiler = arm_diablo_linux_gcc.ARMDiabloLinuxGCC(self.config.arm_diablo_linux_gcc['bin_location'])
 
+        # We create the precompiled headers for the compilations for analysis, if requested.
+        self.pch = None
+        if self.config.arm_diablo_linux_gcc['precompiled_headers']:
+            pch_directory = os.path.join(self.cache.directory if self.cache is not None else self.config.default['output_directory'], 'pch')
+            self.pch = pch.PrecompiledHeaders(self.compiler, pch_directory)
+
         # We create an instantiation of the ARM diablo linux objdump.
         self.objdump = arm_diablo_linux_objdump.ARMDiabloLinuxObjdump(self.config.arm_diablo_linux_objdump['bin_location'])
 
         # We create an instantiation of the ELF reader tool.
         self.elf_reader = elf_reader.ElfReader(self.config.elf_reader['bin_location'])
 
+        # We create the comparator for object files and sections, keeping digests for the whole run.
+        self.comparator = comparator.Comparator(self.elf_reader, self.cache)
+
+        # The pool of processes the analysis is sharded across, created on first use (see get_analysis_pool).
+        self.analysis_pool = None
+        self.analysis_pool_lock = threading.Lock()
+
         # We create an instantiation of the ACTC tool chain.
         actc_path = os.path.join(self.config.default['output_directory'], 'actc')
         self.actc_ = actc.ACTC(self.config.actc['bin_location'], self.config.actc, actc_path)
 
-    def analyze(self, source_files, generated_versions, version_information):
-        # We create a dictionary with important analytics information.
-        analytics = dict()
-        analytics['general'] = dict()
-        analytics['general']['source_files'] = len(source_files)
-        analytics['general']['source_input'] = self.config.default['input_source_directory']
-        analytics['general']['transformations'] = len(generated_versions)
+    def check_mobile_limit(self, symbols_diff):
+        """
+        Method used to reject the versions as soon as they have more different symbols than the mobile limit.
+        :param symbols_diff: the symbols found to be different so far.
+        :return: nothing.
+        """
+        limit = self.mobile_limit() if self.mobile_limit is not None else None
+        if limit is not None and len(symbols_diff) > limit:
+            raise PrunedError('More than ' + str(limit) + ' mobile functions!')
 
-        def analyze_symbols_in_section_info(generated_versions, version_information, section_info):
-            # Initialize the symbol datastructures
-            symbol_info = dict()
-            for obj_name, obj in version_information[generated_versions[0]][section_info].items():
-                for symbol in obj[1].keys():
-                    symbol_tuple = (symbol, obj_name)
-                    symbol_info[symbol_tuple] = dict()
-                    symbol_info[symbol_tuple]['reasons'] = []
-
-            # We will start comparing the sections of the different versions.
-            symbols_diff = set()# The symbols which are considered 'different'.
-            sections_diff = []# The sections that are different.
-            for version_one, version_two in zip(generated_versions[:-1], generated_versions[1:]):
-                logging.debug("Comparing version: " + version_one + " and version: " + version_two)
-
-                # Iterate over all object files (we assume both versions have the same object files).
-                for object_file in version_information[version_one][section_info]:
-                    obj_dict_1 = version_information[version_one][section_info][object_file]
-                    obj_dict_2 = version_information[version_two][section_info][object_file]
-
-                    # Iterate over all symbols within this object file.
-                    # (we assume both versions have the same symbols)
-                    for symbol in obj_dict_1[1].keys():
-                        symbol_tuple = (symbol, object_file)
-
-                        # If the amount of sections for a symbol differ, they are considered different.
-                        if len(obj_dict_1[1][symbol]) != len(obj_dict_2[1][symbol]):
-                            # Debug.
-                            logging.debug("Symbol: " + symbol + " has different amount of sections in both versions, version one: " +
-                                    str(obj_dict_1[1][symbol]) + " version two: " + str(obj_dict_2[1][symbol]))
+    def analyze_symbols_in_section_info(self, generated_versions, version_information, section_info, stop_on_first_difference=False, limit_mobile=False):
+        """
+        Method used to compare the symbols in the given section information of all versions.
+        :param generated_versions: the versions to compare.
+        :param version_information: the version information of these versions.
+        :param section_info: the section information to compare (text_section_information or data_section_information).
+        :param stop_on_first_difference: whether to stop comparing as soon as a difference is found.
+        :param limit_mobile: whether the different symbols are subject to the mobile limit (see check_mobile_limit).
+        :return: the information per symbol, the symbols that are different and the sections that are different.
+        """
+        # Object files are compared independently, so with multiple analysis jobs they are sharded across processes. A check
+        # that stops on the first difference is cheap and mostly stops early, so it isn't worth shipping to other processes.
+        analysis_jobs = self.config.scheduler['analysis_jobs'] if self.config.scheduler['analysis_jobs'] else os.cpu_count()
+        if analysis_jobs > 1 and not stop_on_first_difference and len(generated_versions) > 1 and len(version_information[generated_versions[0]][section_info]) > 1:
+            return self.analyze_sharded(generated_versions, version_information, section_info, limit_mobile, analysis_jobs)
+
+        # Initialize the symbol datastructures
+        symbol_info = dict()
+        for obj_name, obj in version_information[generated_versions[0]][section_info].items():
+            for symbol in obj[1].keys():
+                symbol_tuple = (symbol, obj_name)
+                symbol_info[symbol_tuple] = dict()
+                symbol_info[symbol_tuple]['reasons'] = []
+                symbol_info[symbol_tuple]['differences'] = set()
+
+        # We will start comparing the sections of the different versions.
+        symbols_diff = set()# The symbols which are considered 'different'.
+        sections_diff = []# The sections that are different.
+        for idx, (version_one, version_two) in enumerate(zip(generated_versions[:-1], generated_versions[1:])):
+            logging.debug("Comparing version: " + version_one + " and version: " + version_two)
+            self.emit_analysis_progress(generated_versions, version_information, section_info, idx * len(version_information[version_one][section_info]))
+
+            # Iterate over all object files (we assume both versions have the same object files).
+            for object_file in version_information[version_one][section_info]:
+                obj_dict_1 = version_information[version_one][section_info][object_file]
+                obj_dict_2 = version_information[version_two][section_info][object_file]
+
+                # If the object files are identical, all of their symbols are equal.
+                if self.comparator.objects_equal(obj_dict_1[0], obj_dict_2[0]):
+                    continue
+
+                # Iterate over all symbols within this object file.
+                # (we assume both versions have the same symbols)
+                for symbol in obj_dict_1[1].keys():
+                    symbol_tuple = (symbol, object_file)
+
+                    # If the amount of sections for a symbol differ, they are considered different.
+                    if len(obj_dict_1[1][symbol]) != len(obj_dict_2[1][symbol]):
+                        # Debug.
+                        logging.debug("Symbol: " + symbol + " has different amount of sections in both versions, version one: " +
+                                str(obj_dict_1[1][symbol]) + " version two: " + str(obj_dict_2[1][symbol]))
+
+                        # We add information to our analytics.
+                        symbol_info[symbol_tuple]['reasons'].append("Different amount of sections comparing " + "version: \n" + version_one +
+                                "(" + str(obj_dict_1[1][symbol]) + ")\nand version: " + version_two + "(" + str(obj_dict_2[1][symbol]) + ").\n\n")
+
+                        # We append the symbol to the list of symbols which are considered different.
+                        symbols_diff.add(symbol_tuple)
+                        symbol_info[symbol_tuple]['differences'].add('sections')
+                        sections_diff.append((object_file, symbol, str(obj_dict_1[1][symbol])))
+                        if limit_mobile:
+                            self.check_mobile_limit(symbols_diff)
+                        if stop_on_first_difference:
+                            return (symbol_info, symbols_diff, sections_diff)
+                        continue
+
+                    # If the amount of sections are equal, we can start comparing the symbols.
+                    for section in obj_dict_1[1][symbol]:
+                        # We compare the specific section using the version one and version two object file.
+                        if not self.comparator.sections_equal(section, obj_dict_1[0], obj_dict_2[0]):
+                            # In relocation aware mode, we determine what kind of difference this is. Differences in only
+                            # the bits the linker fills in are ignored. Data sections are never classified: any difference
+                            # in them (e.g. a changed pointer initializer) has to reject the versions.
+                            difference = self.classify_difference(section, obj_dict_1[0], obj_dict_2[0]) if section_info == 'text_section_information' else 'data'
+                            symbol_info[symbol_tuple]['differences'].add(difference)
+                            if difference == 'relocations':
+                                symbol_info[symbol_tuple]['reasons'].append("Section: " + section + " only differs in " + difference + " when comparing\n" +
+                                        "version: " + version_one + " and version: " + version_two + " (ignored).\n\n")
+                                continue
+
+                            # If the sections are not equal, the symbols are considered different.
+                            symbols_diff.add(symbol_tuple)
 
-                            # We add information to our analytics.
-                            symbol_info[symbol_tuple]['reasons'].append("Different amount of sections comparing " + "version: \n" + version_one +
-                                    "(" + str(obj_dict_1[1][symbol]) + ")\nand version: " + version_two + "(" + str(obj_dict_2[1][symbol]) + ").\n\n")
+                            # We keep track of the specific symbol that is different.
+                            sections_diff.append((object_file, symbol, section))
+                            if limit_mobile:
+                                self.check_mobile_limit(symbols_diff)
 
-                            # We append the symbol to the list of symbols which are considered different.
-                            symbols_diff.add(symbol_tuple)
-                            continue
+                            # We add information to our analytics, explaining the difference in detail if requested.
+                            symbol_info[symbol_tuple]['reasons'].append("Section: " + section + " is different (" + difference + ") when comparing\n" +
+                                    "version: " + version_one + " and version: " + version_two + ".\n\n" +
+                                    (self.comparator.describe(section, obj_dict_1[0], obj_dict_2[0]) + "\n\n" if self.config.elf_reader['detailed_reasons'] else ""))
 
-                        # If the amount of sections are equal, we can start comparing the symbols.
-                        for section in obj_dict_1[1][symbol]:
-                            # We compare the specific section using the version one and version two object file.
-                            if not sections.compare(self.elf_reader, section, section, obj_dict_1[0], obj_dict_2[0]):
-                                # If the sections are not equal, the symbols are considered different.
-                                symbols_diff.add(symbol_tuple)
+                            # Debug.
+                            logging.debug("Section: " + section + " is different when comparing version: " + version_one + " and version: " + version_two)
 
-                                # We keep track of the specific symbol that is different.
-                                sections_diff.append((object_file, symbol, section))
+                            if stop_on_first_difference:
+                                return (symbol_info, symbols_diff, sections_diff)
 
-                                # We add information to our analytics.
-                                symbol_info[symbol_tuple]['reasons'].append("Section: " + section + " is different when comparing\n" +
-                                        "version: " + version_one + " and version: " + version_two + ".\n\n")
+        self.emit_analysis_progress(generated_versions, version_information, section_info)
+        return (symbol_info, symbols_diff, sections_diff)
 
-                                # Debug.
-                                logging.debug("Section: " + section + " is different when comparing version: " + version_one + " and version: " + version_two)
+    def emit_analysis_progress(self, generated_versions, version_information, section_info, compared=None):
+        """
+        Method used to emit the progress of comparing the symbols in the given section information of all versions.
+        :param generated_versions: the versions that are compared.
+        :param version_information: the version information of these versions.
+        :param section_info: the section information that is compared.
+        :param compared: the number of pairs of object files compared so far (all of them if not given).
+        :return: nothing.
+        """
+        total = len(version_information[generated_versions[0]][section_info]) * (len(generated_versions) - 1)
+        progress.emit('analysis', {'section_info': section_info, 'objects': total if compared is None else compared, 'total': total,
+                                   'comparisons': sum(self.comparator.counters.values())})
 
-            return (symbol_info, symbols_diff, sections_diff)
+    def analyze_sharded(self, generated_versions, version_information, section_info, limit_mobile, analysis_jobs):
+        """
+        Method used to compare the symbols in the given section information of all versions in a pool of processes,
+        every process comparing a shard of the object files (see analyze_shard). The partial results are merged in
+        the order in which analyze_symbols_in_section_info compares the versions and object files, so the result is the same.
+        :param generated_versions: the versions to compare.
+        :param version_information: the version information of these versions.
+        :param section_info: the section information to compare.
+        :param limit_mobile: whether the different symbols are subject to the mobile limit (see check_mobile_limit).
+        :param analysis_jobs: the number of processes.
+        :return: the information per symbol, the symbols that are different and the sections that are different.
+        """
+        object_files = list(version_information[generated_versions[0]][section_info])
+        order = {object_file: idx for idx, object_file in enumerate(object_files)}
+        shards = [object_files[idx::analysis_jobs] for idx in range(min(analysis_jobs, len(object_files)))]
+        mobile_limit = self.mobile_limit() if limit_mobile and self.mobile_limit is not None else None
+
+        # Every process only gets the version information of its own object files.
+        shard_results = []
+        pool = self.get_analysis_pool(analysis_jobs)
+        futures = [pool.submit(analyze_shard, self.config, generated_versions,
+                               {version: {section_info: {object_file: version_information[version][section_info][object_file] for object_file in shard}}
+                                for version in generated_versions}, section_info, mobile_limit) for shard in shards]
+        compared = 0
+        for shard, future in zip(shards, futures):
+            (results, comparator_state) = future.result()
+            self.comparator.merge(comparator_state)
+            shard_results.append(results)
+            compared += len(shard) * (len(generated_versions) - 1)
+            self.emit_analysis_progress(generated_versions, version_information, section_info, compared)
+
+        # Merge the results per pair of versions, in the order of the object files.
+        symbol_info = dict()
+        for obj_name, obj in version_information[generated_versions[0]][section_info].items():
+            for symbol in obj[1].keys():
+                symbol_info[(symbol, obj_name)] = {'reasons': [], 'differences': set()}
+        symbols_diff = set()
+        sections_diff = []
+        for idx in range(len(generated_versions) - 1):
+            pair_sections_diff = []
+            for results in shard_results:
+                (pair_symbol_info, pair_symbols_diff, shard_sections_diff) = results[idx]
+                for symbol_tuple, info in pair_symbol_info.items():
+                    symbol_info[symbol_tuple]['reasons'] += info['reasons']
+                    symbol_info[symbol_tuple]['differences'] |= info['differences']
+                symbols_diff |= pair_symbols_diff
+                pair_sections_diff += shard_sections_diff
+            sections_diff += sorted(pair_sections_diff, key=lambda section_diff: order[section_diff[0]])
+
+        if limit_mobile:
+            self.check_mobile_limit(symbols_diff)
+        return (symbol_info, symbols_diff, sections_diff)
+
+    def get_analysis_pool(self, analysis_jobs):
+        """
+        Method used to get the pool of processes the analysis is sharded across. A single pool is used for the whole
+        run, so comparisons happening at the same time don't each start their own processes.
+        :param analysis_jobs: the number of processes.
+        :return: the pool.
+        """
+        with self.analysis_pool_lock:
+            if self.analysis_pool is None:
+                self.analysis_pool = concurrent.futures.ProcessPoolExecutor(analysis_jobs, mp_context=multiprocessing.get_context('spawn'))
+            return self.analysis_pool
+
+    def close_analysis_pool(self):
+        with self.analysis_pool_lock:
+            if self.analysis_pool is not None:
+                self.analysis_pool.shutdown()
+            self.analysis_pool = None
+
+    def check_data_sections(self, generated_versions, version_information):
+        """
+        Method used to check that there are no differences in the data sections of the given versions.
+        Checking stops at the first difference, in which case the versions are rejected.
+        :param generated_versions: the versions to check.
+        :param version_information: the version information of these versions.
+        :return: nothing.
+        """
+        _, data_diff, data_sections_diff = self.analyze_symbols_in_section_info(generated_versions, version_information, "data_section_information", True)
+        if data_diff:
+            (object_file, symbol, section) = data_sections_diff[0]
+            raise RejectedError('Differences were introduced in data sections! (section ' + section + ' of ' + symbol + ' in ' + object_file + ')')
 
-        analytics['functions'], functions_diff, sections_diff = analyze_symbols_in_section_info(generated_versions, version_information, "text_section_information")
+    def analyze(self, source_files, generated_versions, version_information):
+        # We create a dictionary with important analytics information.
+        analytics = dict()
+        analytics['general'] = dict()
+        analytics['general']['source_files'] = len(source_files)
+        analytics['general']['source_input'] = self.config.default['input_source_directory']
+        analytics['general']['transformations'] = len(generated_versions)
+
+        # The data sections of all consecutive versions were checked for differences before (see the check tasks in
+        # schedule), so they are equal in every subset of the versions and only the text sections are analyzed.
+        analytics['functions'], functions_diff, sections_diff = self.analyze_symbols_in_section_info(generated_versions, version_information, "text_section_information",
+                                                                                                     limit_mobile=True)
         analytics['general']['amount_functions'] = len(analytics['functions'])
-        _, data_diff, data_sections_diff = analyze_symbols_in_section_info(generated_versions, version_information, "data_section_information")
-        sections_diff = sections_diff + data_sections_diff
+        analytics['general']['comparisons'] = dict(self.comparator.counters)
 
         # We determine which functions remained the same.
         functions_equal = set()
@@ -146,6 +375,7 @@ class Executor:
             function_tuple = (function, object_file)
             function_data.append({'name': function, 'mobile': analytics['functions'][function_tuple]['mobile'],
                                   'reasons': analytics['functions'][function_tuple]['reasons'],
+                                  'differences': sorted(analytics['functions'][function_tuple]['differences']),
                                   'obj_file': object_file})
 
         analytics['functions'] = function_data
@@ -159,18 +389,116 @@ class Executor:
 
         # Debug
         logging.debug("Functions considered different: " + str(functions_diff))
-        logging.debug("Data considered different: " + str(data_diff))
         logging.debug("Sections which are different: " + str(sections_diff))
 
-        return (analytics, functions_diff, data_diff)
+        return (analytics, functions_diff)
+
+    def fingerprint(self, section, object_file):
+        """
+        Method used to get the fingerprint of a section (see Comparator.section_digest). When comparing relocation
+        aware, sections that only differ in their relocations have the same fingerprint, as the analysis doesn't
+        consider them different (see Comparator.relocation_aware_digest).
+        :param section: the name of the section.
+        :param object_file: the object file containing the section.
+        :return: the fingerprint of the section.
+        """
+        if self.config.elf_reader['section_comparison'] == 'relocation_aware':
+            return self.comparator.relocation_aware_digest(section, object_file)
+        return self.comparator.section_digest(section, object_file)
+
+    def classify_difference(self, section, object_file_one, object_file_two):
+        """
+        Method used to determine the kind of difference between two sections with different fingerprints.
+        :param section: the name of the section.
+        :param object_file_one: the first object file.
+        :param object_file_two: the second object file.
+        :return: the kind of difference (see sections.compare_relocation_aware), or 'raw' when comparing raw dumps.
+        """
+        if self.config.elf_reader['section_comparison'] != 'relocation_aware':
+            return 'raw'
+
+        return self.comparator.classify(section, object_file_one, object_file_two)
 
-    def execute_semantic_mod(self, source_files, mode):
+    def evaluate_cost_model(self, version, version_information, mobile_functions):
+        """
+        Method used to rank the mobile functions by their estimated runtime cost, using an execution profile.
+        The report is written to the output directory, and a warning is printed when the mobile functions
+        exceed the overhead budget, and another one when they contain hot functions.
+        :param version: the version whose object files are used to determine the function sizes.
+        :param version_information: the version information.
+        :param mobile_functions: the (function, object file) tuples that are mobile.
+        :return: the cost model report.
+        """
+        # Read the profile, address profiles are mapped onto functions using the profiled binary.
+        functions = cost_model.read_function_symbols(self.elf_reader, self.config.cost_model['profile_binary']) if self.config.cost_model['profile_binary'] else None
+        counts = cost_model.read_profile(self.config.cost_model['profile'], functions)
+
+        # The size of a function is the total size of its text sections (not counting relocation sections).
+        sizes = dict()
+        section_sizes = dict()
+        for function, object_file in mobile_functions:
+            object_path, symbols = version_information[version]["text_section_information"][object_file]
+            if object_path not in section_sizes:
+                section_sizes[object_path] = sections.parse_section_sizes(self.elf_reader.read_file(['-S', '-W'], object_path))
+            sizes[(function, object_file)] = sum(section_sizes[object_path].get(section, 0) for section in symbols[function] if not section.startswith('.rel'))
+
+        report = cost_model.evaluate(mobile_functions, counts, sizes, self.config.cost_model)
+        report['seed'] = self.config.semantic_mod['seed']
+        report['transformation_type'] = self.config.semantic_mod['type']
+        with open(os.path.join(self.config.default['output_directory'], 'cost_model.json'), 'w') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        if report['over_budget']:
+            print('************ Seed ' + report['seed'] + ' (' + report['transformation_type'] + ') exceeds the overhead budget: estimated cost ' +
+                  str(round(report['total_cost'], 3)) + ' of ' + str(report['budget']) + ' **********')
+        if report['hot_functions']:
+            print('************ Seed ' + report['seed'] + ' (' + report['transformation_type'] + ') makes hot functions mobile: ' +
+                  ', '.join(report['hot_functions']) + ' **********')
+
+        return report
+
+    def fingerprint_versions(self, generated_versions, version_information):
+        """
+        Method used to fingerprint all symbols of the given versions, so versions can later be compared
+        against them without their object files.
+        :param generated_versions: the versions to fingerprint.
+        :param version_information: the version information of these versions.
+        :return: a dictionary {version: {section_info: {object file: {symbol: [[section, fingerprint]]}}}}.
+        """
+        fingerprints = dict()
+        for version in generated_versions:
+            fingerprints[version] = dict()
+            for section_info in ["text_section_information", "data_section_information"]:
+                fingerprints[version][section_info] = dict()
+                for object_file, (object_path, symbols) in version_information[version][section_info].items():
+                    fingerprints[version][section_info][object_file] = {symbol: [[section, self.fingerprint(section, object_path)] for section in symbol_sections]
+                                                                        for symbol, symbol_sections in symbols.items()}
+        return fingerprints
+
+    def store_fingerprints(self, fingerprints, mobile_functions):
+        """
+        Method used to store the fingerprints of a version set and its mobile functions in the output directory.
+        :param fingerprints: the fingerprints of all versions in the set (see fingerprint_versions).
+        :param mobile_functions: the (function, object file) tuples that are mobile.
+        :return: nothing.
+        """
+        with open(os.path.join(self.config.default['output_directory'], 'fingerprints.json'), 'w') as f:
+            data = dict()
+            data['fingerprint_format'] = FINGERPRINT_FORMATS[self.config.elf_reader['section_comparison']]
+            data['versions'] = fingerprints
+            data['mobile_functions'] = sorted([list(function) for function in mobile_functions])
+            json.dump(data, f, ensure_ascii=False)
+
+    def execute_semantic_mod(self, source_files, mode, output_directory=None):
         """
         Method which applies the semantic modification tool for source to source transformations.
         :param source_files: list of source files in the input directory.
         :param mode: the type of transformation to apply.
+        :param output_directory: the directory the versions are generated in (the configured output directory if not given).
         :return: a list of generated versions in the output directory.
         """
+        output_directory = output_directory if output_directory else self.config.default['output_directory']
+
         # We execute the semantic modification tool with the given source files (and options).
         logging.debug("Starting the struct reordering source to source transformations...")
         semantic_mod_tool = semantic_mod.SemanticMod(self.config.semantic_mod['bin_location'],
@@ -178,12 +506,12 @@ class Executor:
         extra_opts = ['--nr_of_versions', str(self.config.default['nr_of_versions']), '--seed', self.config.semantic_mod['seed']]
 
         semantic_mod_tool.execute_structure_reordering(self.config.default['input_source_directory'], source_files,
-                                                       self.config.default['output_directory'],
+                                                       output_directory,
                                                        mode,
                                                        extra_opts)
 
         # We analyze the output directory.
-        generated_versions = file.discover_subdirectories(self.config.default['output_directory'])
+        generated_versions = file.discover_subdirectories(output_directory)
         logging.debug("Versions: " + str(generated_versions))
         logging.debug("Tool generated: " + str(len(generated_versions)) + " out of " +
                       self.config.default['nr_of_versions'] + " requested versions.")
@@ -191,7 +519,7 @@ class Executor:
         # We iterate over each generated version.
         for version in generated_versions:
             # We obtain the directory structure of the given version.
-            version_directory = os.path.join(self.config.default['output_directory'], version)
+            version_directory = os.path.join(output_directory, version)
             file.copy_tree_without_overwrite(self.config.default['input_source_directory'], version_directory, [self.config.default['suffix_source'], self.config.default['suffix_header']])
 
         # We return a list of generated versions in the output directory.
@@ -200,7 +528,7 @@ class Executor:
     def execute(self, mode, testmode):
         """
         Method used to start the execution of the main flow.
-        :return: nothing.
+        :return: the generated versions and the functions that were considered different.
         """
 
         if mode < 0:
@@ -215,28 +543,245 @@ class Executor:
             if mode == -2:
                 print('************ Running ACTC with CM **********')
                 self.run_actc(['base'], version_information, set('__________this_function_definitely_does_not_exist____________'))
-            return
+            return (['base'], [])
 
         # Gather all the source files
-        source_files = file.get_files_with_suffix(self.config.default['input_source_directory'], [self.config.default['suffix_source']])
+        source_files = self.get_source_files()
 
         # We apply the semantic modification tool for source to source transformations.
         print('************ Running semantic-mod tool **********')
+        progress.emit('stage', {'stage': 'semantic_mod'})
         generated_versions = self.execute_semantic_mod(source_files, self.config.semantic_mod['type'])
 
         if not generated_versions:
             print('************ No versions generated! **********')
-            return
+            return ([], [])
+        progress.emit('versions', {'versions': len(generated_versions)})
 
-        # Gather all version information
+        # All further work is scheduled as a graph of tasks per version and per object file, so that e.g. a version
+        # is already read while the next one is compiling, and tested as soon as it is built. Every version is
+        # checked for differences in its data sections against the previous one as soon as both are gathered,
+        # so a broken seed is rejected without gathering the other versions.
         print('************ Gathering version information **********')
-        version_information = self.gather_version_information(generated_versions)
+        start = time.time()
+        version_information = dict()
+        stage_scheduler = scheduler.Scheduler(self.get_resource_capacities(), self.budget)
+        self.schedule(stage_scheduler, source_files, generated_versions, version_information, mode, testmode)
+        try:
+            stage_scheduler.run()
+        except RejectedError as e:
+            # Record why the versions were rejected, and (an estimate of) the gathering time this saved.
+            elapsed = time.time() - start
+            with open(os.path.join(self.config.default['output_directory'], 'result.json'), 'w') as f:
+                data = dict()
+                data["rejected"] = str(e)
+                data["elapsed"] = elapsed
+                data["skipped_versions"] = len(generated_versions) - len(version_information)
+                data["estimated_time_saved"] = elapsed / len(version_information) * data["skipped_versions"]
+                json.dump(data, f, ensure_ascii=False)
+            raise
+        finally:
+            self.close_analysis_pool()
+            self.store_schedule(stage_scheduler)
+
+        generated_versions = stage_scheduler.result('select')
+        functions_diff = stage_scheduler.result('analyze')
+        return (generated_versions, functions_diff)
+
+    def get_resource_capacities(self):
+        """
+        Method used to get the capacities of the resource classes tasks are scheduled on (see executor/scheduler.py).
+        :return: a dictionary {resource class: capacity}.
+        """
+        capacities = dict()
+        capacities['cpu'] = self.config.scheduler['cpu'] if self.config.scheduler['cpu'] else os.cpu_count()
+        capacities['board'] = self.config.scheduler['board']
+
+        # Compilation for analysis happens through a single symlink, and the ACTC builds every version in the same path
+        # (so the protected binaries are identical). Both are serialized within a job, whatever the number of CPUs.
+        capacities['uniform_path'] = 1
+        capacities['actc'] = 1
+
+        # The SPEC regression scripts run as many tests at the same time as configured. Mobile blocks are deployed per
+        # AID, which all versions share, so deploying the blocks of a version and testing it happens one at a time.
+        capacities['spec'] = self.config.testing['jobs']
+        capacities['deployment'] = 1
+        return capacities
+
+    def schedule(self, stage_scheduler, source_files, generated_versions, version_information, mode, testmode):
+        """
+        Method used to add the tasks of the main flow (after generating the versions) to a scheduler:
+            compile:<version>               compile a version for analysis.
+            read:<version>:<object file>    disassemble and read an object file of a version (added by the compile task).
+            parse:<version>                 parse the sections of a version (added by the compile task).
+            check:<version>:<version>       check two consecutive versions for differences in their data sections.
+            select                          select the subset of versions that is used further on.
+            analyze                         find the functions that differ and store the analysis results.
+        After the analysis, the analyze task adds the tasks using the selected versions (see schedule_builds).
+        :param stage_scheduler: the scheduler.
+        :param source_files: the source files in the input directory.
+        :param generated_versions: the generated versions.
+        :param version_information: the version information, which is filled in by the tasks.
+        :param mode: the mode in which the executor is executed.
+        :param testmode: the mode in which testing happens.
+        :return: nothing.
+        """
+        def compile_version(version):
+            version_dict = self.compile_version(version)
+
+            # Every object file is read by its own task, after which the sections of the version are parsed.
+            reads = []
+            for idx, object_file in enumerate(version_dict["object_files"]):
+                reads.append(stage_scheduler.add('read:' + version + ':' + os.path.relpath(object_file, version_dict["object_files_directory"]),
+                                                 lambda idx=idx: self.read_object_file(version_dict, idx), ['compile:' + version]))
+
+            def parse_version():
+                self.parse_version(version_dict)
+                version_information[version] = version_dict
+            stage_scheduler.add('parse:' + version, parse_version, reads)
 
+        for version in generated_versions:
+            stage_scheduler.add('compile:' + version, lambda version=version: compile_version(version), [], ['cpu', 'uniform_path'])
+        checks = []
+        for version_one, version_two in zip(generated_versions[:-1], generated_versions[1:]):
+            checks.append(stage_scheduler.add('check:' + version_one + ':' + version_two,
+                                              lambda versions=[version_one, version_two]: self.check_data_sections(versions, version_information),
+                                              ['parse:' + version_one, 'parse:' + version_two]))
+
+        stage_scheduler.add('select', lambda: self.select_versions(generated_versions, version_information), ['parse:' + version for version in generated_versions] + checks)
+
+        def analyze():
+            selected_versions = stage_scheduler.result('select')
+            print('************ Analyzing differences **********')
+            functions_diff = self.store_analysis(source_files, selected_versions, version_information, mode)
+            self.schedule_builds(stage_scheduler, selected_versions, version_information, mode, testmode)
+            return functions_diff
+        stage_scheduler.add('analyze', analyze, ['select'])
+
+    def schedule_builds(self, stage_scheduler, generated_versions, version_information, mode, testmode):
+        """
+        Method used to add the tasks of the main flow after the analysis to a scheduler:
+            annotate                        write the mobile block annotations.
+            actc:<version>                  build a version using the ACTC.
+            compare                         check that all protected binaries are the same.
+            delta:<version>:<version>       create the delta package of the mobile blocks between two versions.
+            delta_report                    store the transfer size savings of all delta packages.
+            initialize_board                set the testing environment up remotely.
+            test:<version>                  test a version.
+            spec_results                    store the results of the SPEC regression scripts.
+            benchmark                       benchmark all versions against the base build.
+        :param stage_scheduler: the scheduler.
+        :param generated_versions: the (selected) versions.
+        :param version_information: the version information.
+        :param mode: the mode in which the executor is executed.
+        :param testmode: the mode in which testing happens.
+        :return: nothing.
+        """
+        # In these modes we run the ACTC on the rewritten source code, without (1) or **with** (2) code mobility.
+        if mode not in [1, 2]:
+            return
+        stage_scheduler.add('annotate', lambda: self.write_annotations(set() if mode == 1 else stage_scheduler.result('analyze')), ['analyze'])
+        builds = []
+        for version in generated_versions:
+            def build_version(version=version):
+                print('************ Running ACTC ' + ('without' if mode == 1 else 'with') + ' CM for ' + version + ' **********')
+                self.build_version(version, version_information, stage_scheduler.result('annotate'))
+            builds.append(stage_scheduler.add('actc:' + version, build_version, ['annotate'], ['cpu', 'actc']))
+
+        # Sanity check: the protected binaries we generated must be the same
+        if mode == 2:
+            def compare():
+                binaries = [os.path.join(self.actc_.get_output_dir(version), self.config.default['binary_name']) for version in generated_versions]
+                assert self.objdump.compare_binaries(binaries), 'Not all protected binaries we generated are the same!'
+            stage_scheduler.add('compare', compare, builds)
+
+        # The delta packages of every version transition are created as soon as both versions are built.
+        if mode == 2 and self.config.delta['enabled']:
+            transitions = self.get_delta_transitions(generated_versions)
+            deltas = [stage_scheduler.add('delta:' + old_version + ':' + new_version, lambda transition=(old_version, new_version): self.create_delta_package(*transition),
+                                          ['actc:' + old_version, 'actc:' + new_version]) for old_version, new_version in transitions]
+            stage_scheduler.add('delta_report', lambda: self.store_delta_report([(transition, stage_scheduler.result(task)) for transition, task in zip(transitions, deltas)]), deltas)
+
+        # Every version is tested as soon as it is built, benchmarking needs all versions.
+        if not testmode:
+            return
+        testing_directory = self.get_testing_directory()
+        if testmode in [1, 3]:
+            stage_scheduler.add('initialize_board', self.initialize_board, ['analyze'], ['board'])
+        if testmode == 1:
+            for version in generated_versions:
+                stage_scheduler.add('test:' + version, lambda version=version: self.test_version(version, testing_directory), ['actc:' + version, 'initialize_board'], ['board'])
+        elif testmode == 2:
+            # Only the versions built with code mobility have mobile blocks to deploy.
+            resources = ['spec', 'deployment'] if mode == 2 else ['spec']
+            tests = [stage_scheduler.add('test:' + version, lambda version=version: self.test_spec_version(version, testing_directory), ['actc:' + version], resources)
+                     for version in generated_versions]
+            stage_scheduler.add('spec_results', lambda: self.store_spec_results({version: stage_scheduler.result('test:' + version) for version in generated_versions},
+                                                                                testing_directory), tests)
+        elif testmode == 3:
+            stage_scheduler.add('benchmark', lambda: self.benchmark_versions(generated_versions, testing_directory), builds + ['initialize_board'], ['board'])
+
+    def select_versions(self, generated_versions, version_information):
+        """
+        Method used to select the subset of versions with the fewest mobile functions, as a single outlier version
+        can make many functions mobile in all versions. Either the configured number of versions is selected, or
+        as many versions as possible within the configured budget of mobile functions. Whether a function is
+        mobile is estimated from the fingerprints of its sections, the selected versions are analyzed afterwards.
+        :param generated_versions: the generated versions.
+        :param version_information: the version information of these versions.
+        :return: the selected versions, in the order they were generated.
+        """
+        if not self.config.selection['versions'] and self.config.selection['mobile_budget'] is None:
+            return generated_versions
+
+        print('************ Selecting versions **********')
+        patterns = selection.get_patterns(self.fingerprint_versions(generated_versions, version_information), generated_versions)
+        if self.config.selection['mobile_budget'] is not None:
+            subset = selection.largest_subset(patterns, len(generated_versions), self.config.selection['mobile_budget'], min(2, len(generated_versions)))
+            if subset is None:
+                raise RejectedError('No two versions have at most ' + str(self.config.selection['mobile_budget']) + ' mobile functions!')
+        else:
+            subset = selection.best_subset(patterns, len(generated_versions), self.config.selection['versions'])
+        (indices, mobile) = subset
+        selected_versions = [generated_versions[idx] for idx in indices]
+
+        with open(os.path.join(self.config.default['output_directory'], 'selection.json'), 'w') as f:
+            data = dict()
+            data["selected_versions"] = selected_versions
+            data["estimated_amount_mobile"] = mobile
+            data["amount_mobile_all_versions"] = selection.cost(patterns, range(len(generated_versions)))
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print('************ Selected ' + str(len(selected_versions)) + ' of ' + str(len(generated_versions)) + ' versions (' + str(mobile) + ' instead of ' +
+              str(selection.cost(patterns, range(len(generated_versions)))) + ' mobile functions): ' + ', '.join(selected_versions) + ' **********')
+        return selected_versions
+
+    def store_analysis(self, source_files, generated_versions, version_information, mode):
+        """
+        Method used to analyze the versions, and to store the analysis results in the output directory.
+        :param source_files: the source files in the input directory.
+        :param generated_versions: the generated versions.
+        :param version_information: the version information of these versions.
+        :param mode: the mode in which the executor is executed.
+        :return: the functions that were considered different.
+        """
         # Do some analysis and find those functions that differ.
-        # Make sure there aren't any differences in the data sections.
-        print('************ Analyzing differences **********')
-        (analytics, functions_diff, data_diff) = self.analyze(source_files, generated_versions, version_information)
-        assert not data_diff, 'Differences were introduced in data sections!'
+        (analytics, functions_diff) = self.analyze(source_files, generated_versions, version_information)
+
+        # Record the number of different sections per pair of versions, to estimate the amount of work of later runs.
+        timings.record_statistic(self.config.default['binary_name'], 'different_sections', self.comparator.differences / max(1, len(generated_versions) - 1))
+
+        # Store the analytics, containing the reasons why every function is (not) mobile.
+        with open(os.path.join(self.config.default['output_directory'], 'analytics.json'), 'w') as f:
+            json.dump(analytics, f, ensure_ascii=False, indent=2)
+
+        # Store the fingerprints of this version set, so versions can be appended to it later on.
+        mobile_functions = [(function['name'], function['object_file']) for function in analytics['general']['mobile_functions']]
+        self.store_fingerprints(self.fingerprint_versions(generated_versions, version_information), mobile_functions)
+
+        # Estimate the runtime cost of the mobile functions, if an execution profile is available.
+        if self.config.cost_model['profile']:
+            print('************ Evaluating cost model **********')
+            self.evaluate_cost_model(generated_versions[0], version_information, mobile_functions)
 
         # In this mode we will stop execution here and output the result as a json file as well.
         if mode == 0:
@@ -247,94 +792,314 @@ class Executor:
                 data["amount_mobile"] = analytics["general"]["amount_mobile"]
                 json.dump(data, f, ensure_ascii=False)
 
-        # In this mode we run the ACTC on the rewritten source code, without code mobility.
-        elif mode == 1:
-            print('************ Running ACTC without CM **********')
-            self.run_actc(generated_versions, version_information, set())
+        return functions_diff
+
+    def store_schedule(self, stage_scheduler):
+        """
+        Method used to store the timing of all scheduled tasks in the output directory, and to report the critical path.
+        :param stage_scheduler: the scheduler.
+        :return: nothing.
+        """
+        report = stage_scheduler.report()
+        with open(os.path.join(self.config.default['output_directory'], 'schedule.json'), 'w') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        print('************ Critical path (' + str(round(report['critical_path_duration'], 1)) + 's of ' + str(round(report['wall_time'], 1)) + 's): ' +
+              ' -> '.join(report['critical_path']) + ' **********')
+
+    def execute_append(self, mode, testmode):
+        """
+        Method used to append new versions to the version set that was generated earlier in the output directory.
+        Only the new versions are generated and analyzed, they are compared against the stored fingerprints of the
+        existing set. The existing versions are only rebuilt if the set of mobile functions changed.
+        :return: all versions in the set and the functions that are considered different.
+        """
+        output_directory = self.config.default['output_directory']
+        fingerprints_path = os.path.join(output_directory, 'fingerprints.json')
+        assert os.path.exists(fingerprints_path), 'No version set to append to in ' + output_directory + '!'
+        stored = file.read_json(fingerprints_path)
+        assert stored.get('fingerprint_format') == FINGERPRINT_FORMATS[self.config.elf_reader['section_comparison']], 'The version set in ' + output_directory + ' was fingerprinted differently, it can\'t be appended to!'
+        existing_versions = sorted(stored['versions'])
+        missing = [version for version in existing_versions if not os.path.isdir(os.path.join(output_directory, version))]
+        assert not missing, 'The source directories of versions ' + ', '.join(missing) + ' are missing in ' + output_directory + ', they can\'t be rebuilt!'
+        mobile_functions = set(tuple(function) for function in stored['mobile_functions'])
+        old_functions_diff = sorted(set(function for (function, object_file) in mobile_functions))
+
+        # We generate the new versions in a staging directory, and move them next to the existing ones.
+        print('************ Running semantic-mod tool **********')
+        progress.emit('stage', {'stage': 'semantic_mod'})
+        staging_directory = os.path.join(output_directory, 'append_' + self.config.semantic_mod['seed'])
+        shutil.rmtree(staging_directory, True)
+        os.makedirs(staging_directory)
+        new_versions = []
+        for version in self.execute_semantic_mod(self.get_source_files(), self.config.semantic_mod['type'], staging_directory):
+            new_version = version + '_' + self.config.semantic_mod['seed']
+            assert new_version not in existing_versions, 'Version ' + new_version + ' already exists, use another seed!'
+            os.rename(os.path.join(staging_directory, version), os.path.join(output_directory, new_version))
+            new_versions.append(new_version)
+        shutil.rmtree(staging_directory)
+
+        if not new_versions:
+            print('************ No versions generated! **********')
+            return (existing_versions, old_functions_diff)
+        progress.emit('versions', {'versions': len(new_versions)})
 
-        # In this mode we run the ACTC on the rewritten source code, **with** code mobility.
+        # Gather the version information for the new versions only.
+        print('************ Gathering version information **********')
+        version_information = self.gather_version_information(new_versions)
+        new_fingerprints = self.fingerprint_versions(new_versions, version_information)
+
+        # A symbol is different within the set when it is different in any of the versions. As all non-mobile
+        # symbols are equal in the existing versions, we compare the new versions against the first existing one.
+        print('************ Analyzing differences **********')
+        progress.emit('stage', {'stage': 'analyze'})
+        reference = stored['versions'][existing_versions[0]]
+        data_diff = set()
+        for version in new_versions:
+            for section_info, symbols_diff in [("text_section_information", mobile_functions), ("data_section_information", data_diff)]:
+                for object_file, symbols in reference[section_info].items():
+                    for symbol, symbol_fingerprints in symbols.items():
+                        if new_fingerprints[version][section_info][object_file].get(symbol) != symbol_fingerprints:
+                            logging.debug("Symbol: " + symbol + " in version: " + version + " differs from the existing versions.")
+                            symbols_diff.add((symbol, object_file))
+        if data_diff:
+            raise RejectedError('Differences were introduced in data sections!')
+        functions_diff = sorted(set(function for (function, object_file) in mobile_functions))
+
+        # Determine which versions have to be built, and report this up front. The existing versions
+        # only have to be rebuilt when their annotations (the mobile functions) changed.
+        all_versions = existing_versions + new_versions
+        for version in existing_versions:
+            version_information[version] = {'version_directory': os.path.join(output_directory, version)}
+        if mode != 2 or functions_diff == old_functions_diff:
+            build_versions = new_versions
+            if mode:
+                print('************ Mobile functions unchanged, building ' + str(len(new_versions)) + ' new version(s) **********')
+        else:
+            build_versions = all_versions
+            print('************ ' + str(len(functions_diff) - len(old_functions_diff)) + ' new mobile function(s): ' +
+                  ', '.join(sorted(set(functions_diff) - set(old_functions_diff))) + ' **********')
+            print('************ Rebuilding all ' + str(len(all_versions)) + ' versions **********')
+
+        # The sanity check and the delta packages need the protected binaries and mobile blocks of the whole set, the
+        # existing versions of which may not have been retained (see core/retention.py). Those are rebuilt.
+        if mode == 2:
+            missing = [version for version in existing_versions if version not in build_versions and
+                       not all(os.path.exists(path) for path in [os.path.join(self.actc_.get_output_dir(version), self.config.default['binary_name']),
+                                                                 self.actc_.get_mobile_blocks_dir(version)])]
+            if missing:
+                print('************ Rebuilding ' + str(len(missing)) + ' existing version(s) of which the binaries were not retained: ' + ', '.join(missing) + ' **********')
+                build_versions = [version for version in all_versions if version in build_versions or version in missing]
+
+        # Store the fingerprints of the complete version set.
+        stored['versions'].update(new_fingerprints)
+        self.store_fingerprints(stored['versions'], mobile_functions)
+
+        if mode == 1:
+            print('************ Running ACTC without CM **********')
+            progress.emit('stage', {'stage': 'actc'})
+            self.run_actc(build_versions, version_information, set())
         elif mode == 2:
             print('************ Running ACTC with CM **********')
-            self.run_actc(generated_versions, version_information, functions_diff)
+            progress.emit('stage', {'stage': 'actc'})
+            self.run_actc(build_versions, version_information, functions_diff)
 
-            # Sanity check: the protected binaries we generated must be the same
-            binaries = [os.path.join(self.actc_.get_output_dir(version), self.config.default['binary_name']) for version in generated_versions]
+            # Sanity check: the protected binaries of the whole set must be the same
+            binaries = [os.path.join(self.actc_.get_output_dir(version), self.config.default['binary_name']) for version in all_versions]
             assert self.objdump.compare_binaries(binaries), 'Not all protected binaries we generated are the same!'
 
-        # If we are in a mode where binaries are actually created, we can test them.
+            # The delta packages of the whole set are created again, as the existing versions can be rebuilt.
+            if self.config.delta['enabled']:
+                print('************ Creating delta packages **********')
+                progress.emit('stage', {'stage': 'delta'})
+                self.store_delta_report([(transition, self.create_delta_package(*transition)) for transition in self.get_delta_transitions(all_versions)])
+
+        # If we are in a mode where binaries are actually created, we can test the ones we built.
         if mode and testmode:
             print('************ Testing for correctness **********')
-            self.test(generated_versions, testmode)
+            progress.emit('stage', {'stage': 'test'})
+            self.test(build_versions, testmode)
+
+        return (all_versions, functions_diff)
+
+    def plan(self, mode, testmode, history):
+        """
+        Method used to count the tool invocations the main flow would make, without executing any tools.
+        :param mode: the mode in which the executor would be executed.
+        :param testmode: the mode in which testing would happen.
+        :param history: the timings history (see timings.read_history), containing the statistics of earlier runs.
+        :return: a list of (stage, tool, number of invocations) tuples. The number of invocations is None if it can't be estimated.
+        """
+        # A base run only runs the ACTC.
+        if mode < 0:
+            return [('actc', 'actc_clean', 1), ('actc', 'actc', 1)]
+
+        nr_of_versions = int(self.config.default['nr_of_versions'])
+        nr_of_source_files = len(self.get_source_files())
+        different_sections = history['benchmarks'].get(self.config.default['binary_name'], dict()).get('different_sections')
+
+        # Every version is compiled, disassembled and read. Sections are compared in-process, only the sections that
+        # differ between consecutive versions are dumped, to classify or explain the difference.
+        stages = [('semantic_mod', 'semantic_mod', 1),
+                  ('gather', 'compile', nr_of_versions * nr_of_source_files),
+                  ('gather', 'objdump', nr_of_versions * nr_of_source_files),
+                  ('gather', 'readelf', nr_of_versions * nr_of_source_files)]
+        dumps = int(self.config.elf_reader['section_comparison'] == 'relocation_aware') + int(self.config.elf_reader['detailed_reasons'])
+        if dumps:
+            stages.append(('analyze', 'readelf', round(2 * dumps * (nr_of_versions - 1) * different_sections) if different_sections is not None else None))
+
+        # In relocation aware mode, the relocations, section headers and symbols are read for (at most) every object file.
+        if self.config.elf_reader['section_comparison'] == 'relocation_aware':
+            stages.append(('analyze', 'readelf', 3 * nr_of_versions * nr_of_source_files))
+
+        if mode in [1, 2]:
+            stages.append(('actc', 'actc_clean', nr_of_versions))
+            stages.append(('actc', 'actc', nr_of_versions))
+        if mode == 2:
+            stages.append(('actc', 'compare_binary', nr_of_versions))
+        if mode and testmode:
+            stages.append(('test', 'test', None))
+
+        return stages
+
+    def get_source_files(self):
+        """
+        Method used to get all source files in the input directory.
+        :return: a list of source files.
+        """
+        if self.cache is not None:
+            return self.cache.get_files_with_suffix(self.config.default['input_source_directory'], [self.config.default['suffix_source']])
+
+        return file.get_files_with_suffix(self.config.default['input_source_directory'], [self.config.default['suffix_source']])
 
     def gather_version_information(self, generated_versions):
         # We build a dictionary containing all relevant information of the current version.
         version_information = dict()
-        for version in generated_versions:
-            # Create dictionary for this specific version. Get some paths and make directories.
-            version_dict = version_information[version] = dict()
-            version_dict["analysis_directory"] = os.path.join(self.config.default['output_directory'], version + "_analysis")
-            version_dict["version_directory"] = os.path.join(self.config.default['output_directory'], version)
-
-            # The first step is to compile all source files into object files in the analysis directory.
-            # We compile the source files through a symlink to increase uniformity between
-            # the versions and avoid cause data differences between versions because of __FILE__.
-            compile_dir = os.path.join(self.config.default['output_directory'], 'uniform_compilation')
-            os.symlink(version_dict["version_directory"], compile_dir)
-            version_dict["source_files"] = file.get_files_with_suffix(compile_dir, [self.config.default['suffix_source']])
-            version_dict["object_files_directory"] = os.path.join(version_dict["analysis_directory"], "objfiles")
-            version_dict["object_files"] = file.create_output_paths(version_dict["source_files"], compile_dir, version_dict["object_files_directory"], ".o")
-            self.compiler.create_object_files(self.config.actc['common_options'] + self.config.actc['preprocessor_flags'] + self.config.actc['compiler_flags'], version_dict["source_files"], version_dict["object_files"])
-
-            # Generate paths for the analysis files we will generate from the object files.
-            version_dict["diss_files"] = file.create_output_paths(version_dict["source_files"], compile_dir, version_dict["object_files_directory"], "_diss.out")
-            version_dict["elf_files"] = file.create_output_paths(version_dict["source_files"], compile_dir, version_dict["object_files_directory"], ".elf")
-            version_dict["section_files"] = file.create_output_paths(version_dict["source_files"], compile_dir, version_dict["object_files_directory"], ".sections")
-            os.remove(compile_dir)
+        for idx, version in enumerate(generated_versions):
+            version_dict = version_information[version] = self.compile_version(version)
 
             # We disassemble the generated object files (for DEBUGGING purposes ONLY!), and dump all relevant section information using readelf.
-            self.objdump.disassemble_obj_files(self.config.arm_diablo_linux_objdump["base_flags"], version_dict["object_files"], version_dict["diss_files"])
-            self.elf_reader.read_files(self.config.elf_reader["base_flags"], version_dict["object_files"], version_dict["elf_files"])
-
-            # We use a custom parser to parse all relevant code (.text) sections
-            # out of the ELF files. The result is a list of a list of section names.
-            # Every list in the result corresponds to a parsed input file.
-            data_sections = parser.Parser.parse_files(version_dict["elf_files"], parser.data_section_extracter, version_dict["section_files"])
-            text_sections = parser.Parser.parse_files(version_dict["elf_files"], parser.text_section_extracter, version_dict["section_files"])
-
-            def create_section_dict(version_dict, section_set):
-                # We iterate over sets of sections.
-                # We are going to store information regarding the different sections in a dictionary.
-                # {obj_file_name: (obj_path, {func_name: [sections]})}
-                section_info = dict()
-                for idx, sect in enumerate(section_set):
-                    # We obtain the relative path to the file of the corresponding object file.
-                    obj_file_name = os.path.relpath(version_dict["object_files"][idx], version_dict["object_files_directory"])
-
-                    # We create an entry base on the relative path and add a tuple of the full path
-                    # and an empty dictionary.
-                    section_info[obj_file_name] = (version_dict["object_files"][idx], dict())
-
-                    # We iterate over all sections.
-                    for section in sect:
-                        # We determine the symbol to which it corresponds.
-                        name = sections.extract_symbol_name(section)
-
-                        # We check if the symbol already exists in our dictionary.
-                        if name not in section_info[obj_file_name][1]:
-                            # We create a new entry containing a single list with the section.
-                            section_info[obj_file_name][1][name] = [section]
-                        else:
-                            # We add the section to the existing list.
-                            section_info[obj_file_name][1][name].append(section)
-
-                return section_info
-
-            version_dict["data_section_information"] = create_section_dict(version_dict, data_sections)
-            version_dict["text_section_information"] = create_section_dict(version_dict, text_sections)
+            for object_idx in range(len(version_dict["object_files"])):
+                self.read_object_file(version_dict, object_idx)
+                progress.emit('stage', {'stage': 'read', 'finished': object_idx + 1, 'total': len(version_dict["object_files"]), 'version': version})
+
+            self.parse_version(version_dict)
+            progress.emit('stage', {'stage': 'gather', 'finished': idx + 1, 'total': len(generated_versions)})
 
         return version_information
 
+    def compile_version(self, version):
+        """
+        Method used to compile all source files of a version into object files in its analysis directory.
+        :param version: the version.
+        :return: the version information of the version, containing the paths of its (analysis) files.
+        """
+        # Create dictionary for this specific version. Get some paths and make directories.
+        version_dict = dict()
+        version_dict["analysis_directory"] = os.path.join(self.config.default['output_directory'], version + "_analysis")
+        version_dict["version_directory"] = os.path.join(self.config.default['output_directory'], version)
+
+        # The first step is to compile all source files into object files in the analysis directory.
+        # We compile the source files through a symlink to increase uniformity between
+        # the versions and avoid cause data differences between versions because of __FILE__.
+        # When a cache is used, compilation always happens through the cache's directory so that
+        # object files can be reused across runs.
+        compile_dir = os.path.join(self.config.default['output_directory'], 'uniform_compilation') if self.cache is None else self.cache.compile_directory
+        if os.path.lexists(compile_dir):
+            os.remove(compile_dir)
+        os.symlink(version_dict["version_directory"], compile_dir)
+        version_dict["source_files"] = file.get_files_with_suffix(compile_dir, [self.config.default['suffix_source']])
+        version_dict["object_files_directory"] = os.path.join(version_dict["analysis_directory"], "objfiles")
+        version_dict["object_files"] = file.create_output_paths(version_dict["source_files"], compile_dir, version_dict["object_files_directory"], ".o")
+        flags = self.config.actc['common_options'] + self.config.actc['preprocessor_flags'] + self.config.actc['compiler_flags']
+
+        # The system headers all source files of the version start with are only parsed once, in a precompiled header.
+        # The version is compiled again without it if any translation unit turns out different.
+        pch_flags = self.pch.get_flags(flags, version_dict["source_files"]) if self.pch is not None else []
+        self.create_object_files(flags + pch_flags, version_dict["source_files"], version_dict["object_files"], compile_dir)
+        if pch_flags and not self.pch.verify(pch_flags, version_dict["source_files"], version_dict["object_files"], self.get_compile_context(compile_dir),
+                                             lambda source_files, object_files: self.create_object_files(flags, source_files, object_files, compile_dir)):
+            self.create_object_files(flags, version_dict["source_files"], version_dict["object_files"], compile_dir)
+
+        # Generate paths for the analysis files we will generate from the object files.
+        version_dict["diss_files"] = file.create_output_paths(version_dict["source_files"], compile_dir, version_dict["object_files_directory"], "_diss.out")
+        version_dict["elf_files"] = file.create_output_paths(version_dict["source_files"], compile_dir, version_dict["object_files_directory"], ".elf")
+        version_dict["section_files"] = file.create_output_paths(version_dict["source_files"], compile_dir, version_dict["object_files_directory"], ".sections")
+        os.remove(compile_dir)
+
+        # Identical object files (e.g. of translation units that weren't transformed) are only stored once.
+        if self.store is not None:
+            self.store.put_files(version_dict["object_files"])
+
+        return version_dict
+
+    def create_object_files(self, flags, source_files, object_files, compile_dir):
+        """
+        Method used to compile source files into object files, through the cache if one is used.
+        :param flags: the flags used for compilation.
+        :param source_files: the source files.
+        :param object_files: the object files.
+        :param compile_dir: the directory the version is compiled in.
+        :return: nothing.
+        """
+        if self.cache is None:
+            self.compiler.create_object_files(flags, source_files, object_files)
+        else:
+            # Every object file also depends on the headers of the version.
+            headers = self.get_compile_context(compile_dir)
+            for source_file, object_file in zip(source_files, object_files):
+                self.cache.create_object_file(self.compiler, flags, source_file, object_file, headers)
+
+    def get_compile_context(self, compile_dir):
+        """
+        Method used to get a digest of everything the compilation of the source files of a version depends on besides
+        the source files themselves, being the headers of the version.
+        :param compile_dir: the directory the version is compiled in.
+        :return: the digest.
+        """
+        headers = file.get_files_with_suffix(compile_dir, [self.config.default['suffix_header']])
+        if self.cache is not None:
+            return self.cache.digest_files(headers)
+        return hashlib.sha256(json.dumps([[header, file.digest_file(header)] for header in sorted(headers)]).encode()).hexdigest()
+
+    def read_object_file(self, version_dict, idx):
+        """
+        Method used to disassemble an object file of a version (for DEBUGGING purposes ONLY!), and dump all relevant section information using readelf.
+        :param version_dict: the version information of the version (see compile_version).
+        :param idx: the index of the object file.
+        :return: nothing.
+        """
+        self.objdump.disassemble_obj_file(self.config.arm_diablo_linux_objdump["base_flags"], version_dict["object_files"][idx], version_dict["diss_files"][idx])
+        self.elf_reader.read_file(self.config.elf_reader["base_flags"], version_dict["object_files"][idx], version_dict["elf_files"][idx])
+
+    def parse_version(self, version_dict):
+        """
+        Method used to parse the sections of all object files of a version out of their ELF files, and to group them per symbol.
+        :param version_dict: the version information of the version (see compile_version), which is updated.
+        :return: nothing.
+        """
+        # We use a custom parser to parse all relevant code (.text) sections
+        # out of the ELF files. The result is a list of a list of section names.
+        # Every list in the result corresponds to a parsed input file.
+        data_sections = parser.Parser.parse_files(version_dict["elf_files"], parser.data_section_extracter, version_dict["section_files"])
+        text_sections = parser.Parser.parse_files(version_dict["elf_files"], parser.text_section_extracter, version_dict["section_files"])
+
+        version_dict["data_section_information"] = sections.create_section_dict(data_sections, version_dict["object_files"], version_dict["object_files_directory"])
+        version_dict["text_section_information"] = sections.create_section_dict(text_sections, version_dict["object_files"], version_dict["object_files_directory"])
+
     def run_actc(self, generated_versions, version_information, functions_diff):
+        annotations_path = self.write_annotations(functions_diff)
+
+        # We will generate ACTC config files for each of the generated versions.
+        for version in generated_versions:
+            self.build_version(version, version_information, annotations_path)
+
+    def write_annotations(self, functions_diff):
+        """
+        Method used to write the mobile block annotations for the functions that have to be made mobile.
+        :param functions_diff: the functions that have to be made mobile.
+        :return: the path of the annotations.
+        """
         # The directory in which annotations will be stored.
         annotations_path = os.path.join(self.actc_.path, 'annotations.out')
 
@@ -348,79 +1113,243 @@ class Executor:
 
         # Write the annotation away in comma-separated style.
         templates.read_template_and_fill('annotations.template', {'functions': ','.join(annotations)}, annotations_path)
+        return annotations_path
 
-        # We will generate ACTC config files for each of the generated versions.
-        for version in generated_versions:
-            actc_config = os.path.join(self.actc_.path, 'actc.json')
-            actual_actc_config = os.path.join(self.actc_.path, version + '.json')
-            version_information[version]['actc_config'] = actc_config
-
-            # We need to get all source and header files.
-            src_header_files = file.get_files_with_suffix(version_information[version]["version_directory"],
-                                                               [self.config.default['suffix_source'],
-                                                                self.config.default['suffix_header']])
-
-            # We write the list to a specified format required by the ACTC config file.
-            src_header_files_input = ', '.join(["\"" + x + "\"" for x in src_header_files])
-
-            # ACTC configuration file generation (based on a predefined template).
-            templates.read_template_and_fill('actc_config.template',
-                                        {'binary_name': self.config.default['binary_name'],
-                                            'source_code': src_header_files_input,
-                                            'annotations': annotations_path,
-                                            'common_options': json.dumps(self.config.actc['common_options']),
-                                            'compiler_flags': json.dumps(self.config.actc['compiler_flags']),
-                                            'linker_flags': json.dumps(self.config.actc['linker_flags']),
-                                            'preprocessor_flags': json.dumps(self.config.actc['preprocessor_flags']),
-                                            'server': self.config.actc['server']},
-                                             actc_config)
-
-            # Now we will employ the ACTC using our mobile block annotations and actc configuration file.
-            self.actc_.clean(actc_config)
-            self.actc_.execute(actc_config, version)
-
-            # For all versions we run the ACTC in the same path to avoid any differences in the binary
-            # because of __FILE__ being filled in. After running the ACTC we do some renaming to keep
-            # the actual ACTC build directory and config around.
-            os.rename(self.actc_.get_build_dir('actc'), self.actc_.get_build_dir(version))
-            os.rename(actc_config, actual_actc_config)
-            version_information[version]['actc_config'] = actual_actc_config
+    def build_version(self, version, version_information, annotations_path):
+        """
+        Method used to build a version using the ACTC. All versions are built in the same path, so only one
+        version can be built at a time.
+        :param version: the version.
+        :param version_information: the version information, which is updated with the ACTC config of the version.
+        :param annotations_path: the path of the mobile block annotations (see write_annotations).
+        :return: nothing.
+        """
+        actc_config = os.path.join(self.actc_.path, 'actc.json')
+        actual_actc_config = os.path.join(self.actc_.path, version + '.json')
+        version_information[version]['actc_config'] = actc_config
+
+        # We need to get all source and header files.
+        src_header_files = file.get_files_with_suffix(version_information[version]["version_directory"],
+                                                           [self.config.default['suffix_source'],
+                                                            self.config.default['suffix_header']])
+
+        # We write the list to a specified format required by the ACTC config file.
+        src_header_files_input = ', '.join(["\"" + x + "\"" for x in src_header_files])
+
+        # ACTC configuration file generation (based on a predefined template).
+        templates.read_template_and_fill('actc_config.template',
+                                    {'binary_name': self.config.default['binary_name'],
+                                        'source_code': src_header_files_input,
+                                        'annotations': annotations_path,
+                                        'common_options': json.dumps(self.config.actc['common_options']),
+                                        'compiler_flags': json.dumps(self.config.actc['compiler_flags']),
+                                        'linker_flags': json.dumps(self.config.actc['linker_flags']),
+                                        'preprocessor_flags': json.dumps(self.config.actc['preprocessor_flags']),
+                                        'server': self.config.actc['server']},
+                                         actc_config)
+
+        # Now we will employ the ACTC using our mobile block annotations and actc configuration file.
+        self.actc_.clean(actc_config)
+        self.actc_.execute(actc_config, version)
+
+        # For all versions we run the ACTC in the same path to avoid any differences in the binary
+        # because of __FILE__ being filled in. After running the ACTC we do some renaming to keep
+        # the actual ACTC build directory and config around (replacing those of an earlier build).
+        shutil.rmtree(self.actc_.get_build_dir(version), True)
+        os.rename(self.actc_.get_build_dir('actc'), self.actc_.get_build_dir(version))
+        os.rename(actc_config, actual_actc_config)
+        version_information[version]['actc_config'] = actual_actc_config
+
+        # Identical mobile blocks are only stored once.
+        if self.store is not None:
+            self.store.put_files(store.build_artifacts(self.actc_, version, self.config.default['binary_name']))
+
+    def get_delta_transitions(self, generated_versions):
+        """
+        Method used to get the version transitions delta packages are created for: between every two consecutive
+        versions, or between the configured baseline version and every other version.
+        :param generated_versions: the versions.
+        :return: a list of (old version, new version) tuples.
+        """
+        baseline = self.config.delta['baseline']
+        if not baseline:
+            return list(zip(generated_versions[:-1], generated_versions[1:]))
+
+        assert baseline in generated_versions, 'The baseline version ' + baseline + ' for delta packages doesn\'t exist!'
+        return [(baseline, version) for version in generated_versions if version != baseline]
+
+    def create_delta_package(self, old_version, new_version):
+        """
+        Method used to create (and verify) the delta package that turns the mobile blocks of one version into those of another.
+        :param old_version: the version the client has.
+        :param new_version: the version the client moves to.
+        :return: the summary of the package (see delta.summarize).
+        """
+        old_directory = self.actc_.get_mobile_blocks_dir(old_version)
+        new_directory = self.actc_.get_mobile_blocks_dir(new_version)
+        package_path = os.path.join(self.config.default['output_directory'], 'deltas', old_version + '_to_' + new_version + '.tar')
+        index = delta.create_package(old_directory, new_directory, package_path)
+
+        # Applying the package to the old blocks must result in exactly the new ones.
+        if self.config.delta['verify']:
+            wrong_blocks = delta.verify_package(old_directory, new_directory, package_path)
+            assert not wrong_blocks, 'The delta package ' + package_path + ' results in the wrong mobile blocks: ' + ', '.join(wrong_blocks)
+
+        return delta.summarize(index)
+
+    def store_delta_report(self, summaries):
+        """
+        Method used to store and print the transfer size savings of the delta packages.
+        :param summaries: a list of ((old version, new version), summary) tuples (see create_delta_package).
+        :return: nothing.
+        """
+        report = []
+        for (old_version, new_version), summary in summaries:
+            summary = dict(summary)
+            summary['from'] = old_version
+            summary['to'] = new_version
+            report.append(summary)
+            print('************ Delta ' + old_version + ' -> ' + new_version + ': ' + str(summary['transfer_size']) + ' of ' + str(summary['full_size']) +
+                  ' bytes (' + str(round(100 * summary['savings'], 1)) + '% saved, ' + str(summary['unchanged']) + ' unchanged, ' + str(summary['delta']) +
+                  ' delta, ' + str(summary['full']) + ' full) **********')
+
+        os.makedirs(os.path.join(self.config.default['output_directory'], 'deltas'), exist_ok=True)
+        with open(os.path.join(self.config.default['output_directory'], 'deltas', 'report.json'), 'w') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    def deploy_mobile_blocks(self, mobile_blocks_dir):
+        """
+        Method used to deploy the mobile blocks of a version, replacing those that were deployed before.
+        :param mobile_blocks_dir: the directory containing the mobile blocks.
+        :return: nothing.
+        """
+        # Redeploy code mobility to switch blocks (the -i and -p options do not actually matter)
+        subprocess.check_call([self.config.actc['deploy_mobility_script'], '-a', self.config.actc['aid'], '-p', '20', '-i', 'localhost', mobile_blocks_dir], stdout=subprocess.DEVNULL)
 
     def test(self, generated_versions, mode):
         # We set up the testing environment locally
-        testing_directory = os.path.join(self.config.default['output_directory'], 'testing')
-        os.makedirs(testing_directory, exist_ok=True)
+        testing_directory = self.get_testing_directory()
 
-        # Do the testing using our own framework
-        if mode == 1:
+        # Do the testing (or benchmarking) using our own framework
+        if mode == 1 or mode == 3:
             logging.debug('Testing using our own scripts.')
-
-            # Set the testing environment up remotely
-            testing_dir = 'testing'
-            test_host = self.config.testing['host']
-            logging.debug('Initializing board.')
-            subprocess.check_call([os.path.join(testing_dir, 'initialize_board.sh'), test_host, self.config.testing['input_output']])
+            self.initialize_board()
         # Do the testing using the SPEC framework
         elif mode == 2:
             logging.debug('Testing using the SPEC scripts.')
+            self.test_spec(generated_versions, testing_directory)
+            return
+
+        # Benchmark all versions against the base build (the output of a -1 or -2 mode run).
+        if mode == 3:
+            self.benchmark_versions(generated_versions, testing_directory)
+            return
 
         # We will now try to deploy all of the versions and corresponding mobile blocks to the testing board.
         for version in generated_versions:
-            # We generate the paths for the binary and the mobile blocks (which can be from different versions).
-            binary_dir = self.actc_.get_output_dir(version)
-            binary = os.path.join(binary_dir, self.config.default['binary_name'])
-            mobile_blocks_dir = self.actc_.get_mobile_blocks_dir(version)
-            logging.debug('Testing version ' + version + '.')
-
-            # If no blocks were generated, we can't deploy CM
-            if os.path.exists(mobile_blocks_dir):
-                # Redeploy code mobility to switch blocks (the -i and -p options do not actually matter)
-                subprocess.check_call([self.config.actc['deploy_mobility_script'], '-a', self.config.actc['aid'], '-p', '20', '-i', 'localhost', mobile_blocks_dir], stdout=subprocess.DEVNULL)
-
-            # Do the actual test, using either our own script or the SPEC functionality
-            if mode == 1:
-                subprocess.check_call([os.path.join(testing_dir, 'test_version.sh'), test_host, binary, version, testing_directory])
-            elif mode == 2:
-                test_dir = os.path.join(testing_directory, version)
-                os.makedirs(test_dir)
-                spec.test(binary, test_dir, self.config)
+            self.test_version(version, testing_directory)
+
+    def get_testing_directory(self):
+        # We set up the testing environment locally
+        testing_directory = os.path.join(self.config.default['output_directory'], 'testing')
+        os.makedirs(testing_directory, exist_ok=True)
+        return testing_directory
+
+    def initialize_board(self):
+        """
+        Method used to set the testing environment up remotely, for testing using our own scripts.
+        :return: nothing.
+        """
+        logging.debug('Initializing board.')
+        subprocess.check_call([os.path.join('testing', 'initialize_board.sh'), self.config.testing['host'], self.config.testing['input_output']])
+
+    def test_version(self, version, testing_directory):
+        """
+        Method used to test a version on the board using our own scripts.
+        :param version: the version to test.
+        :param testing_directory: the directory in which the test results are stored.
+        :return: nothing.
+        """
+        # We generate the paths for the binary and the mobile blocks (which can be from different versions).
+        binary_dir = self.actc_.get_output_dir(version)
+        binary = os.path.join(binary_dir, self.config.default['binary_name'])
+        mobile_blocks_dir = self.actc_.get_mobile_blocks_dir(version)
+        logging.debug('Testing version ' + version + '.')
+
+        # If no blocks were generated, we can't deploy CM
+        if os.path.exists(mobile_blocks_dir):
+            self.deploy_mobile_blocks(mobile_blocks_dir)
+
+        # Do the actual test using our own script
+        subprocess.check_call([os.path.join('testing', 'test_version.sh'), self.config.testing['host'], binary, version, testing_directory])
+
+    def benchmark_versions(self, generated_versions, testing_directory):
+        """
+        Method used to benchmark all versions against the base build (the output of a -1 or -2 mode run).
+        :param generated_versions: the versions to benchmark.
+        :param testing_directory: the directory in which the benchmark results are stored.
+        :return: nothing.
+        """
+        base_actc = actc.ACTC(self.config.actc['bin_location'], self.config.actc, os.path.join(self.config.benchmark['base_output_directory'], 'actc'))
+        binaries = [('base', os.path.join(base_actc.get_output_dir('base'), self.config.default['binary_name']), base_actc.get_mobile_blocks_dir('base'))]
+        for version in generated_versions:
+            binaries.append((version, os.path.join(self.actc_.get_output_dir(version), self.config.default['binary_name']), self.actc_.get_mobile_blocks_dir(version)))
+
+        benchmark.run(binaries, self.deploy_mobile_blocks, os.path.join(testing_directory, 'benchmark.json'), self.config)
+
+    def test_spec(self, generated_versions, testing_directory):
+        """
+        Method used to test the versions using the SPEC regression scripts. Every version is tested in
+        its own private benchmark directory, so versions without mobile blocks can be tested concurrently.
+        Versions with mobile blocks are still tested one at a time, see test_spec_version.
+        :param generated_versions: the versions to test.
+        :param testing_directory: the directory in which the test results are stored.
+        :return: nothing.
+        """
+        # Mobile blocks are deployed per AID, so versions that have mobile blocks can't be tested
+        # concurrently. Deploying and testing those versions happens while holding this lock.
+        deploy_lock = threading.Lock()
+
+        # Test all versions, and collect the results per version.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.config.testing['jobs']) as pool:
+            results = dict(zip(generated_versions, pool.map(lambda version: self.test_spec_version(version, testing_directory, deploy_lock), generated_versions)))
+
+        self.store_spec_results(results, testing_directory)
+
+    def test_spec_version(self, version, testing_directory, deploy_lock=None):
+        """
+        Method used to test a version using the SPEC regression scripts, in its own private benchmark directory.
+        Deploying the mobile blocks of a version replaces those of the other versions (all versions share the AID),
+        so the lock can't be released before the test is finished: versions with mobile blocks are tested serially.
+        :param version: the version to test.
+        :param testing_directory: the directory in which the test results are stored.
+        :param deploy_lock: the lock held while deploying and testing versions that have mobile blocks, if the caller
+        doesn't test these one at a time already (e.g. through the deployment resource of the scheduler).
+        :return: the result of the test (see spec.test).
+        """
+        binary = os.path.join(self.actc_.get_output_dir(version), self.config.default['binary_name'])
+        mobile_blocks_dir = self.actc_.get_mobile_blocks_dir(version)
+        test_dir = os.path.join(testing_directory, version)
+        os.makedirs(test_dir)
+        logging.debug('Testing version ' + version + '.')
+
+        # If no blocks were generated, we can't deploy CM
+        if os.path.exists(mobile_blocks_dir):
+            with deploy_lock if deploy_lock is not None else contextlib.nullcontext():
+                self.deploy_mobile_blocks(mobile_blocks_dir)
+                return spec.test(binary, test_dir, self.config)
+
+        return spec.test(binary, test_dir, self.config)
+
+    def store_spec_results(self, results, testing_directory):
+        """
+        Method used to store the results of the SPEC regression scripts, and check that all versions passed.
+        :param results: the results per version (see spec.test).
+        :param testing_directory: the directory in which the test results are stored.
+        :return: nothing.
+        """
+        with open(os.path.join(testing_directory, 'spec_results.json'), 'w') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+        failed = sorted(version for version, result in results.items() if not result['passed'])
+        assert not failed, 'SPEC regression script failed for version(s): ' + ', '.join(failed)
@@ -0,0 +1,249 @@
+import concurrent.futures
+import logging
+import threading
+import time
+
+import core.progress as progress
+import core.timings as timings
+
+# The interval in seconds at which a scheduler checks whether a shared budget became available.
+BUDGET_INTERVAL = 0.1
+
+class Task:
+    """
+    Class representing a task in the dependency graph of a scheduler.
+    """
+
+    def __init__(self, name, function, dependencies, resources):
+        """
+        Initialization of the task.
+        :param name: the unique name of the task.
+        :param function: the function executing the task.
+        :param dependencies: the names of the tasks that have to be finished before this task can start.
+        :param resources: the resource classes this task occupies while executing.
+        :return: nothing.
+        """
+        self.name = name
+        self.function = function
+        self.dependencies = list(dependencies)
+        self.resources = list(resources)
+        self.state = 'pending'
+        self.start = None
+        self.end = None
+        self.result = None
+
+class Budget:
+    """
+    Class representing the capacities of resource classes shared by multiple schedulers (e.g. the CPUs of the
+    machine, for jobs that are executed at the same time).
+    """
+
+    def __init__(self, capacities):
+        """
+        Initialization of the budget.
+        :param capacities: a dictionary {resource class: capacity}.
+        :return: nothing.
+        """
+        self.capacities = dict(capacities)
+        self.in_use = {resource: 0 for resource in self.capacities}
+        self.lock = threading.Lock()
+
+    def acquire(self, resources):
+        """
+        Method used to occupy the shared resources of a task, if they are all available.
+        :param resources: the resource classes the task occupies (classes that aren't shared are ignored).
+        :return: whether the resources were occupied.
+        """
+        shared = [resource for resource in resources if resource in self.capacities]
+        with self.lock:
+            if not all(self.in_use[resource] < self.capacities[resource] for resource in shared):
+                return False
+            for resource in shared:
+                self.in_use[resource] += 1
+            return True
+
+    def release(self, resources):
+        with self.lock:
+            for resource in resources:
+                if resource in self.capacities:
+                    self.in_use[resource] -= 1
+
+class Scheduler:
+    """
+    Class which executes a graph of tasks as soon as their dependencies are finished and the resources they
+    need are available. Every resource class has a capacity: the number of tasks that can occupy it at the
+    same time (e.g. the number of CPUs, or a single remote board). Tasks can add new tasks while executing.
+    """
+
+    def __init__(self, capacities, budget=None):
+        """
+        Initialization of the scheduler.
+        :param capacities: a dictionary {resource class: capacity}.
+        :param budget: an optional budget shared with other schedulers, a task only starts when its resources are
+        available in both the scheduler and the budget.
+        :return: nothing.
+        """
+        self.capacities = dict(capacities)
+        self.budget = budget
+        self.in_use = {resource: 0 for resource in self.capacities}
+        self.tasks = dict()
+        self.lock = threading.Lock()
+        self.start = None
+        self.end = None
+
+        # The number of tasks and of finished tasks per stage (e.g. compile for compile:<version>), for the progress events.
+        self.stages = dict()
+
+        # The tasks execute in other threads, but their events (and tool timings) belong to the job of the thread creating the scheduler.
+        self.job = progress.get_job()
+        self.benchmark = timings.get_benchmark()
+
+    def add(self, name, function, dependencies=(), resources=('cpu',)):
+        """
+        Method used to add a task, this can also be done by executing tasks.
+        :param name: the unique name of the task.
+        :param function: the function executing the task.
+        :param dependencies: the names of the tasks that have to be finished first (these can be added later on).
+        :param resources: the resource classes the task occupies while executing.
+        :return: the name of the task.
+        """
+        for resource in resources:
+            assert resource in self.capacities, 'Unknown resource class ' + resource + '!'
+
+        with self.lock:
+            assert name not in self.tasks, 'Task ' + name + ' already exists!'
+            self.tasks[name] = Task(name, function, dependencies, resources)
+            self.stages.setdefault(name.split(':', 1)[0], [0, 0])[1] += 1
+        return name
+
+    def result(self, name):
+        """
+        Method used to get the result of a finished task.
+        :param name: the name of the task.
+        :return: the value returned by the function of the task.
+        """
+        return self.tasks[name].result
+
+    def ready(self):
+        # The pending tasks whose dependencies are finished and whose resources are available, in the order they were added.
+        ready = []
+        in_use = dict(self.in_use)
+        for task in self.tasks.values():
+            if task.state != 'pending':
+                continue
+            if not all(dependency in self.tasks and self.tasks[dependency].state == 'finished' for dependency in task.dependencies):
+                continue
+            if all(in_use[resource] < self.capacities[resource] for resource in task.resources):
+                for resource in task.resources:
+                    in_use[resource] += 1
+                ready.append(task)
+        return ready
+
+    def get_stage_progress(self, task, finished=False):
+        # The number of finished tasks and the total number of tasks of the stage of a task.
+        stage = task.name.split(':', 1)[0]
+        with self.lock:
+            if finished:
+                self.stages[stage][0] += 1
+            return {'stage': stage, 'finished': self.stages[stage][0], 'total': self.stages[stage][1]}
+
+    def execute(self, task):
+        progress.set_job(self.job)
+        timings.set_benchmark(self.benchmark)
+        progress.emit('task_start', dict(self.get_stage_progress(task), task=task.name))
+        task.start = time.time()
+        failed = True
+        try:
+            task.result = task.function()
+            failed = False
+        finally:
+            task.end = time.time()
+            progress.emit('task_finish', dict(self.get_stage_progress(task, True), task=task.name, duration=task.end - task.start, failed=failed))
+
+    def run(self):
+        """
+        Method used to execute all tasks. When a task fails no new tasks are started, and the exception of the
+        first failing task is raised once the running tasks are finished.
+        :return: nothing.
+        """
+        self.start = time.time()
+        running = dict()
+        error = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, sum(self.capacities.values()))) as pool:
+            while True:
+                with self.lock:
+                    waiting = False
+                    if error is None:
+                        for task in self.ready():
+                            # Tasks that can't get their resources from the shared budget wait until they are released.
+                            if self.budget is not None and not self.budget.acquire(task.resources):
+                                waiting = True
+                                continue
+                            task.state = 'running'
+                            for resource in task.resources:
+                                self.in_use[resource] += 1
+                            logging.debug('Starting task ' + task.name + '.')
+                            running[pool.submit(self.execute, task)] = task
+
+                    if not running and not waiting:
+                        pending = [task.name for task in self.tasks.values() if task.state == 'pending']
+                        break
+
+                if running:
+                    done, _ = concurrent.futures.wait(running, timeout=BUDGET_INTERVAL if waiting else None, return_when=concurrent.futures.FIRST_COMPLETED)
+                else:
+                    time.sleep(BUDGET_INTERVAL)
+                    done = set()
+                with self.lock:
+                    for future in done:
+                        task = running.pop(future)
+                        for resource in task.resources:
+                            self.in_use[resource] -= 1
+                        if self.budget is not None:
+                            self.budget.release(task.resources)
+                        if future.exception() is not None:
+                            task.state = 'failed'
+                            error = error if error is not None else future.exception()
+                        else:
+                            task.state = 'finished'
+
+        self.end = time.time()
+        if error is not None:
+            raise error
+        assert not pending, 'Tasks can never be started (their dependencies are missing): ' + ', '.join(pending)
+
+    def critical_path(self):
+        """
+        Method used to determine the critical path: the chain of tasks, each waiting on the previous one, that ends
+        with the last task to finish. Every task is preceded by the dependency that finished last.
+        :return: the names of the tasks on the critical path, in order of execution.
+        """
+        executed = [task for task in self.tasks.values() if task.end is not None]
+        if not executed:
+            return []
+
+        path = [max(executed, key=lambda task: task.end)]
+        while True:
+            dependencies = [self.tasks[dependency] for dependency in path[-1].dependencies if dependency in self.tasks and self.tasks[dependency].end is not None]
+            if not dependencies:
+                return [task.name for task in reversed(path)]
+            path.append(max(dependencies, key=lambda task: task.end))
+
+    def report(self):
+        """
+        Method used to report on the execution of the tasks.
+        :return: a dictionary containing the timing of every task, the busy time per resource class and the critical path.
+        """
+        executed = sorted([task for task in self.tasks.values() if task.start is not None], key=lambda task: task.start)
+        start = self.start if self.start is not None else time.time()
+        critical_path = self.critical_path()
+
+        report = dict()
+        report['wall_time'] = (self.end if self.end is not None else time.time()) - start
+        report['tasks'] = [{'name': task.name, 'state': task.state, 'resources': task.resources, 'dependencies': task.dependencies,
+                            'start': task.start - start, 'duration': (task.end if task.end is not None else time.time()) - task.start}
+                           for task in executed]
+        report['busy'] = {resource: sum(task['duration'] for task in report['tasks'] if resource in task['resources']) for resource in self.capacities}
+        report['critical_path'] = critical_path
+        report['critical_path_duration'] = sum(task['duration'] for task in report['tasks'] if task['name'] in critical_path)
+        return report
@@ -0,0 +1,138 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+
+# The inotify flags and events we use (see inotify(7)).
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# The header of an inotify event: watch descriptor, mask, cookie and length of the name.
+EVENT_HEADER = struct.Struct('iIII')
+
+class Watcher:
+    """
+    Class which watches a directory tree for changes to files with given suffixes. Inotify is used when
+    available, otherwise the tree is polled.
+    """
+
+    def __init__(self, directory, suffixes, interval=1.0, debounce=0.2):
+        """
+        Initialization of the watcher.
+        :param directory: the directory to watch (recursively).
+        :param suffixes: the suffixes of the files to watch.
+        :param interval: the polling interval in seconds (when inotify is not available).
+        :param debounce: the time in seconds without further changes after which a change is reported,
+        so that e.g. saving multiple files at once is reported as a single change.
+        :return: nothing.
+        """
+        self.directory = directory
+        self.suffixes = tuple(suffixes)
+        self.interval = interval
+        self.debounce = debounce
+
+        # {watch descriptor: directory}
+        self.watches = dict()
+        self.fd = self.init_inotify()
+        if self.fd is None:
+            logging.debug('Inotify is not available, polling ' + directory + '.')
+            self.snapshot = self.take_snapshot()
+        else:
+            for root, _, _ in os.walk(directory):
+                self.add_watch(root)
+
+    def init_inotify(self):
+        """
+        Method used to initialize inotify.
+        :return: the inotify file descriptor, or None if inotify is not available.
+        """
+        try:
+            self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        return fd if fd >= 0 else None
+
+    def add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def take_snapshot(self):
+        """
+        Method used to take a snapshot of the watched files.
+        :return: a dictionary {file: (modification time, size)}.
+        """
+        snapshot = dict()
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(self.suffixes):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout):
+        """
+        Method used to collect the changed files.
+        :param timeout: the maximal time in seconds to wait for a change.
+        :return: a set of changed files (possibly empty).
+        """
+        if self.fd is None:
+            time.sleep(timeout)
+            snapshot = self.take_snapshot()
+            changed = set(path for path in set(snapshot) | set(self.snapshot) if snapshot.get(path) != self.snapshot.get(path))
+            self.snapshot = snapshot
+            return changed
+
+        changed = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changed
+
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0').decode(errors='replace')
+            offset += EVENT_HEADER.size + length
+
+            path = os.path.join(self.watches.get(wd, self.directory), name)
+            if mask & IN_ISDIR:
+                # New directories are watched as well.
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    for root, _, files in os.walk(path):
+                        self.add_watch(root)
+                        changed.update(os.path.join(root, file_name) for file_name in files if file_name.endswith(self.suffixes))
+            elif name.endswith(self.suffixes):
+                changed.add(path)
+        return changed
+
+    def wait(self):
+        """
+        Method used to wait for a change.
+        :return: the sorted list of changed files.
+        """
+        changed = set()
+        while not changed:
+            changed = self.poll(self.interval)
+
+        # Keep collecting changes until things have settled down.
+        while True:
+            more = self.poll(self.debounce if self.fd is not None else self.interval)
+            if not more:
+                return sorted(changed)
+            changed.update(more)
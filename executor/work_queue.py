@@ -0,0 +1,183 @@
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import time
+
+def execute_job(run_job, job, sender):
+    """
+    Method used to execute a job in a worker process, sending its result back.
+    :param run_job: the function executing the job, returning a dictionary describing the result.
+    :param job: the job.
+    :param sender: the connection the result is sent over.
+    :return: nothing.
+    """
+    # The process leads its own process group, so the tools it executes are stopped together with it.
+    os.setpgrp()
+    try:
+        result = run_job(job)
+    except Exception as e:
+        result = {'result': False, 'error': str(e)}
+    sender.send(result)
+
+class WorkQueue:
+    """
+    Class representing a queue of jobs, backed by an SQLite database on (shared) storage. A coordinator
+    enqueues the jobs of a sweep, and any number of workers (possibly on different hosts) claim and
+    execute them. Workers heartbeat while executing a job, jobs of workers that stopped heartbeating
+    are considered lost and are handed out again. A worker that finds out its job was handed out again
+    stops executing it, so no two workers execute a job at the same time.
+    """
+
+    def __init__(self, path, config):
+        """
+        Initialization of the work queue.
+        :param path: the path of the queue database.
+        :param config: the QUEUE configuration dictionary.
+        :return: nothing.
+        """
+        self.path = path
+        self.config = config
+        self.worker = socket.gethostname() + ':' + str(os.getpid())
+
+        with contextlib.closing(self.connect()) as connection:
+            connection.execute('''CREATE TABLE IF NOT EXISTS jobs (
+                                      id INTEGER PRIMARY KEY,
+                                      benchmark TEXT NOT NULL,
+                                      input_source_directory TEXT NOT NULL,
+                                      seed INTEGER NOT NULL,
+                                      nr_of_versions TEXT NOT NULL,
+                                      transformation_type TEXT NOT NULL,
+                                      mode INTEGER NOT NULL,
+                                      testmode INTEGER NOT NULL,
+                                      output_directory TEXT NOT NULL,
+                                      state TEXT NOT NULL DEFAULT 'pending',
+                                      worker TEXT,
+                                      heartbeat REAL,
+                                      attempts INTEGER NOT NULL DEFAULT 0,
+                                      result TEXT)''')
+            connection.execute('CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)')
+
+    def connect(self):
+        """
+        Method used to open a connection to the queue database. Transactions are started explicitly.
+        :return: the connection.
+        """
+        connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def enqueue(self, jobs):
+        """
+        Method used to add jobs to the queue.
+        :param jobs: a list of job dictionaries (see the columns of the jobs table).
+        :return: nothing.
+        """
+        with contextlib.closing(self.connect()) as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany('''INSERT INTO jobs (benchmark, input_source_directory, seed, nr_of_versions, transformation_type, mode, testmode, output_directory)
+                                      VALUES (:benchmark, :input_source_directory, :seed, :nr_of_versions, :transformation_type, :mode, :testmode, :output_directory)''', jobs)
+            connection.execute('COMMIT')
+
+    def claim(self):
+        """
+        Method used to claim the next pending job. Lost jobs are requeued first (or failed when they
+        have been attempted too often).
+        :return: the claimed job as a dictionary, or None if no job is pending.
+        """
+        now = time.time()
+        with contextlib.closing(self.connect()) as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('''UPDATE jobs SET state = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, worker = NULL
+                                  WHERE state = 'running' AND heartbeat < ?''', (self.config['max_attempts'], now - self.config['timeout']))
+            row = connection.execute("SELECT * FROM jobs WHERE state = 'pending' ORDER BY id LIMIT 1").fetchone()
+            if row is not None:
+                connection.execute("UPDATE jobs SET state = 'running', worker = ?, heartbeat = ?, attempts = attempts + 1 WHERE id = ?",
+                                   (self.worker, now, row['id']))
+            connection.execute('COMMIT')
+
+        return dict(row) if row is not None else None
+
+    def heartbeat(self, job_id):
+        """
+        Method used to signal that a job is still being worked on.
+        :param job_id: the id of the job.
+        :return: True if this worker still owns the job.
+        """
+        with contextlib.closing(self.connect()) as connection:
+            cursor = connection.execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ? AND state = 'running'",
+                                        (time.time(), job_id, self.worker))
+            return cursor.rowcount == 1
+
+    def finish(self, job_id, state, result):
+        """
+        Method used to finish a job, unless it was handed to another worker in the meantime.
+        :param job_id: the id of the job.
+        :param state: the final state of the job ('finished' or 'failed').
+        :param result: a dictionary describing the result.
+        :return: nothing.
+        """
+        with contextlib.closing(self.connect()) as connection:
+            connection.execute("UPDATE jobs SET state = ?, result = ? WHERE id = ? AND worker = ? AND state = 'running'",
+                               (state, json.dumps(result), job_id, self.worker))
+
+    def status(self):
+        """
+        Method used to get the number of jobs per state.
+        :return: a dictionary {state: number of jobs}.
+        """
+        with contextlib.closing(self.connect()) as connection:
+            return {row['state']: row['amount'] for row in connection.execute('SELECT state, COUNT(*) AS amount FROM jobs GROUP BY state')}
+
+    def work(self, run_job):
+        """
+        Method used to execute jobs until the queue is drained. Every job is executed in its own process, which is
+        stopped as soon as a heartbeat shows that the job was handed to another worker.
+        :param run_job: the function executing a job, returning a dictionary describing the result.
+        :return: the number of jobs this worker executed.
+        """
+        executed = 0
+        while True:
+            job = self.claim()
+            if job is None:
+                # Jobs that are still running elsewhere might get lost, so we only stop when nothing is running.
+                if not self.status().get('running'):
+                    return executed
+                time.sleep(self.config['heartbeat'])
+                continue
+
+            logging.debug('Worker ' + self.worker + ' claimed job ' + str(job['id']) + '.')
+
+            # Heartbeat for as long as the job is executing, and abandon it once it belongs to another worker.
+            (receiver, sender) = multiprocessing.Pipe(False)
+            process = multiprocessing.get_context('fork').Process(target=execute_job, args=(run_job, job, sender))
+            process.start()
+            sender.close()
+            lost = False
+            while not receiver.poll(self.config['heartbeat']):
+                if not self.heartbeat(job['id']):
+                    logging.warning('Worker ' + self.worker + ' lost job ' + str(job['id']) + ' to another worker, abandoning it.')
+                    try:
+                        os.killpg(process.pid, signal.SIGTERM)
+                    except ProcessLookupError:
+                        pass
+                    lost = True
+                    break
+
+            try:
+                result = receiver.recv() if not lost else None
+            except EOFError:
+                result = None
+            process.join()
+            if result is None and not lost:
+                result = {'result': False, 'error': 'The process executing the job exited with status ' + str(process.exitcode) + '.'}
+            receiver.close()
+            if lost:
+                continue
+
+            self.finish(job['id'], 'finished' if result['result'] else 'failed', result)
+            executed += 1
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+
+"""
+Module used to measure the latency of downloading the mobile blocks of the versions in an output directory (see core/latency.py).
+"""
+
+import argparse
+import config
+import configparser
+import json
+import os
+
+import core.file as file
+import core.latency as latency
+import core.tools.actc as actc
+
+# Parse the arguments.
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-b', '--bandwidth', type=int, help='The bandwidth of the server in bytes per second, 0 is unlimited (the configured one if not given).')
+    parser.add_argument('-c', '--concurrency', type=int, help='The maximal number of blocks the server sends at the same time, 0 is unlimited (the configured one if not given).')
+    parser.add_argument('-l', '--latency', type=float, help='The latency of the server in seconds (the configured one if not given).')
+    parser.add_argument('-n', '--clients', type=int, help='The number of clients downloading at the same time (the configured one if not given).')
+    parser.add_argument('-o', '--output_dir', help='The output directory of the run (the configured one if not given).')
+    parser.add_argument('-r', '--repetitions', type=int, help='The number of times the requests are replayed (the configured one if not given).')
+    parser.add_argument('-s', '--sequence', type=str, help='A file containing the block requests, one block per line (synthesized from the mobile functions if not given).')
+    parser.add_argument('versions', nargs='*', help='The versions to measure (all versions built by the ACTC if not given).')
+    args = parser.parse_args()
+
+    config_file = configparser.ConfigParser()
+    config_file.read(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini'))
+    config_obj = config.Config(config_file)
+    settings = dict(config_obj.latency)
+    for setting in ['latency', 'bandwidth', 'concurrency', 'clients', 'repetitions']:
+        if getattr(args, setting) is not None:
+            settings[setting] = getattr(args, setting)
+
+    output_dir = args.output_dir if args.output_dir else config_obj.default['output_directory']
+    actc_ = actc.ACTC(None, None, os.path.join(output_dir, 'actc'))
+    build_directory = os.path.dirname(actc_.get_build_dir(''))
+    versions = args.versions if args.versions else sorted(os.listdir(build_directory)) if os.path.isdir(build_directory) else []
+    versions = [version for version in versions if os.path.isdir(actc_.get_mobile_blocks_dir(version))]
+    if not versions:
+        parser.error('No versions with mobile blocks in ' + output_dir + '.')
+
+    # Without recorded requests, the blocks are requested in the order of the mobile functions.
+    mobile_functions = []
+    analytics_path = os.path.join(output_dir, 'analytics.json')
+    if os.path.exists(analytics_path):
+        mobile_functions = [function['name'] for function in file.read_json(analytics_path)['general']['mobile_functions']]
+
+    results = {'settings': settings, 'sequence': args.sequence, 'versions': dict()}
+    for version in versions:
+        directory = actc_.get_mobile_blocks_dir(version)
+        sequence = latency.read_sequence(args.sequence) if args.sequence else latency.synthesize_sequence(latency.get_blocks(directory), mobile_functions)
+        result = results['versions'][version] = latency.measure(directory, sequence, settings['latency'], settings['bandwidth'], settings['concurrency'],
+                                                                 settings['clients'], settings['repetitions'])
+        print(version + ': ' + str(result['blocks']) + ' block(s), ' + str(result['bytes']) + ' bytes, block latency median ' +
+              str(round(result['block_latency'].get('median', 0.0) * 1000, 1)) + 'ms (p99 ' + str(round(result['block_latency'].get('p99', 0.0) * 1000, 1)) +
+              'ms), cold start median ' + str(round(result['cold_start']['median'] * 1000, 1)) + 'ms (p99 ' + str(round(result['cold_start']['p99'] * 1000, 1)) + 'ms)')
+
+    with open(os.path.join(output_dir, 'latency.json'), 'w') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print('Latencies written to ' + os.path.join(output_dir, 'latency.json') + '.')
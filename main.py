@@ -5,22 +5,38 @@ Module which is the main entry point.
 """
 
 import argparse
+import concurrent.futures
 import config
 import configparser
+import copy
+import itertools
+import json
 import logging
 import os
 import shutil
 import sys
+import tempfile
+import threading
+import time
 import traceback
 
+import core.cache as cache
+import core.file as file
+import core.progress as progress
+import core.timings as timings
+import core.results as results
+import core.retention as retention
+import core.store as store
+import executor.daemon as daemon
 import executor.executor as executor
+import executor.scheduler as scheduler
+import executor.watcher as watcher
+import executor.work_queue as work_queue
 
 # Debugging format.
 DEBUG_FORMAT = '%(levelname)s:%(filename)s:%(funcName)s:%(asctime)s %(message)s\n'
 
-def main(mode, number_of_seeds, numbers_of_versions, output_dir, seed, testmode, transformation_type):
-    logging.debug('Executing...')
-
+def read_config():
     # Change the directory
     os.chdir(os.path.dirname(sys.argv[0]))
 
@@ -29,8 +45,19 @@ def main(mode, number_of_seeds, numbers_of_versions, output_dir, seed, testmode,
     config_file.read('config.ini')
     config_obj = config.Config(config_file)
 
-    if transformation_type:
-        config_obj.semantic_mod['type'] = transformation_type
+    # The progress of the run is emitted as events, if requested (see dashboard.py).
+    progress.open_stream(config_obj.progress['events'])
+    return config_obj
+
+def get_jobs(config_obj, mode, number_of_seeds, numbers_of_versions, output_dir, seed, testmode, transformation_type, benchmarks=None):
+    """
+    Method used to split a sweep into jobs.
+    :param benchmarks: a list of (binary name, input source directory) tuples (the configured benchmark if not given).
+    :return: a list of job dictionaries.
+    """
+    # Convert the transformation_type option into a list of types
+    transformation_types = transformation_type.split(',') if transformation_type else [config_obj.semantic_mod['type']]
+    benchmarks = benchmarks if benchmarks else [(config_obj.default['binary_name'], config_obj.default['input_source_directory'])]
 
     # Convert the nr_of_versions option or argument into a list of numbers
     numbers_of_versions = numbers_of_versions if numbers_of_versions else config_obj.default['nr_of_versions']
@@ -44,51 +71,548 @@ def main(mode, number_of_seeds, numbers_of_versions, output_dir, seed, testmode,
     seeds = range(seed, seed + number_of_seeds) if number_of_seeds else [seed]
 
     output_dir_config = output_dir if output_dir else config_obj.default['output_directory']
-    shutil.rmtree(output_dir_config, True)
-    for seed in seeds:
-        config_obj.semantic_mod['seed'] = str(seed)
+    jobs = []
+    for benchmark, input_source_directory in benchmarks:
+        for transformation_type in transformation_types:
+            for seed in seeds:
+                for number_of_versions in numbers_of_versions:
+                    jobs.append({'benchmark': benchmark, 'input_source_directory': input_source_directory, 'seed': seed,
+                                 'nr_of_versions': number_of_versions, 'transformation_type': transformation_type, 'mode': mode, 'testmode': testmode,
+                                 'output_directory': os.path.join(output_dir_config, benchmark if len(benchmarks) > 1 else '',
+                                                                  transformation_type if len(transformation_types) > 1 else '',
+                                                                  str(seed) if len(seeds) > 1 else '',
+                                                                  str(number_of_versions) if len(numbers_of_versions) > 1 else '')})
+    return jobs
+
+def parse_benchmarks(benchmarks):
+    # Convert the benchmarks option into a list of (name, input source directory) tuples.
+    return [tuple(benchmark.split(':', 1)) for benchmark in benchmarks.split(',')] if benchmarks else None
+
+def configure_job(config_obj, job):
+    """
+    Method used to update the configuration for a single job of a sweep.
+    :param config_obj: the configuration.
+    :param job: the job (see get_jobs).
+    :return: nothing.
+    """
+    config_obj.default['binary_name'] = job['benchmark']
+    config_obj.default['input_source_directory'] = job['input_source_directory']
+    config_obj.semantic_mod['seed'] = str(job['seed'])
+    config_obj.semantic_mod['type'] = job['transformation_type']
+    config_obj.default['nr_of_versions'] = job['nr_of_versions']
+    config_obj.default['output_directory'] = job['output_directory']
+
+    # Options overridden for this job {section: {option: value}}, e.g. the compiler flags of a benchmark.
+    for section, options in job.get('overrides', dict()).items():
+        getattr(config_obj, section).update(options)
+
+def run_job(config_obj, job, append=False, cache=None, artifact_store=None, mobile_limit=None, budget=None):
+    """
+    Method used to execute a single job of a sweep.
+    :param config_obj: the configuration, which is updated for the job.
+    :param job: the job (see get_jobs).
+    :param append: whether the new versions are to be appended to the existing version set in the output directory.
+    :param cache: an optional cache shared by the jobs of the sweep (see core/cache.py).
+    :param artifact_store: an optional artifact store shared by the jobs of the sweep (see core/store.py).
+    :param mobile_limit: an optional function returning the maximal number of mobile functions (see executor.Executor).
+    :param budget: an optional budget of resources shared by the jobs executed at the same time (see executor/scheduler.py).
+    :return: a dictionary describing the result.
+    """
+    configure_job(config_obj, job)
+    progress.set_job(progress.get_job_name(job))
+    timings.set_benchmark(job['benchmark'])
+    progress.emit('job_start', {key: job[key] for key in ['benchmark', 'seed', 'nr_of_versions', 'transformation_type', 'mode', 'output_directory']})
+    start = time.time()
+
+    # Set and create the output directory
+    if not append:
+        shutil.rmtree(job['output_directory'], True)
+        os.makedirs(job['output_directory'])
+
+        # The run is staged in a scratch directory, if one is configured. When appending, the existing
+        # version set has to stay complete so the retention policy isn't applied.
+        if config_obj.retention['scratch_directory']:
+            config_obj.default['output_directory'] = retention.create_scratch_directory(config_obj.retention['scratch_directory'])
+
+    # We create an executor to start the semantic renewability flow.
+    executor_flow = executor.Executor(config_obj, cache, artifact_store, mobile_limit, budget)
+
+    print('************************ Generating ' + str(job['nr_of_versions']) + ' version(s) for seed ' + str(job['seed']) + ' **********************')
+    result = {'result': True}
+    try:
+        if append:
+            executor_flow.execute_append(job['mode'], job['testmode'])
+        else:
+            executor_flow.execute(job['mode'], job['testmode'])
+    except KeyboardInterrupt:
+        raise
+    except executor.PrunedError as e:
+        result = {'result': False, 'rejected': str(e), 'pruned': True}
+        print('************************ Pruned: ' + str(e) + ' ************************')
+    except executor.RejectedError as e:
+        result = {'result': False, 'rejected': str(e)}
+        print('************************ Rejected: ' + str(e) + ' ************************')
+    except:
+        result = {'result': False, 'error': traceback.format_exc()}
+        traceback.print_exc()
+        pass
+    finally:
+        # Only the artifacts selected by the retention policy are kept in the output directory.
+        if not append:
+            if config_obj.default['output_directory'] != job['output_directory']:
+                retention.promote(config_obj.default['output_directory'], job['output_directory'], config_obj.retention, job['benchmark'])
+
+                # The scratch directory can be on another file system than the store, in which case the
+                # artifacts can only be put in the store once they are promoted.
+                if artifact_store is not None:
+                    artifact_store.put_run(job['output_directory'], job['benchmark'])
+            else:
+                retention.apply(job['output_directory'], config_obj.retention, job['benchmark'])
+
+    # Store the result in the results database, if one is configured.
+    if config_obj.default['results_database']:
+        analytics_path = os.path.join(job['output_directory'], 'analytics.json')
+        analytics = file.read_json(analytics_path) if result['result'] and os.path.exists(analytics_path) else None
+        results.ResultsDatabase(config_obj.default['results_database']).ingest({'benchmark': job['benchmark'], 'seed': job['seed'],
+                                                                               'nr_of_versions': int(job['nr_of_versions']), 'transformation_type': job['transformation_type'],
+                                                                               'mode': job['mode'], 'output_directory': job['output_directory'],
+                                                                               'result': result['result'], 'rejected': result.get('rejected')}, analytics)
+
+    # Store the timings of the tools, to predict the duration of later runs.
+    if config_obj.default['timings_history']:
+        timings.store(config_obj.default['timings_history'])
+
+    # Output result
+    progress.emit('job_finish', {'result': result['result'], 'rejected': result.get('rejected'), 'failed': 'error' in result, 'duration': time.time() - start})
+    progress.set_job(None)
+    timings.set_benchmark(None)
+    print('************************ Result for seed ' + str(job['seed']) + ': ' + str(result['result']) + ' ************************')
+    print()
+    return result
+
+def main(mode, number_of_seeds, numbers_of_versions, output_dir, seed, testmode, transformation_type, append):
+    logging.debug('Executing...')
+    config_obj = read_config()
 
-        # For every item we will execute an executor flow.
-        for number_of_versions in numbers_of_versions:
-            # We set the number of versions
-            config_obj.default['nr_of_versions'] = number_of_versions
+    # When appending to an existing version set, all new versions go into its output directory.
+    output_dir_config = output_dir if output_dir else config_obj.default['output_directory']
+    jobs = get_jobs(config_obj, mode, number_of_seeds, numbers_of_versions, output_dir_config, seed, testmode, transformation_type)
+    if append:
+        for job in jobs:
+            job['output_directory'] = output_dir_config
+    else:
+        shutil.rmtree(output_dir_config, True)
+
+    # When multiple jobs are executed, they share a cache so that the source tree is only scanned once, and
+    # object files and section fingerprints are reused across the jobs (e.g. for unchanged translation units).
+    cache_directory = None
+    if len(jobs) > 1:
+        cache_directory = retention.create_scratch_directory(config_obj.retention['scratch_directory']) if config_obj.retention['scratch_directory'] else tempfile.mkdtemp(prefix='sr_')
+    shared_cache = cache.Cache(cache_directory) if cache_directory else None
+
+    # All jobs put their artifacts in a single store, so artifacts identical across versions and seeds are only stored once.
+    artifact_store = store.Store(os.path.join(output_dir_config, store.DIRECTORY)) if config_obj.store['enabled'] else None
+
+    # For every job we will execute an executor flow.
+    cells = []
+    progress.emit('sweep_start', {'jobs': len(jobs)})
+    try:
+        for job in jobs:
+            result = run_job(config_obj, job, append, shared_cache, artifact_store)
+
+            # Summarize the result of every cell of the matrix.
+            cell = {key: job[key] for key in ['transformation_type', 'seed', 'nr_of_versions', 'output_directory']}
+            cell['result'] = result['result']
+            cell['rejected'] = result.get('rejected')
+            analytics_path = os.path.join(job['output_directory'], 'analytics.json')
+            if result['result'] and os.path.exists(analytics_path):
+                analytics = file.read_json(analytics_path)
+                cell['amount_functions'] = analytics['general']['amount_functions']
+                cell['amount_mobile'] = analytics['general']['amount_mobile']
+            cells.append(cell)
+    finally:
+        progress.emit('sweep_finish', {'jobs': len(cells)})
+        if cache_directory:
+            shutil.rmtree(cache_directory, True)
+
+    # The artifacts removed by the retention policy are no longer referenced, and are garbage collected.
+    if artifact_store is not None:
+        removed, removed_bytes = artifact_store.collect()
+        report = artifact_store.report()
+        report['collected'] = removed
+        report['collected_bytes'] = removed_bytes
+        with open(os.path.join(output_dir_config, 'store.json'), 'w') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print('************************ Artifact store: ' + str(report['references']) + ' artifact(s) stored as ' + str(report['artifacts']) +
+              ', dedup ratio ' + str(round(report['dedup_ratio'], 2)) + ' (' + str(report['saved_bytes']) + ' bytes saved) ************************')
+
+    # Report the results per cell.
+    if len(cells) > 1:
+        with open(os.path.join(output_dir_config, 'matrix.json'), 'w') as f:
+            json.dump({'cells': cells, 'cache': shared_cache.statistics}, f, ensure_ascii=False, indent=2)
+
+        print('************************ Results per cell ************************')
+        for cell in cells:
+            print(cell['transformation_type'] + ', seed ' + str(cell['seed']) + ', ' + str(cell['nr_of_versions']) + ' version(s): ' +
+                  (str(cell.get('amount_mobile')) + '/' + str(cell.get('amount_functions')) + ' mobile' if cell['result'] else 'failed'))
+
+def watch(output_dir, seed, number_of_versions, transformation_type):
+    """
+    Method used to watch the input source directory, and analyze the versions again (as in mode 0) every time
+    the sources change. Runs share a cache, so only the changed translation units are compiled and compared again.
+    :return: nothing.
+    """
+    config_obj = read_config()
+    config_obj.default['output_directory'] = output_dir if output_dir else config_obj.default['output_directory']
+    config_obj.default['nr_of_versions'] = number_of_versions if number_of_versions else config_obj.default['nr_of_versions']
+    config_obj.semantic_mod['seed'] = str(seed) if seed else config_obj.semantic_mod['seed']
+    config_obj.semantic_mod['type'] = transformation_type if transformation_type else config_obj.semantic_mod['type']
 
-            # Set and create the output directory
-            output_dir = os.path.join(output_dir_config, str(seed) if len(seeds) > 1  else '', str(number_of_versions) if len(numbers_of_versions) > 1 else '')
-            config_obj.default['output_directory'] = output_dir
-            shutil.rmtree(output_dir, True)
-            os.makedirs(output_dir)
+    input_directory = config_obj.default['input_source_directory']
+    source_watcher = watcher.Watcher(input_directory, [config_obj.default['suffix_source'], config_obj.default['suffix_header']])
+    cache_directory = tempfile.mkdtemp(prefix='sr_')
+    watch_cache = cache.Cache(cache_directory)
 
-            # We create an executor to start the semantic renewability flow.
-            executor_flow = executor.Executor(config_obj)
+    mobile_functions = None
+    try:
+        while True:
+            shutil.rmtree(config_obj.default['output_directory'], True)
+            os.makedirs(config_obj.default['output_directory'])
 
-            print('************************ Generating ' + str(number_of_versions) + ' version(s) for seed ' + str(seed) + ' **********************')
+            start = time.time()
             try:
-                result = True
-                executor_flow.execute(mode, testmode)
+                _, functions_diff = executor.Executor(config_obj, watch_cache).execute(0, 0)
+            except executor.RejectedError as e:
+                functions_diff = None
+                print('************************ Rejected: ' + str(e) + ' ************************')
             except KeyboardInterrupt:
                 raise
             except:
-                result = False
+                functions_diff = None
                 traceback.print_exc()
-                pass
 
-            # Output result
-            print('************************ Result for seed ' + str(seed) + ': ' + str(result) + ' ************************')
-            print()
+            # Show how the set of mobile functions changed.
+            if functions_diff is not None:
+                if mobile_functions is not None:
+                    for function in sorted(set(functions_diff) - set(mobile_functions)):
+                        print('+ ' + function)
+                    for function in sorted(set(mobile_functions) - set(functions_diff)):
+                        print('- ' + function)
+                mobile_functions = functions_diff
+                print('************************ Mobile functions (' + str(round(time.time() - start, 1)) + 's): ' + ', '.join(mobile_functions) + ' ************************')
+
+            print('************************ Watching ' + input_directory + ' ************************')
+            changed = source_watcher.wait()
+            print('************************ Changed: ' + ', '.join(os.path.relpath(path, input_directory) for path in changed) + ' ************************')
+            watch_cache.invalidate(input_directory)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutil.rmtree(cache_directory, True)
+
+def estimate_job(config_obj, job, history):
+    """
+    Method used to estimate the duration of a job, based on the timings of earlier runs.
+    :param config_obj: the configuration.
+    :param job: the job (see get_jobs).
+    :param history: the timings history (see timings.read_history).
+    :return: the estimated duration in seconds, and the tool invocations of the job (see Executor.plan).
+    """
+    job_config = copy.deepcopy(config_obj)
+    configure_job(job_config, job)
+    stages = executor.Executor(job_config).plan(job['mode'], job['testmode'], history)
+    return (sum(calls * (timings.mean(history, tool, job['benchmark']) or 0.0) for _, tool, calls in stages if calls is not None), stages)
+
+def plan(mode, number_of_seeds, numbers_of_versions, output_dir, seed, testmode, transformation_type, benchmarks, concurrency):
+    """
+    Method used to estimate the amount of work of a sweep, and its wall time when executing a number of jobs
+    concurrently, without executing any tools. The durations are based on the timings of earlier runs.
+    :param benchmarks: a comma-separated list of name:input_source_directory pairs (the configured benchmark if not given).
+    :param concurrency: the number of jobs executed at the same time.
+    :return: nothing.
+    """
+    config_obj = read_config()
+    history = timings.read_history(config_obj.default['timings_history'])
+    jobs = get_jobs(config_obj, mode, number_of_seeds, numbers_of_versions, output_dir, seed, testmode, transformation_type, parse_benchmarks(benchmarks))
+
+    # Count the tool invocations of every job, and estimate its duration (from the timings of its own benchmark, if there are any).
+    totals = dict()
+    unknown = set()
+    durations = []
+    for job in jobs:
+        (duration, stages) = estimate_job(config_obj, job, history)
+        for stage, tool, calls in stages:
+            mean = timings.mean(history, tool, job['benchmark'])
+            if calls is None or mean is None:
+                unknown.add(stage + '/' + tool)
+            if calls is not None:
+                (total_calls, total_seconds) = totals.get((stage, tool), (0, 0.0))
+                totals[(stage, tool)] = (total_calls + calls, total_seconds + calls * (mean or 0.0))
+        durations.append(duration)
+        print('Job ' + job['benchmark'] + ', seed ' + str(job['seed']) + ', ' + str(job['nr_of_versions']) + ' version(s): ' + str(round(duration, 1)) + 's')
+
+    print()
+    for (stage, tool), (calls, seconds) in sorted(totals.items()):
+        print(stage + '/' + tool + ': ' + str(calls) + ' invocation(s)' + (', ' + str(round(seconds, 1)) + 's' if stage + '/' + tool not in unknown else ''))
+    if unknown:
+        print('Not estimated (no history): ' + ', '.join(sorted(unknown)))
+
+    print('************************ ' + str(len(jobs)) + ' job(s), ' + str(round(sum(durations), 1)) + 's of work, predicted wall time at concurrency ' +
+          str(concurrency) + ': ' + str(round(timings.makespan(durations, concurrency), 1)) + 's ************************')
+
+def search(best, number_of_seeds, number_of_versions, output_dir, seed, mode, testmode, transformation_type, budget, concurrency):
+    """
+    Method used to search for the seeds resulting in the fewest mobile functions. Seeds are only analyzed (as in
+    mode 0), a number of them at the same time, until the number of seeds or the time budget is exhausted. As soon
+    as a seed has more mobile functions than the best seeds found so far, it is pruned. The best seeds are then
+    executed in the requested mode.
+    :param best: the number of best seeds that are executed.
+    :param number_of_seeds: the maximal number of seeds to analyze (unlimited if not given).
+    :param budget: the time budget in seconds for analyzing seeds (unlimited if not given).
+    :param concurrency: the number of seeds analyzed at the same time.
+    :return: nothing.
+    """
+    config_obj = read_config()
+    output_dir_config = output_dir if output_dir else config_obj.default['output_directory']
+    shutil.rmtree(output_dir_config, True)
+    seed = seed if seed else int(config_obj.semantic_mod['seed'])
+    seeds = range(seed, seed + number_of_seeds) if number_of_seeds else itertools.count(seed)
+
+    # The number of mobile functions of every analyzed seed {seed: amount}. A seed is pruned when it has more mobile
+    # functions than the worst of the best seeds found so far.
+    amounts = dict()
+    lock = threading.Lock()
+    def mobile_limit():
+        with lock:
+            return sorted(amounts.values())[best - 1] if len(amounts) >= best else None
+
+    def evaluate(seed):
+        job = get_jobs(config_obj, 0, None, number_of_versions, os.path.join(output_dir_config, 'search', str(seed)), seed, 0, transformation_type)[0]
+        start = time.time()
+        result = run_job(copy.deepcopy(config_obj), job, mobile_limit=mobile_limit)
+        evaluation = {'seed': seed, 'result': result['result'], 'pruned': result.get('pruned', False), 'rejected': result.get('rejected'), 'elapsed': time.time() - start}
+        if result['result']:
+            with open(os.path.join(job['output_directory'], 'result.json'), 'r') as f:
+                evaluation['amount_mobile'] = json.load(f)['amount_mobile']
+            with lock:
+                amounts[seed] = evaluation['amount_mobile']
+        return evaluation
+
+    # Analyze the seeds, starting a new one as soon as another one is finished.
+    print('************************ Searching for the ' + str(best) + ' best seed(s) ************************')
+    start = time.time()
+    evaluations = []
+    seeds = iter(seeds)
+    progress.emit('sweep_start', {'jobs': number_of_seeds})
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        running = set()
+        while True:
+            while len(running) < concurrency and (not budget or time.time() - start < budget):
+                next_seed = next(seeds, None)
+                if next_seed is None:
+                    break
+                running.add(pool.submit(evaluate, next_seed))
+            if not running:
+                break
+
+            done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            evaluations += [future.result() for future in done]
+
+    progress.emit('sweep_finish', {'jobs': len(evaluations)})
+
+    # Pick the best seeds, the lowest seed first on ties.
+    best_seeds = sorted(amounts, key=lambda seed: (amounts[seed], seed))[:best]
+    with open(os.path.join(output_dir_config, 'search.json'), 'w') as f:
+        json.dump({'evaluations': sorted(evaluations, key=lambda evaluation: evaluation['seed']), 'best_seeds': best_seeds, 'elapsed': time.time() - start},
+                  f, ensure_ascii=False, indent=2)
+    print('************************ Analyzed ' + str(len(evaluations)) + ' seed(s) (' + str(len([evaluation for evaluation in evaluations if evaluation['pruned']])) +
+          ' pruned) in ' + str(round(time.time() - start, 1)) + 's, best: ' + ', '.join(str(seed) + ' (' + str(amounts[seed]) + ' mobile)' for seed in best_seeds) +
+          ' ************************')
+
+    # Execute the best seeds in the requested mode.
+    if mode:
+        for best_seed in best_seeds:
+            job = get_jobs(config_obj, mode, None, number_of_versions, os.path.join(output_dir_config, str(best_seed)), best_seed, testmode, transformation_type)[0]
+            run_job(copy.deepcopy(config_obj), job)
+
+def get_batch_jobs(config_obj, batch_file, mode, number_of_seeds, numbers_of_versions, output_dir, seed, testmode, transformation_type):
+    """
+    Method used to split a batch of benchmarks into jobs. Every section of the batch file is a benchmark, with options:
+        InputSourceDirectory    the input source directory (required).
+        BinaryName              the name of the binary (the name of the section if not given).
+        NrOfVersions            the numbers of versions (comma-separated).
+        TransformationType      the types of transformation (comma-separated).
+        Seed                    the (first) seed.
+        NrOfSeeds               the number of seeds.
+        CommonOptions, PreprocessorFlags, CompilerFlags, LinkerFlags
+                                the flags of the benchmark (JSON lists, see the ACTC section of config.ini).
+    Options in the DEFAULT section apply to all benchmarks. Options that aren't given are taken from the arguments,
+    or else from the configuration.
+    :param batch_file: the batch file.
+    :return: a list of job dictionaries.
+    """
+    batch_config = configparser.ConfigParser()
+    assert batch_config.read(batch_file), 'Could not read batch file ' + batch_file + '!'
+
+    jobs = []
+    for name in batch_config.sections():
+        options = batch_config[name]
+        assert 'InputSourceDirectory' in options, 'No InputSourceDirectory for benchmark ' + name + '!'
+        overrides = {'actc': {option: json.loads(options[key]) for key, option in [('CommonOptions', 'common_options'), ('PreprocessorFlags', 'preprocessor_flags'),
+                                                                                ('CompilerFlags', 'compiler_flags'), ('LinkerFlags', 'linker_flags')] if key in options}}
+        benchmark_jobs = get_jobs(config_obj, mode, int(options['NrOfSeeds']) if 'NrOfSeeds' in options else number_of_seeds,
+                                  options.get('NrOfVersions', numbers_of_versions), os.path.join(output_dir, name),
+                                  int(options['Seed']) if 'Seed' in options else seed, testmode, options.get('TransformationType', transformation_type),
+                                  [(options.get('BinaryName', name), options['InputSourceDirectory'])])
+        for job in benchmark_jobs:
+            job['name'] = name
+            job['overrides'] = overrides
+        jobs += benchmark_jobs
+    return jobs
+
+def batch(batch_file, mode, number_of_seeds, numbers_of_versions, output_dir, seed, testmode, transformation_type, concurrency):
+    """
+    Method used to execute the jobs of a batch of benchmarks (see get_batch_jobs), a number of them at the same time.
+    All jobs share a single budget of CPUs and boards (see the SCHEDULER section of config.ini), and the
+    jobs that are estimated to take longest are started first, so no long job is left over at the end.
+    Jobs that test on the board are executed one at a time: all of them deploy to the same directories on the board
+    (named after the versions), and they share the BENCHMARK and TESTING sections of the configuration.
+    :param batch_file: the batch file.
+    :param concurrency: the number of jobs executed at the same time.
+    :return: nothing.
+    """
+    assert not testmode or concurrency <= 1, 'Jobs of a batch that test on the board can not be executed at the same time!'
+    config_obj = read_config()
+    output_dir_config = output_dir if output_dir else config_obj.default['output_directory']
+    jobs = get_batch_jobs(config_obj, batch_file, mode, number_of_seeds, numbers_of_versions, output_dir_config, seed, testmode, transformation_type)
+    shutil.rmtree(output_dir_config, True)
+
+    # Order the jobs the longest first. Without timings of earlier runs, the number of tool invocations is used as the size of a job.
+    history = timings.read_history(config_obj.default['timings_history'])
+    estimates = dict()
+    for idx, job in enumerate(jobs):
+        (duration, stages) = estimate_job(config_obj, job, history)
+        estimates[idx] = (duration, sum(calls for _, _, calls in stages if calls is not None))
+    order = sorted(range(len(jobs)), key=lambda idx: estimates[idx], reverse=True)
+
+    capacities = executor.Executor(config_obj).get_resource_capacities()
+    budget = scheduler.Budget({resource: capacities[resource] for resource in ['cpu', 'board', 'deployment']})
+    artifact_store = store.Store(os.path.join(output_dir_config, store.DIRECTORY)) if config_obj.store['enabled'] else None
+
+    def execute(idx):
+        start = time.time()
+        result = run_job(copy.deepcopy(config_obj), jobs[idx], artifact_store=artifact_store, budget=budget)
+        return (idx, result, start, time.time())
+
+    print('************************ Executing ' + str(len(jobs)) + ' job(s) of ' + str(len(set(job['name'] for job in jobs))) + ' benchmark(s), ' +
+          str(concurrency) + ' at the same time ************************')
+    progress.emit('sweep_start', {'jobs': len(jobs)})
+    start = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        executed = [future.result() for future in [pool.submit(execute, idx) for idx in order]]
+    end = time.time()
+    progress.emit('sweep_finish', {'jobs': len(executed)})
+
+    # The artifacts removed by the retention policy are no longer referenced, and are garbage collected.
+    if artifact_store is not None:
+        artifact_store.collect()
+
+    # Summarize the results of every job, and per benchmark.
+    cells = []
+    for idx, result, job_start, job_end in sorted(executed):
+        job = jobs[idx]
+        cell = {key: job[key] for key in ['name', 'benchmark', 'transformation_type', 'seed', 'nr_of_versions', 'output_directory']}
+        cell['result'] = result['result']
+        cell['rejected'] = result.get('rejected')
+        cell['failed'] = 'error' in result
+        cell['estimated_duration'] = estimates[idx][0]
+        cell['start'] = job_start - start
+        cell['duration'] = job_end - job_start
+        analytics_path = os.path.join(job['output_directory'], 'analytics.json')
+        if result['result'] and os.path.exists(analytics_path):
+            analytics = file.read_json(analytics_path)
+            cell['amount_functions'] = analytics['general']['amount_functions']
+            cell['amount_mobile'] = analytics['general']['amount_mobile']
+        cells.append(cell)
+
+    benchmarks = dict()
+    for cell in cells:
+        summary = benchmarks.setdefault(cell['name'], {'jobs': 0, 'succeeded': 0, 'rejected': 0, 'failed': 0, 'amount_functions': 0, 'amount_mobile': 0, 'duration': 0.0})
+        summary['jobs'] += 1
+        summary['succeeded'] += cell['result']
+        summary['rejected'] += cell['rejected'] is not None
+        summary['failed'] += cell['failed']
+        summary['amount_functions'] += cell.get('amount_functions', 0)
+        summary['amount_mobile'] += cell.get('amount_mobile', 0)
+        summary['duration'] += cell['duration']
+
+    report = {'jobs': cells, 'benchmarks': benchmarks, 'concurrency': concurrency, 'budget': budget.capacities, 'makespan': end - start,
+              'work': sum(cell['duration'] for cell in cells), 'predicted_makespan': timings.makespan([estimates[idx][0] for idx in range(len(jobs))], concurrency)}
+    if artifact_store is not None:
+        report['store'] = artifact_store.report()
+    with open(os.path.join(output_dir_config, 'batch.json'), 'w') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print('************************ Results per benchmark ************************')
+    for name, summary in sorted(benchmarks.items()):
+        print(name + ': ' + str(summary['succeeded']) + '/' + str(summary['jobs']) + ' job(s) succeeded (' + str(summary['rejected']) + ' rejected, ' +
+              str(summary['failed']) + ' failed), ' + str(summary['amount_mobile']) + '/' + str(summary['amount_functions']) + ' mobile, ' +
+              str(round(summary['duration'], 1)) + 's')
+    print('************************ ' + str(round(report['work'], 1)) + 's of work in ' + str(round(report['makespan'], 1)) + 's ************************')
+
+def coordinate(queue_path, mode, number_of_seeds, numbers_of_versions, output_dir, seed, testmode, transformation_type, benchmarks):
+    """
+    Method used to split a sweep into jobs and put them on a work queue, to be executed by workers (see work).
+    :param benchmarks: a comma-separated list of name:input_source_directory pairs (the configured benchmark if not given).
+    :return: nothing.
+    """
+    config_obj = read_config()
+    benchmarks = parse_benchmarks(benchmarks)
+
+    output_dir_config = output_dir if output_dir else config_obj.default['output_directory']
+    jobs = get_jobs(config_obj, mode, number_of_seeds, numbers_of_versions, output_dir_config, seed, testmode, transformation_type, benchmarks)
+    shutil.rmtree(output_dir_config, True)
+
+    work_queue.WorkQueue(queue_path, config_obj.queue).enqueue(jobs)
+    print('************************ Enqueued ' + str(len(jobs)) + ' job(s) on ' + queue_path + ' ************************')
+
+def work(queue_path):
+    """
+    Method used to execute jobs from a work queue until it is drained. The results are written to the
+    output directories chosen by the coordinator, which are to be on shared storage.
+    :return: nothing.
+    """
+    config_obj = read_config()
+    queue = work_queue.WorkQueue(queue_path, config_obj.queue)
+
+    # Every job gets a fresh copy of the configuration.
+    executed = queue.work(lambda job: run_job(copy.deepcopy(config_obj), job))
+    print('************************ Worker ' + queue.worker + ' executed ' + str(executed) + ' job(s): ' + str(queue.status()) + ' ************************')
 
 # Parse the arguments.
 if __name__ == '__main__':
     # Parsing the arguments
     parser = argparse.ArgumentParser()
+    parser.add_argument('-a', '--append', action='store_true', help='Append new versions to the existing version set in the output directory.')
+    parser.add_argument('-b', '--benchmarks', type=str, help='The benchmarks to sweep over as a comma-separated list of name:input_source_directory pairs (with --coordinator or --plan).')
+    parser.add_argument('--batch', type=str, help='Execute the benchmarks in this batch file, sharing the resources (see get_batch_jobs).')
+    parser.add_argument('--coordinator', action='store_true', help='Split the sweep into jobs and put them on the work queue.')
     parser.add_argument('-d', '--debug', action='store_true', help='Enable debugging log.')
+    parser.add_argument('--daemon', action='store_true', help='Run as a daemon, producing new versions on request.')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='The number of jobs executed at the same time (with --batch, --plan or --search).')
     parser.add_argument('-m', '--mode', type=int, default=2, help='The mode in which the framework is to be executed.')
-    parser.add_argument('-n', '--number_of_seeds', type=int, help='The number of seeds to test.')
+    parser.add_argument('-n', '--number_of_seeds', type=int, help='The number of seeds to test (at most, with --search).')
     parser.add_argument('-o', '--output_dir', help='The output directory.')
+    parser.add_argument('-p', '--plan', action='store_true', help='Estimate the amount of work and the wall time of the sweep, without executing it.')
+    parser.add_argument('-q', '--queue', type=str, help='The work queue (an SQLite database on shared storage).')
     parser.add_argument('-s', '--seed', type=int, help='The seed.')
-    parser.add_argument('-t', '--testmode', type=int, default=0, help='The mode in which testing is to happen. 0 is no testing.')
+    parser.add_argument('--search', type=int, help='Search for this number of seeds with the fewest mobile functions, and execute them in the requested mode.')
+    parser.add_argument('--search_budget', type=float, help='The time budget in seconds for analyzing seeds (with --search).')
+    parser.add_argument('-t', '--testmode', type=int, default=0, help='The mode in which testing is to happen. 0 is no testing, 3 is benchmarking against the base build.')
     parser.add_argument('-v', '--numbers_of_versions', type=str, help='The numbers of versions to test.')
-    parser.add_argument('-y', '--transformation_type', type=str, help='The type of transformation.')
+    parser.add_argument('-w', '--worker', action='store_true', help='Execute jobs from the work queue until it is drained.')
+    parser.add_argument('--watch', action='store_true', help='Analyze the versions again every time the input sources change.')
+    parser.add_argument('-y', '--transformation_type', type=str, help='The types of transformation to test.')
     args = parser.parse_args()
 
     # Check if DEBUG mode is on or not.
@@ -102,5 +626,48 @@ if __name__ == '__main__':
         fileHandler.setFormatter(logFormatter)
         rootLogger.addHandler(fileHandler)
 
+    # Start the daemon, if requested.
+    if args.daemon:
+        config_obj = read_config()
+        if args.output_dir:
+            config_obj.default['output_directory'] = args.output_dir
+        daemon.Daemon(config_obj).serve()
+        sys.exit(0)
+
+    # Watch the input sources, if requested.
+    if args.watch:
+        watch(args.output_dir, args.seed, args.numbers_of_versions, args.transformation_type)
+        sys.exit(0)
+
+    # Only plan the sweep, if requested.
+    if args.plan:
+        plan(args.mode, args.number_of_seeds, args.numbers_of_versions, args.output_dir, args.seed, args.testmode, args.transformation_type, args.benchmarks, args.jobs)
+        sys.exit(0)
+
+    # Search for the best seeds, if requested.
+    if args.search:
+        if not args.number_of_seeds and not args.search_budget:
+            parser.error('--search requires --number_of_seeds or --search_budget.')
+        search(args.search, args.number_of_seeds, args.numbers_of_versions, args.output_dir, args.seed, args.mode, args.testmode, args.transformation_type,
+               args.search_budget, args.jobs)
+        sys.exit(0)
+
+    # Execute a batch of benchmarks, if requested.
+    if args.batch:
+        if args.testmode and args.jobs > 1:
+            parser.error('--batch with --testmode can only execute one job at a time, the jobs would share the directories on the board.')
+        batch(args.batch, args.mode, args.number_of_seeds, args.numbers_of_versions, args.output_dir, args.seed, args.testmode, args.transformation_type, args.jobs)
+        sys.exit(0)
+
+    # Coordinate or work on a work queue, if requested.
+    if args.coordinator or args.worker:
+        if not args.queue:
+            parser.error('--coordinator and --worker require --queue.')
+        if args.coordinator:
+            coordinate(args.queue, args.mode, args.number_of_seeds, args.numbers_of_versions, args.output_dir, args.seed, args.testmode, args.transformation_type, args.benchmarks)
+        if args.worker:
+            work(args.queue)
+        sys.exit(0)
+
     # Start the execution.
-    main(args.mode, args.number_of_seeds, args.numbers_of_versions, args.output_dir, args.seed, args.testmode, args.transformation_type)
+    main(args.mode, args.number_of_seeds, args.numbers_of_versions, args.output_dir, args.seed, args.testmode, args.transformation_type, args.append)
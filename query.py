@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+
+"""
+Module used to query the results database (see core/results.py).
+"""
+
+import argparse
+import config
+import configparser
+import os
+
+import core.results as results
+
+def print_rows(cursor):
+    # We print the rows tab-separated, preceded by the column names.
+    print('\t'.join([column[0] for column in cursor.description]))
+    for row in cursor:
+        print('\t'.join([str(value) for value in row]))
+
+# Parse the arguments.
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-b', '--benchmark', type=str, help='Only consider the runs of this benchmark.')
+    parser.add_argument('-d', '--database', type=str, help='The results database (the configured one if not given).')
+    parser.add_argument('-e', '--export', type=str, help='Export the result of the query to this CSV file.')
+    parser.add_argument('-s', '--seed', type=int, help='Only consider the runs with this seed.')
+    parser.add_argument('-t', '--threshold', type=float, default=0.0, help='The minimal fraction of runs in which a function must be mobile (for mobility).')
+    parser.add_argument('-v', '--nr_of_versions', type=int, help='Only consider the runs with this number of versions.')
+    parser.add_argument('-y', '--transformation_type', type=str, help='Only consider the runs with this type of transformation.')
+    parser.add_argument('query', choices=['runs', 'functions', 'mobility'], help='The query: the runs, the mobility of every function in every run, or how often every function is mobile.')
+    args = parser.parse_args()
+
+    database = args.database
+    if not database:
+        config_file = configparser.ConfigParser()
+        config_file.read(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini'))
+        database = config.Config(config_file).default['results_database']
+        if not database:
+            parser.error('No results database configured.')
+
+    results_database = results.ResultsDatabase(database)
+    filters = {'benchmark': args.benchmark, 'seed': args.seed, 'nr_of_versions': args.nr_of_versions, 'transformation_type': args.transformation_type}
+    if args.query == 'runs':
+        cursor = results_database.runs(filters)
+    elif args.query == 'functions':
+        cursor = results_database.functions(filters)
+    else:
+        cursor = results_database.mobility(filters, args.threshold)
+
+    if args.export:
+        print('Exported ' + str(results_database.export(cursor, args.export)) + ' rows to ' + args.export + '.')
+    else:
+        print_rows(cursor)
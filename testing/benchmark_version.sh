@@ -0,0 +1,23 @@
+#!/usr/bin/env bash
+set -o errexit
+set -o pipefail
+set -o nounset
+
+## Script used to benchmark a version (the binary is only copied to the board the first time).
+## The timing results are written to stdout in JSON format.
+## Usage: ./benchmark_version.sh <host> <binary> <version_name> <runs> [<cpu>]
+host=$1
+binary=$2
+version_name=$3
+runs=$4
+cpu=${5:-}
+
+# Copy over files
+dst_dir="~/automatic_tests/benchmark/$version_name"
+if ! ssh $host "test -f $dst_dir/binary"; then
+    ssh $host "mkdir -p $dst_dir"
+    scp -q $binary $host:$dst_dir/binary
+fi
+
+# Execute the benchmarking script
+ssh $host "~/automatic_tests/testing/benchmark.py ~/automatic_tests/testing/config.ini $dst_dir -r $runs ${cpu:+-c $cpu}"
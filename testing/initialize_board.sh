@@ -13,4 +13,4 @@ ssh $host "rm -rf ~/automatic_tests"
 ssh $host "mkdir -p ~/automatic_tests/testing"
 
 # Transfer the testing framework
-scp $(dirname $0)/transferable/test.py $config_file  $host:~/automatic_tests/testing/
+scp $(dirname $0)/transferable/test.py $(dirname $0)/transferable/benchmark.py $config_file  $host:~/automatic_tests/testing/
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+import argparse
+import configparser
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from test import parse_input_output
+
+def time_binary(binary, inputs, cpu):
+    """
+    Method used to time a single execution of a binary.
+    :param binary: the binary to execute.
+    :param inputs: the list of arguments for the binary.
+    :param cpu: the CPU the execution is pinned to (None means no pinning).
+    :return: the return code and the real, user and system time of the execution.
+    """
+    # Pin the execution to a specific CPU if requested.
+    command_exec = (['taskset', '-c', cpu] if cpu else []) + [binary] + inputs
+
+    # We measure the wall clock time ourselves, and derive the CPU time from the resource usage of our children.
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    ret_code = subprocess.call(command_exec, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    real = time.perf_counter() - start
+    usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    return ret_code, real, usage_after.ru_utime - usage_before.ru_utime, usage_after.ru_stime - usage_before.ru_stime
+
+if __name__ == '__main__':
+    # Parsing the arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument('config_file', help='The config file for the testcase.')
+    parser.add_argument('exec_dir', help='The execution directory, containing the binary.')
+    parser.add_argument('-c', '--cpu', help='The CPU to pin the executions to.')
+    parser.add_argument('-r', '--runs', type=int, default=1, help='The number of runs for every input.')
+    args = parser.parse_args()
+
+    # We read the input/output pairs from the config file.
+    config_file = configparser.ConfigParser()
+    config_file.read(args.config_file)
+    pairs = parse_input_output(config_file)
+
+    # We time the binary for every input. The expected output is of no importance here.
+    os.chdir(args.exec_dir)
+    results = []
+    for inputs, _ in pairs:
+        samples = []
+        for _ in range(args.runs):
+            ret_code, real, user, system = time_binary('./binary', inputs, args.cpu)
+            samples.append({'return_code': ret_code, 'real': real, 'user': user, 'system': system})
+
+        results.append({'input': ' '.join(inputs), 'samples': samples})
+
+    # The results are written to stdout, the side that invoked us is responsible for storing them.
+    json.dump(results, sys.stdout, ensure_ascii=False)
@@ -10,6 +10,25 @@ import sys
 # Debugging format.
 DEBUG_FORMAT = '%(levelname)s:%(filename)s:%(funcName)s:%(asctime)s %(message)s\n'
 
+def parse_input_output(config_file):
+    """
+    Method used to parse the input/output pairs out of the testing config file.
+    :param config_file: the parsed config file (configparser).
+    :return: a list of (inputs, expected output) tuples.
+    """
+    input_output = json.loads(config_file.get("TESTING", "InputOutput"))
+
+    # Parse the input/output pairs.
+    pairs = []
+    for pair in input_output:
+        inputs = pair[pair.find('[') +1 : pair.find(']')]
+        inputs = inputs.split(',') if inputs else []
+        output = pair[pair.find('\'') +1:pair.rfind('\'')]
+
+        pairs.append((inputs, output))
+
+    return pairs
+
 def perform_tests(testing):
     # Dictionary used to store all relevant test data.
     data = dict()
@@ -94,19 +113,7 @@ if __name__ == '__main__':
 
     # We parse the config file into a custom config object.
     testing = dict()
-    input_output = json.loads(config_file.get("TESTING", "InputOutput"))
-
-    # Parse the input/output pairs.
-    pairs = []
-    for pair in input_output:
-        inputs = pair[pair.find('[') +1 : pair.find(']')]
-        inputs = inputs.split(',') if inputs else []
-        output = pair[pair.find('\'') +1:pair.rfind('\'')]
-
-        pairs.append((inputs, output))
-
-    # We set the input/output pairs in the dictionary.
-    testing['input_output'] = pairs
+    testing['input_output'] = parse_input_output(config_file)
 
     # We start the testing flow.
     os.chdir(args.exec_dir)
@@ -0,0 +1,69 @@
+""" Tests of the delta packages of mobile blocks (see core/delta.py). """
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import core.delta as delta
+
+class DeltaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.old_directory = os.path.join(self.directory, 'old')
+        self.new_directory = os.path.join(self.directory, 'new')
+        self.package = os.path.join(self.directory, 'package', 'delta.tar')
+
+        # Random blocks don't compress, so a small change is cheaper to transfer as a delta than in full.
+        rng = random.Random(0)
+        changed = bytes(rng.getrandbits(8) for _ in range(4096))
+        self.old_blocks = {'same': b'unchanged block' * 16,
+                           os.path.join('sub', 'changed'): changed,
+                           'replaced': bytes(rng.getrandbits(8) for _ in range(256)),
+                           'gone': b'removed block'}
+        self.new_blocks = {'same': b'unchanged block' * 16,
+                           os.path.join('sub', 'changed'): changed[:1000] + b'patched' + changed[1007:],
+                           'replaced': bytes(rng.getrandbits(8) for _ in range(256)),
+                           'added': b'new block'}
+        self.write_blocks(self.old_directory, self.old_blocks)
+        self.write_blocks(self.new_directory, self.new_blocks)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_blocks(self, directory, blocks):
+        for name, contents in blocks.items():
+            os.makedirs(os.path.dirname(os.path.join(directory, name)), exist_ok=True)
+            with open(os.path.join(directory, name), 'wb') as f:
+                f.write(contents)
+
+    def test_round_trip(self):
+        index = delta.create_package(self.old_directory, self.new_directory, self.package)
+        kinds = {entry['name']: entry['kind'] for entry in index['blocks']}
+        self.assertEqual(kinds, {'same': delta.UNCHANGED, os.path.join('sub', 'changed'): delta.DELTA, 'replaced': delta.FULL,
+                                 'added': delta.FULL, 'gone': delta.REMOVED})
+
+        self.assertEqual(delta.apply_package(self.old_blocks, self.package), self.new_blocks)
+        self.assertEqual(delta.verify_package(self.old_directory, self.new_directory, self.package), [])
+
+        summary = delta.summarize(index)
+        self.assertEqual([summary[kind] for kind in [delta.UNCHANGED, delta.DELTA, delta.FULL, delta.REMOVED]], [1, 1, 2, 1])
+        self.assertLess(summary['transfer_size'], summary['full_size'])
+        self.assertGreater(summary['savings'], 0.0)
+
+    def test_base_mismatch(self):
+        delta.create_package(self.old_directory, self.new_directory, self.package)
+
+        # The client has a different version of the block the delta was created against.
+        name = os.path.join('sub', 'changed')
+        self.old_blocks[name] = b'other' + self.old_blocks[name][5:]
+        with self.assertRaises(AssertionError):
+            delta.apply_package(self.old_blocks, self.package)
+
+        self.write_blocks(self.old_directory, self.old_blocks)
+        with self.assertRaises(AssertionError):
+            delta.verify_package(self.old_directory, self.new_directory, self.package)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+""" Tests of the scheduler of the tasks of the main flow (see executor/scheduler.py). """
+import threading
+import time
+import unittest
+
+import executor.scheduler as scheduler
+
+class Concurrency:
+    # Keeps track of the maximal number of tasks executing at the same time.
+
+    def __init__(self):
+        self.running = 0
+        self.maximum = 0
+        self.lock = threading.Lock()
+
+    def task(self, duration=0.05):
+        with self.lock:
+            self.running += 1
+            self.maximum = max(self.maximum, self.running)
+        time.sleep(duration)
+        with self.lock:
+            self.running -= 1
+
+class SchedulerTest(unittest.TestCase):
+
+    def test_dependencies(self):
+        order = []
+        stage_scheduler = scheduler.Scheduler({'cpu': 4})
+
+        # Dependencies can be added after the tasks depending on them, and tasks can add new tasks.
+        stage_scheduler.add('c', lambda: order.append('c'), ['b'])
+        stage_scheduler.add('b', lambda: order.append('b') or stage_scheduler.add('d', lambda: order.append('d'), ['c']), ['a'])
+        stage_scheduler.add('a', lambda: order.append('a') or 42)
+        stage_scheduler.run()
+
+        self.assertEqual(order, ['a', 'b', 'c', 'd'])
+        self.assertEqual(stage_scheduler.result('a'), 42)
+
+    def test_missing_dependency(self):
+        stage_scheduler = scheduler.Scheduler({'cpu': 1})
+        stage_scheduler.add('a', lambda: None, ['missing'])
+        with self.assertRaises(AssertionError):
+            stage_scheduler.run()
+
+    def test_unknown_resource(self):
+        stage_scheduler = scheduler.Scheduler({'cpu': 1})
+        with self.assertRaises(AssertionError):
+            stage_scheduler.add('a', lambda: None, [], ['board'])
+
+    def test_capacities(self):
+        cpu = Concurrency()
+        board = Concurrency()
+        stage_scheduler = scheduler.Scheduler({'cpu': 2, 'board': 1})
+        for idx in range(6):
+            stage_scheduler.add('cpu:' + str(idx), cpu.task)
+            stage_scheduler.add('board:' + str(idx), board.task, [], ['board'])
+        stage_scheduler.run()
+
+        self.assertEqual(cpu.maximum, 2)
+        self.assertEqual(board.maximum, 1)
+
+    def test_failure(self):
+        executed = []
+        def fail():
+            raise ValueError('failed')
+
+        stage_scheduler = scheduler.Scheduler({'cpu': 1})
+        stage_scheduler.add('fail', fail)
+        stage_scheduler.add('dependent', lambda: executed.append('dependent'), ['fail'])
+        stage_scheduler.add('independent', lambda: executed.append('independent'), [])
+        with self.assertRaises(ValueError):
+            stage_scheduler.run()
+
+        # No new tasks are started after a failure.
+        self.assertEqual(executed, [])
+        self.assertEqual(stage_scheduler.tasks['fail'].state, 'failed')
+        self.assertEqual(stage_scheduler.tasks['dependent'].state, 'pending')
+        self.assertEqual([task['name'] for task in stage_scheduler.report()['tasks']], ['fail'])
+
+    def test_critical_path(self):
+        stage_scheduler = scheduler.Scheduler({'cpu': 4})
+        self.assertEqual(stage_scheduler.critical_path(), [])
+
+        stage_scheduler.add('a', lambda: time.sleep(0.01))
+        stage_scheduler.add('b', lambda: time.sleep(0.2), ['a'])
+        stage_scheduler.add('c', lambda: time.sleep(0.01), ['a'])
+        stage_scheduler.add('d', lambda: time.sleep(0.01), ['b', 'c'])
+        stage_scheduler.add('e', lambda: time.sleep(0.01))
+        stage_scheduler.run()
+
+        self.assertEqual(stage_scheduler.critical_path(), ['a', 'b', 'd'])
+        self.assertEqual(stage_scheduler.report()['critical_path'], ['a', 'b', 'd'])
+
+class BudgetTest(unittest.TestCase):
+
+    def test_acquire(self):
+        budget = scheduler.Budget({'cpu': 2, 'board': 1})
+        self.assertTrue(budget.acquire(['cpu', 'board']))
+        self.assertFalse(budget.acquire(['cpu', 'board']))
+
+        # Resource classes that aren't shared are ignored.
+        self.assertTrue(budget.acquire(['cpu', 'actc']))
+        self.assertFalse(budget.acquire(['cpu']))
+        budget.release(['cpu', 'actc'])
+        self.assertTrue(budget.acquire(['cpu']))
+        budget.release(['cpu', 'board'])
+        self.assertTrue(budget.acquire(['board']))
+
+    def test_shared(self):
+        # Two schedulers with two CPUs each share a budget of a single CPU.
+        cpu = Concurrency()
+        budget = scheduler.Budget({'cpu': 1})
+        schedulers = [scheduler.Scheduler({'cpu': 2}, budget) for _ in range(2)]
+        for stage_scheduler in schedulers:
+            for idx in range(2):
+                stage_scheduler.add('task:' + str(idx), cpu.task)
+        threads = [threading.Thread(target=stage_scheduler.run) for stage_scheduler in schedulers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(cpu.maximum, 1)
+        self.assertTrue(all(task.state == 'finished' for stage_scheduler in schedulers for task in stage_scheduler.tasks.values()))
+
+if __name__ == '__main__':
+    unittest.main()
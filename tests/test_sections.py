@@ -0,0 +1,85 @@
+""" Tests of the relocation aware comparison of sections (see core/sections.py). """
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+import core.comparator as comparator
+import core.sections as sections
+import core.tools.elf_reader as elf_reader
+
+# Two translation units that only differ in the order in which they refer to the external functions, so the
+# symbols have different indices in the symbol tables of their object files.
+SOURCE_ONE = '''
+extern int g1(int);
+extern int g2(int);
+int bar(int x) { return g1(x) + 1; }
+int foo(int x) { return g2(x) + 2; }
+'''
+SOURCE_TWO = '''
+extern int g1(int);
+extern int g2(int);
+int foo(int x) { return g2(x) + 2; }
+int bar(int x) { return g1(x) + 1; }
+'''
+
+@unittest.skipUnless(shutil.which('gcc') and shutil.which('readelf'), 'gcc and readelf are needed to create and read object files.')
+class RelocationAwareTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.object_files = [self.compile(source, name) for source, name in [(SOURCE_ONE, 'one'), (SOURCE_TWO, 'two')]]
+        self.comparator = comparator.Comparator(elf_reader.ElfReader(shutil.which('readelf')))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def compile(self, source, name):
+        source_file = os.path.join(self.directory, name + '.c')
+        with open(source_file, 'w') as f:
+            f.write(source)
+        object_file = os.path.join(self.directory, name + '.o')
+        subprocess.check_call(['gcc', '-O1', '-fno-asynchronous-unwind-tables', '-ffunction-sections', '-c', source_file, '-o', object_file])
+        return object_file
+
+    def classify(self, section):
+        if self.comparator.sections_equal(section, *self.object_files):
+            return None
+        return self.comparator.classify(section, *self.object_files)
+
+    def get_relocation_section(self, function):
+        # The relocation section of a function (REL or RELA, depending on the target).
+        names = sections.parse_section_headers(self.comparator.elf_reader.read_file(['-S', '-W'], self.object_files[0])).values()
+        return [name for name in ['.rel.text.' + function, '.rela.text.' + function] if name in names][0]
+
+    def test_symbol_order(self):
+        for function in ['foo', 'bar']:
+            self.assertIn(self.classify('.text.' + function), [None, 'relocations'])
+
+            # The relocation sections refer to the called functions by different symbol indices.
+            relocation_section = self.get_relocation_section(function)
+            self.assertFalse(self.comparator.sections_equal(relocation_section, *self.object_files))
+            self.assertEqual(self.classify(relocation_section), 'relocations')
+
+    def test_different_symbol(self):
+        self.object_files[1] = self.compile(SOURCE_ONE.replace('return g2(x)', 'return g1(x)'), 'three')
+        self.assertEqual(self.classify(self.get_relocation_section('foo')), 'instructions')
+
+    def test_fingerprints(self):
+        for function in ['foo', 'bar']:
+            for section in ['.text.' + function, self.get_relocation_section(function)]:
+                self.assertEqual(*[self.comparator.relocation_aware_digest(section, object_file) for object_file in self.object_files])
+
+        self.object_files[1] = self.compile(SOURCE_ONE.replace('return g2(x)', 'return g1(x)'), 'three')
+        section = self.get_relocation_section('foo')
+        self.assertNotEqual(*[self.comparator.relocation_aware_digest(section, object_file) for object_file in self.object_files])
+
+    def test_relocated_section(self):
+        self.assertEqual(sections.get_relocated_section('.rel.text.foo'), '.text.foo')
+        self.assertEqual(sections.get_relocated_section('.rela.text.foo'), '.text.foo')
+        self.assertIsNone(sections.get_relocated_section('.text.foo'))
+        self.assertIsNone(sections.get_relocated_section('.relro_data'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+""" Tests of the selection of the subset of versions with the fewest mobile functions (see core/selection.py). """
+import unittest
+import unittest.mock
+
+import core.selection as selection
+
+def make_fingerprints(functions):
+    # The fingerprints of versions from {version: {symbol: fingerprint}}, all symbols being in the same object file.
+    return {version: {'text_section_information': {'a.o': {symbol: [['.text.' + symbol, fingerprint]] for symbol, fingerprint in symbols.items()}}}
+            for version, symbols in functions.items()}
+
+class SelectionTest(unittest.TestCase):
+
+    def test_patterns(self):
+        fingerprints = make_fingerprints({'v1': {'f': 'x', 'g': 'x', 'h': 'x'},
+                                          'v2': {'f': 'y', 'g': 'x', 'h': 'x'},
+                                          'v3': {'f': 'x', 'g': 'x', 'h': 'x', 'i': 'x'}})
+        patterns = selection.get_patterns(fingerprints, ['v1', 'v2', 'v3'])
+
+        # Function i is only in the last version, functions that are identical in all versions are left out.
+        self.assertEqual(patterns, {(0, 1, 0): 1, (0, 0, 1): 1})
+
+    def test_cost(self):
+        patterns = {(0, 1, 0, 0): 2, (0, 0, 1, 0): 3, (0, 1, 2, 0): 1}
+        self.assertEqual(selection.cost(patterns, [0, 3]), 0)
+        self.assertEqual(selection.cost(patterns, [0, 1]), 3)
+        self.assertEqual(selection.cost(patterns, [2, 3]), 4)
+        self.assertEqual(selection.cost(patterns, range(4)), 6)
+        self.assertEqual(selection.cost(patterns, [1]), 0)
+
+    def test_best_subset(self):
+        patterns = {(0, 1, 0, 0): 2, (0, 0, 1, 0): 3, (0, 1, 2, 0): 1}
+        self.assertEqual(selection.best_subset(patterns, 4, 2), ([0, 3], 0))
+        self.assertEqual(selection.best_subset(patterns, 4, 3), ([0, 1, 3], 3))
+        self.assertEqual(selection.best_subset(patterns, 4, 10), ([0, 1, 2, 3], 6))
+
+    def test_best_subset_greedy(self):
+        # Versions 0 and 4 are identical, every other version adds as many mobile functions as its index.
+        patterns = {tuple(int(idx == version) for idx in range(5)): version for version in range(1, 4)}
+        with unittest.mock.patch.object(selection, 'EXACT_LIMIT', 0):
+            self.assertEqual(selection.best_subset(patterns, 5, 2), ([0, 4], 0))
+            self.assertEqual(selection.best_subset(patterns, 5, 4), ([0, 1, 2, 4], 3))
+
+    def test_largest_subset(self):
+        patterns = {(0, 1, 0, 0): 2, (0, 0, 1, 0): 3, (0, 1, 2, 0): 1}
+        self.assertEqual(selection.largest_subset(patterns, 4, 3), ([0, 1, 3], 3))
+        self.assertEqual(selection.largest_subset(patterns, 4, 0), ([0, 3], 0))
+
+        # No pair of versions is identical.
+        self.assertIsNone(selection.largest_subset({(0, 1, 2): 1}, 3, 0))
+        self.assertIsNone(selection.largest_subset(patterns, 4, 0, 3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+""" Tests of the queue of jobs shared by workers (see executor/work_queue.py). """
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import executor.work_queue as work_queue
+
+def make_job(seed):
+    return {'benchmark': 'benchmark', 'input_source_directory': '/input', 'seed': seed, 'nr_of_versions': '2', 'transformation_type': 'type',
+            'mode': 0, 'testmode': 0, 'output_directory': '/output/' + str(seed)}
+
+class WorkQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, 'queue.db')
+        config = {'heartbeat': 1, 'timeout': 60, 'max_attempts': 2}
+
+        # Two workers sharing the queue.
+        self.one = work_queue.WorkQueue(path, config)
+        self.one.worker = 'one'
+        self.two = work_queue.WorkQueue(path, config)
+        self.two.worker = 'two'
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def expire(self, job_id):
+        # The worker of the job stopped heartbeating longer than the timeout ago.
+        with contextlib.closing(self.one.connect()) as connection:
+            connection.execute('UPDATE jobs SET heartbeat = ? WHERE id = ?', (time.time() - 120, job_id))
+
+    def get_job(self, job_id):
+        with contextlib.closing(self.one.connect()) as connection:
+            return dict(connection.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+
+    def test_claim(self):
+        self.one.enqueue([make_job(1), make_job(2)])
+        job_one = self.one.claim()
+        job_two = self.two.claim()
+        self.assertEqual((job_one['seed'], job_two['seed']), (1, 2))
+        self.assertIsNone(self.one.claim())
+        self.assertEqual(self.one.status(), {'running': 2})
+
+        self.assertTrue(self.one.heartbeat(job_one['id']))
+        self.assertFalse(self.one.heartbeat(job_two['id']))
+        self.one.finish(job_one['id'], 'finished', {'result': True})
+        self.assertEqual(self.one.status(), {'running': 1, 'finished': 1})
+        self.assertEqual(json.loads(self.get_job(job_one['id'])['result']), {'result': True})
+
+    def test_stale_job(self):
+        self.one.enqueue([make_job(1)])
+        job = self.one.claim()
+
+        # A job that is heartbeated isn't handed out again.
+        self.assertTrue(self.one.heartbeat(job['id']))
+        self.assertIsNone(self.two.claim())
+
+        self.expire(job['id'])
+        claimed = self.two.claim()
+        self.assertEqual(claimed['id'], job['id'])
+        self.assertEqual(self.get_job(job['id'])['attempts'], 2)
+
+        # The first worker lost the job: it can't heartbeat or finish it anymore.
+        self.assertFalse(self.one.heartbeat(job['id']))
+        self.one.finish(job['id'], 'failed', {'result': False})
+        self.assertEqual(self.get_job(job['id'])['state'], 'running')
+        self.assertEqual(self.get_job(job['id'])['worker'], 'two')
+
+        self.two.finish(job['id'], 'finished', {'result': True})
+        self.assertEqual(self.get_job(job['id'])['state'], 'finished')
+
+    def test_max_attempts(self):
+        self.one.enqueue([make_job(1), make_job(2)])
+        job = self.one.claim()
+        self.expire(job['id'])
+        self.assertEqual(self.two.claim()['id'], job['id'])
+
+        # After the last attempt is lost, the job fails instead of being handed out again.
+        self.expire(job['id'])
+        self.assertEqual(self.one.claim()['seed'], 2)
+        self.assertEqual(self.get_job(job['id'])['state'], 'failed')
+        self.assertIsNone(self.get_job(job['id'])['worker'])
+        self.assertIsNone(self.two.claim())
+        self.assertEqual(self.one.status(), {'failed': 1, 'running': 1})
+
+if __name__ == '__main__':
+    unittest.main()